@@ -0,0 +1,185 @@
+"""
+Serviço HTTP (ASGI) de inferência, independente da interface Streamlit
+
+Cada worker carrega o modelo uma única vez na inicialização e o mantém em
+memória. Execute com:
+
+    python api.py --workers 4 --port 8000
+"""
+
+import argparse
+import logging
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import Dict, List
+
+import torch
+from fastapi import FastAPI, HTTPException
+from pydantic import BaseModel
+
+from batching import MicroBatcher
+from history_store import get_history_writer, record_prediction
+from inference import load_model, preprocess_for_inference, run_batch_inference
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Configurações (sobrescrevíveis por variáveis de ambiente)
+MODEL_DIR = os.getenv("MODEL_DIR", "models/model_distilbert_cased")
+API_HOST = os.getenv("API_HOST", "0.0.0.0")
+API_PORT = int(os.getenv("API_PORT", "8000"))
+API_WORKERS = int(os.getenv("API_WORKERS", "1"))
+MAX_BATCH_ITEMS = int(os.getenv("API_MAX_BATCH_ITEMS", "256"))
+# Janela de micro-batching para requisições concorrentes em /classify
+MAX_BATCH_SIZE = int(os.getenv("API_MAX_BATCH_SIZE", "32"))
+MAX_WAIT_MS = float(os.getenv("API_MAX_WAIT_MS", "5"))
+ID2LABEL = {0: "Improdutivo", 1: "Produtivo"}
+
+# Modelo aquecido deste worker (carregado no startup)
+MODEL_STATE: Dict = {}
+
+
+class ClassifyRequest(BaseModel):
+    text: str
+
+
+class BatchClassifyRequest(BaseModel):
+    texts: List[str]
+
+
+class ClassifyResponse(BaseModel):
+    prediction: str
+    confidence: float
+    scores: Dict[str, float]
+
+
+class BatchClassifyResponse(BaseModel):
+    results: List[ClassifyResponse]
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Carrega o modelo uma vez por worker antes de aceitar requisições"""
+    # Dividir os núcleos entre os workers para evitar disputa de threads
+    torch.set_num_threads(max(1, (os.cpu_count() or 1) // API_WORKERS))
+
+    tokenizer, model = load_model(MODEL_DIR)
+    MODEL_STATE["tokenizer"] = tokenizer
+    MODEL_STATE["model"] = model
+
+    batcher = MicroBatcher(
+        lambda texts: run_batch_inference(tokenizer, model, texts, MAX_BATCH_SIZE),
+        max_batch_size=MAX_BATCH_SIZE,
+        max_wait_ms=MAX_WAIT_MS,
+    )
+    await batcher.start()
+    MODEL_STATE["batcher"] = batcher
+
+    logger.info(f"Worker {os.getpid()} pronto com modelo {MODEL_DIR}")
+    yield
+    await batcher.stop()
+    MODEL_STATE.clear()
+
+
+app = FastAPI(title="Email Productivity Classifier API", lifespan=lifespan)
+
+
+def _to_response(prediction: str, confidence: float, scores: Dict[int, float]):
+    """Converte a saída de run_inference no formato da resposta HTTP"""
+    return ClassifyResponse(
+        prediction=prediction,
+        confidence=confidence,
+        scores={ID2LABEL[label_id]: score for label_id, score in scores.items()},
+    )
+
+
+@app.get("/health")
+def health():
+    """Verifica se o modelo deste worker está carregado"""
+    return {"status": "ok" if MODEL_STATE else "loading", "model": MODEL_DIR}
+
+
+def _history_metrics() -> Dict:
+    """Registros gravados/descartados pelo histórico deste worker"""
+    writer = get_history_writer()
+    if writer is None:
+        return {"enabled": False}
+    return {"enabled": True, "written": writer.written, "dropped": writer.dropped}
+
+
+@app.get("/metrics")
+def metrics():
+    """Métricas do micro-batching deste worker (fila, lotes, espera)"""
+    return {
+        "worker": os.getpid(),
+        "batching": MODEL_STATE["batcher"].metrics.snapshot(),
+        "history": _history_metrics(),
+    }
+
+
+@app.post("/classify", response_model=ClassifyResponse)
+async def classify(request: ClassifyRequest):
+    """Classifica um único email (agrupado com requisições concorrentes)"""
+    text = preprocess_for_inference(request.text)
+    if not text:
+        raise HTTPException(status_code=422, detail="Texto vazio")
+
+    start = time.perf_counter()
+    prediction, confidence, scores = await MODEL_STATE["batcher"].submit(text)
+    record_prediction(
+        text,
+        prediction,
+        confidence,
+        method="api",
+        latency_ms=(time.perf_counter() - start) * 1000,
+    )
+    return _to_response(prediction, confidence, scores)
+
+
+@app.post("/classify/batch", response_model=BatchClassifyResponse)
+async def classify_batch(request: BatchClassifyRequest):
+    """
+    Classifica vários emails em um único forward pass por lote
+
+    O lote roda no thread do micro-batching, em sequência com os lotes de
+    /classify (o modelo nunca é usado por dois threads ao mesmo tempo).
+    """
+    if not request.texts:
+        return BatchClassifyResponse(results=[])
+
+    if len(request.texts) > MAX_BATCH_ITEMS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Máximo de {MAX_BATCH_ITEMS} textos por requisição",
+        )
+
+    texts = [preprocess_for_inference(text) for text in request.texts]
+    if not all(texts):
+        raise HTTPException(status_code=422, detail="Lote contém texto vazio")
+
+    results = await MODEL_STATE["batcher"].run_exclusive(
+        run_batch_inference, MODEL_STATE["tokenizer"], MODEL_STATE["model"], texts
+    )
+    for text, (prediction, confidence, _) in zip(texts, results):
+        record_prediction(text, prediction, confidence, method="api_batch")
+    return BatchClassifyResponse(results=[_to_response(*result) for result in results])
+
+
+def main():
+    """Inicia o servidor uvicorn com o número de workers configurado"""
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Serviço HTTP de classificação")
+    parser.add_argument("--host", default=API_HOST)
+    parser.add_argument("--port", type=int, default=API_PORT)
+    parser.add_argument("--workers", type=int, default=API_WORKERS)
+    args = parser.parse_args()
+
+    # Os workers reimportam este módulo e leem a contagem pelo ambiente
+    os.environ["API_WORKERS"] = str(args.workers)
+    uvicorn.run("api:app", host=args.host, port=args.port, workers=args.workers)
+
+
+if __name__ == "__main__":
+    main()
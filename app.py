@@ -1,19 +1,52 @@
 import streamlit as st
 import time
 import re
-import io
 import os
 import nltk
+import pandas as pd
 from transformers import (
     AutoTokenizer,
     AutoModelForSequenceClassification,
     TextClassificationPipeline,
 )
 from functools import lru_cache
-from typing import Dict, Literal, Tuple
-import pdfplumber
+from typing import Dict, List, Literal, Optional, Tuple
 import torch
 
+from cascade import (
+    STAGE_LINEAR,
+    STAGE_TRANSFORMER,
+    FastLinearClassifier,
+    split_by_confidence,
+)
+from config.local_model import MODEL_CONFIG
+from email_ingest import read_email_bytes
+from history_aggregates import (
+    CONFIDENCE_BINS,
+    METRIC_CORRECTIONS,
+    METRIC_TOTAL,
+    METRIC_TRANSLATIONS,
+    PREDICTION_PREFIX,
+    summarize,
+)
+from history_store import get_history_writer, record_prediction
+from inference import run_chunked_inference
+from keyword_engine import KeywordEngine
+from language_detection import detect_languages, get_language_detector
+from onnx_backend import (
+    INFERENCE_BACKEND,
+    OnnxSequenceClassifier,
+    OnnxTextClassificationPipeline,
+)
+from pdf_extract import get_pdf_extractor
+from prediction_cache import PredictionCache
+from quantization import (
+    is_quantized_dir,
+    load_quantized_model,
+    read_quantization_config,
+)
+from translation import TRANSLATION_BACKEND, get_translation_backend
+
 
 # === Sidebar helpers (UI-ONLY) ===
 def _load_svg(path: str) -> str:
@@ -487,10 +520,36 @@ h4 {
 )
 
 # Constantes
-MODEL_ID = "models/model_distilbert_cased"  # Modelo DistilBERT com 100% de acurácia
+# Modelo DistilBERT com 100% de acurácia (MODEL_ID pode apontar para a
+# variante quantizada gerada por scripts/quantize_model.py)
+MODEL_ID = os.getenv("MODEL_ID", "models/model_distilbert_cased")
 # CORREÇÃO TEMPORÁRIA: Labels estão trocados no modelo treinado
 # Sistema híbrido para corrigir classificação incorreta
 ID2LABEL = {0: "Improdutivo", 1: "Produtivo"}  # Voltando ao original
+BATCH_SIZE = 32  # Emails por forward pass na classificação em lote
+# Modo de inferência: "translate" (tradução → DistilBERT em inglês) ou
+# "native_pt" (português direto no modelo nativo; tradução só como fallback)
+INFERENCE_MODE = os.getenv("INFERENCE_MODE", "translate")
+NATIVE_MODEL_ID = MODEL_CONFIG["local_path"]  # BERT PT-BR (neuralmind)
+# Um modelo nativo multilíngue recebe qualquer idioma sem detecção
+NATIVE_MULTILINGUAL = MODEL_CONFIG["language"] == "multilingual"
+NATIVE_LANGUAGES = {"pt"}
+# Cache de predições: nível em disco opcional (ex: data/prediction_cache.sqlite)
+PREDICTION_CACHE_DB = os.getenv("PREDICTION_CACHE_DB")
+PREDICTION_CACHE_TTL = float(os.getenv("PREDICTION_CACHE_TTL", "0")) or None
+# Modo em janelas: textos acima de 512 tokens são divididos em janelas
+# sobrepostas e os scores agregados ("max", "mean" ou "attention")
+CHUNKED_INFERENCE = os.getenv("CHUNKED_INFERENCE", "0") == "1"
+CHUNK_AGGREGATION = os.getenv("CHUNK_AGGREGATION", "max")
+CHUNK_MAX_WINDOWS = int(os.getenv("CHUNK_MAX_WINDOWS", "8"))
+# Sem janelas, o que passa de 512 tokens é descartado de qualquer forma
+MAX_INPUT_CHARS = 100_000 if CHUNKED_INFERENCE else 10_000
+# Cascata (modo translate): o modelo linear de FAST_MODEL_ID decide sozinho
+# quando sua confiança atinge CASCADE_THRESHOLD; o transformer só recebe os
+# emails incertos (gere o modelo com scripts/train_fast_model.py)
+CASCADE_INFERENCE = os.getenv("CASCADE_INFERENCE", "0") == "1"
+CASCADE_THRESHOLD = float(os.getenv("CASCADE_THRESHOLD", "0.95"))
+FAST_MODEL_ID = os.getenv("FAST_MODEL_ID", "models/fast_linear")
 
 
 # === Sidebar renderer (UI-ONLY) ===
@@ -557,122 +616,161 @@ def render_sidebar():
 # Modelo DistilBERT com 100% de acurácia para classificação direta
 # Sistema de tradução multilíngue integrado
 
-# Cache dos modelos de tradução
-TRANSLATION_CACHE = {}
-
-
-def get_translation_models():
-    """Carrega e cacheia os modelos de tradução"""
+# Backend de tradução (MarianMT local por padrão; veja translation.py)
+@st.cache_resource(show_spinner=False)
+def get_translator():
+    """Carrega e cacheia o backend de tradução configurado"""
     try:
-        from deep_translator import GoogleTranslator
-
-        # Usar Google Translator como fallback (mais confiável)
-        global TRANSLATION_CACHE
-        TRANSLATION_CACHE.update(
-            {
-                "pt_en": {"translator": GoogleTranslator(source="pt", target="en")},
-                "en_pt": {"translator": GoogleTranslator(source="en", target="pt")},
-            }
-        )
-
-        return TRANSLATION_CACHE
+        return get_translation_backend()
     except Exception as e:
         st.warning(f"Erro ao carregar modelos de tradução: {e}")
         return None
 
 
 def detect_language(text: str) -> str:
-    """Detecta o idioma do texto"""
-    try:
-        from langdetect import detect, LangDetectException
-
-        if not text or len(text.strip()) < 10:
-            return "en"  # Default para textos muito curtos
-
-        detected = detect(text)
-        return detected
-    except LangDetectException:
-        return "en"  # Fallback para inglês
-    except Exception:
-        return "en"  # Fallback para inglês
+    """
+    Detecta o idioma do texto
 
+    Detector determinístico carregado uma única vez (language_detection):
+    examina apenas o início do texto e memoiza o resultado; textos muito
+    curtos ou sem evidência ficam como "en".
+    """
+    return get_language_detector().detect(text)
 
-def translate_text(text: str, source_lang: str, target_lang: str) -> str:
-    """Traduz texto usando Google Translator como fallback"""
-    try:
-        if not TRANSLATION_CACHE:
-            get_translation_models()
 
-        if not TRANSLATION_CACHE:
-            return text  # Fallback se não conseguir carregar modelos
+def translate_text(text: str, source_lang: str, target_lang: str) -> Tuple[str, bool]:
+    """Traduz texto usando o backend de tradução configurado"""
+    translated, ok = translate_texts([text], source_lang, target_lang)
+    return translated[0], ok
 
-        # Determinar direção da tradução
-        if source_lang == "pt" and target_lang == "en":
-            direction = "pt_en"
-        elif source_lang == "en" and target_lang == "pt":
-            direction = "en_pt"
-        else:
-            return text  # Não traduzir se não for PT↔EN
 
-        translator = TRANSLATION_CACHE[direction]["translator"]
+def translate_texts(
+    texts: List[str], source_lang: str, target_lang: str
+) -> Tuple[List[str], bool]:
+    """
+    Traduz vários textos em lote (PT↔EN)
 
-        # Traduzir o texto
-        translated_text = translator.translate(text)
+    Returns:
+        tuple: (textos, sucesso). Em caso de erro, ou sem tradutor
+        disponível, retorna os textos originais com sucesso=False
+    """
+    translator = get_translator()
 
-        return translated_text
+    if translator is None:
+        return list(texts), False  # Fallback se não conseguir carregar modelos
 
+    try:
+        return translator.translate_batch(texts, source_lang, target_lang), True
     except Exception as e:
         st.warning(f"Erro na tradução: {e}")
-        return text  # Retornar texto original em caso de erro
+        return list(texts), False  # Retornar texto original em caso de erro
 
 
-def ensure_english(text: str) -> tuple[str, str, bool]:
+def ensure_english(
+    text: str, original_lang: Optional[str] = None
+) -> tuple[str, str, bool]:
     """
     Garante que o texto esteja em inglês para o modelo DistilBERT
 
+    Args:
+        text: Texto original
+        original_lang: Idioma já detectado (evita detectar novamente)
+
     Returns:
-        tuple: (texto_processado, idioma_original, tradução_aplicada)
+        tuple: (texto_processado, idioma_original, tradução_aplicada).
+        tradução_aplicada é False quando a tradução falhou e o texto
+        original foi mantido
     """
     # Detectar idioma
-    original_lang = detect_language(text)
+    if not original_lang:
+        original_lang = detect_language(text)
 
     # Se já está em inglês, retornar como está
     if original_lang == "en":
         return text, original_lang, False
 
-    # Se está em português, traduzir para inglês
-    if original_lang == "pt":
-        translated_text = translate_text(text, "pt", "en")
-        return translated_text, original_lang, True
+    # Português e outros idiomas: traduzir para inglês
+    translated_text, translation_applied = translate_text(text, original_lang, "en")
+    return translated_text, original_lang, translation_applied
 
-    # Para outros idiomas, tentar traduzir para inglês
-    try:
-        translated_text = translate_text(text, original_lang, "en")
-        return translated_text, original_lang, True
-    except:
-        return text, original_lang, False
+
+def ensure_english_batch(
+    texts: List[str], languages: Optional[List[Optional[str]]] = None
+) -> List[Tuple[str, str, bool]]:
+    """
+    Versão em lote de ensure_english: textos do mesmo idioma são traduzidos
+    juntos em uma única chamada ao backend
+
+    Args:
+        texts: Textos originais
+        languages: Idiomas já detectados (None nas posições a detectar)
+
+    Returns:
+        Lista de tuplas (texto_processado, idioma_original, tradução_aplicada)
+    """
+    languages = list(languages or [None] * len(texts))
+    missing = [i for i, lang in enumerate(languages) if not lang]
+    for i, lang in zip(missing, detect_languages([texts[i] for i in missing])):
+        languages[i] = lang
+    results = [(text, lang, False) for text, lang in zip(texts, languages)]
+
+    for lang in set(languages) - {"en"}:
+        indices = [i for i, text_lang in enumerate(languages) if text_lang == lang]
+        translated, ok = translate_texts([texts[i] for i in indices], lang, "en")
+        for i, translated_text in zip(indices, translated):
+            results[i] = (translated_text, lang, ok)
+
+    return results
+
+
+def _translation_failed(original_lang: str, translation_applied: bool) -> bool:
+    """
+    Indica se o texto deveria ter sido traduzido mas caiu no fallback
+
+    Resultados nesse caso não vão para o cache de predições: o modelo em
+    inglês recebeu o texto original, e a próxima chamada pode traduzir.
+    """
+    return original_lang != "en" and not translation_applied
 
 
 # Modelo BERT para classificação de emails
 
 
+def _load_pipeline(model_id: str) -> TextClassificationPipeline:
+    """Carrega tokenizer e modelo locais e cria o pipeline de classificação"""
+    model_path = os.path.join(os.path.dirname(__file__), model_id)
+    tokenizer = AutoTokenizer.from_pretrained(model_path)
+
+    # Variante INT8: dinâmica (PyTorch) ou estática (grafo ONNX quantizado)
+    if is_quantized_dir(model_path):
+        model = load_quantized_model(model_path)
+        if read_quantization_config(model_path)["method"] == "static":
+            return OnnxTextClassificationPipeline(model, tokenizer)
+        return TextClassificationPipeline(model=model, tokenizer=tokenizer, top_k=None)
+
+    # Backend ONNX Runtime (INFERENCE_BACKEND=onnx), exportado para <modelo>/onnx
+    if INFERENCE_BACKEND == "onnx":
+        return OnnxTextClassificationPipeline(
+            OnnxSequenceClassifier(model_path), tokenizer
+        )
+
+    model = AutoModelForSequenceClassification.from_pretrained(model_path)
+
+    # Configurar dispositivo
+    device = 0 if torch.cuda.is_available() else -1
+
+    # Criar pipeline
+    return TextClassificationPipeline(
+        model=model, tokenizer=tokenizer, top_k=None, device=device
+    )
+
+
 # Cache do modelo para evitar recarga
 @st.cache_resource(show_spinner=True)
 def get_classifier():
     """Carrega o modelo fine-tuned para classificação de emails"""
     try:
-        # Carregar tokenizer e modelo local
-        model_path = os.path.join(os.path.dirname(__file__), MODEL_ID)
-        tokenizer = AutoTokenizer.from_pretrained(model_path)
-        model = AutoModelForSequenceClassification.from_pretrained(model_path)
-
-        # Configurar dispositivo
-        device = 0 if torch.cuda.is_available() else -1
-
-        # Criar pipeline
-        return TextClassificationPipeline(
-            model=model, tokenizer=tokenizer, top_k=None, device=device
-        )
+        return _load_pipeline(MODEL_ID)
     except Exception as e:
         st.error(f"Erro ao carregar modelo: {e}")
         st.info(
@@ -681,6 +779,80 @@ def get_classifier():
         return None
 
 
+@st.cache_resource(show_spinner=True)
+def get_native_classifier():
+    """Carrega o modelo nativo em português (modo native_pt)"""
+    try:
+        return _load_pipeline(NATIVE_MODEL_ID)
+    except Exception as e:
+        # Sem modelo nativo, o modo native_pt cai no caminho com tradução
+        st.warning(f"Modelo nativo indisponível, usando tradução: {e}")
+        return None
+
+
+@st.cache_resource(show_spinner=False)
+def get_fast_classifier() -> Optional[FastLinearClassifier]:
+    """Carrega o primeiro estágio da cascata (None se desativada)"""
+    if not CASCADE_INFERENCE:
+        return None
+    try:
+        return FastLinearClassifier.load(
+            os.path.join(os.path.dirname(__file__), FAST_MODEL_ID)
+        )
+    except Exception as e:
+        # Sem modelo linear, todos os emails vão para o transformer
+        st.warning(f"Modelo linear da cascata indisponível: {e}")
+        return None
+
+
+def route_native(text: str) -> Tuple[bool, Optional[str]]:
+    """
+    Decide se o texto vai direto para o modelo nativo (modo native_pt)
+
+    Args:
+        text: Texto original do email
+
+    Returns:
+        tuple: (usar_modelo_nativo, idioma_detectado ou None se não detectado)
+    """
+    if INFERENCE_MODE != "native_pt":
+        return False, None
+
+    # Modelo multilíngue: sem detecção de idioma no caminho crítico
+    if NATIVE_MULTILINGUAL:
+        return get_native_classifier() is not None, None
+
+    lang = detect_language(text)
+    if lang in NATIVE_LANGUAGES and get_native_classifier() is not None:
+        return True, lang
+
+    return False, lang
+
+
+# Cache de predições (invalidado quando os arquivos do modelo mudam)
+@st.cache_resource(show_spinner=False)
+def get_prediction_cache() -> PredictionCache:
+    """Cria o cache de predições compartilhado entre sessões"""
+    model_dirs = [os.path.join(os.path.dirname(__file__), MODEL_ID)]
+    if INFERENCE_MODE == "native_pt":
+        model_dirs.append(os.path.join(os.path.dirname(__file__), NATIVE_MODEL_ID))
+
+    namespace = (
+        f"{INFERENCE_MODE}:{INFERENCE_BACKEND}:{TRANSLATION_BACKEND}:"
+        f"{CHUNK_AGGREGATION if CHUNKED_INFERENCE else 'truncate'}"
+    )
+    if CASCADE_INFERENCE:
+        model_dirs.append(os.path.join(os.path.dirname(__file__), FAST_MODEL_ID))
+        namespace += f":cascade{CASCADE_THRESHOLD}"
+
+    return PredictionCache(
+        model_dir=model_dirs,
+        disk_path=PREDICTION_CACHE_DB,
+        ttl_seconds=PREDICTION_CACHE_TTL,
+        namespace=namespace,
+    )
+
+
 # Cache das stopwords em português
 @st.cache_resource(show_spinner=False)
 def load_stopwords_pt():
@@ -737,7 +909,7 @@ def preprocess(text: str) -> str:
 
 def read_uploaded_file(uploaded) -> str:
     """
-    Lê arquivo enviado (.txt ou .pdf)
+    Lê arquivo enviado (.txt, .pdf ou .eml)
 
     Args:
         uploaded: Arquivo enviado via st.file_uploader
@@ -755,15 +927,20 @@ def read_uploaded_file(uploaded) -> str:
             return content.decode("utf-8")
 
         elif uploaded.type == "application/pdf":
-            # Arquivo .pdf
-            content = uploaded.read()
-            with pdfplumber.open(io.BytesIO(content)) as pdf:
-                text = ""
-                for page in pdf.pages:
-                    page_text = page.extract_text()
-                    if page_text:
-                        text += page_text + "\n"
-                return text
+            # Arquivo .pdf: extração paralela, com prazo e cache por conteúdo
+            result = get_pdf_extractor().extract(uploaded.getvalue())
+            if result.timed_out or result.truncated:
+                st.warning(
+                    f"PDF extraído parcialmente ({result.pages_extracted} de "
+                    f"{result.total_pages} páginas)."
+                )
+            return result.text
+
+        elif uploaded.type == "message/rfc822" or uploaded.name.lower().endswith(
+            ".eml"
+        ):
+            # Email .eml: assunto + corpo, com MIME e charset decodificados
+            return read_email_bytes(uploaded.getvalue(), uploaded.name)
 
         else:
             st.error(f"Tipo de arquivo não suportado: {uploaded.type}")
@@ -774,6 +951,85 @@ def read_uploaded_file(uploaded) -> str:
         return ""
 
 
+# Palavras-chave da correção inteligente, compiladas uma única vez
+CORRECTION_KEYWORDS = KeywordEngine(
+    {
+        # Emails IMPRODUTIVOS (sociais)
+        "social": [
+            "oi",
+            "olá",
+            "bom dia",
+            "boa tarde",
+            "boa noite",
+            "oi pessoal",
+            "bom dia pessoal",
+            "boa tarde pessoal",
+            "como estão",
+            "espero que estejam bem",
+            "tudo bem",
+            "só passando",
+            "passando para dar um oi",
+            "dar um oi",
+            "meme",
+            "whatsapp",
+            "engraçado",
+            "parabéns",
+            "aniversário",
+            "felicidades",
+            "saúde",
+            "feriado",
+            "natal",
+            "ano novo",
+            "páscoa",
+            "carnaval",
+            "fim de semana",
+            "férias",
+            "descanso",
+            "aproveitem",
+            "desejo",
+            "desejos",
+            "excelente",
+            "feliz",
+            "boa",
+            "ótimo",
+        ],
+        # Emails PRODUTIVOS (trabalho)
+        "work": [
+            "reunião",
+            "projeto",
+            "urgente",
+            "problema",
+            "deadline",
+            "implementação",
+            "sistema",
+            "crm",
+            "software",
+            "desenvolvimento",
+            "cotação",
+            "orçamento",
+            "erro",
+            "falha",
+            "crítico",
+            "emergência",
+            "bug",
+            "suporte técnico",
+            "status",
+            "prazo",
+            "entrega",
+            "solicito",
+            "preciso",
+            "necessito",
+            "requer",
+            "ação",
+            "confirmação",
+            "informações",
+            "documentos",
+            "prioridade",
+        ],
+    }
+)
+
+
 def apply_intelligent_correction(
     text: str, model_category: str, model_confidence: float, scores: Dict
 ) -> tuple[str, bool]:
@@ -790,85 +1046,10 @@ def apply_intelligent_correction(
     Returns:
         tuple: (categoria_corrigida, correção_aplicada)
     """
-    text_lower = text.lower()
-
-    # Palavras-chave para emails IMPRODUTIVOS (sociais)
-    social_keywords = [
-        "oi",
-        "olá",
-        "bom dia",
-        "boa tarde",
-        "boa noite",
-        "oi pessoal",
-        "bom dia pessoal",
-        "boa tarde pessoal",
-        "como estão",
-        "espero que estejam bem",
-        "tudo bem",
-        "só passando",
-        "passando para dar um oi",
-        "dar um oi",
-        "meme",
-        "whatsapp",
-        "engraçado",
-        "parabéns",
-        "aniversário",
-        "felicidades",
-        "saúde",
-        "feriado",
-        "natal",
-        "ano novo",
-        "páscoa",
-        "carnaval",
-        "fim de semana",
-        "férias",
-        "descanso",
-        "aproveitem",
-        "desejo",
-        "desejos",
-        "excelente",
-        "feliz",
-        "boa",
-        "ótimo",
-    ]
-
-    # Palavras-chave para emails PRODUTIVOS (trabalho)
-    work_keywords = [
-        "reunião",
-        "projeto",
-        "urgente",
-        "problema",
-        "deadline",
-        "implementação",
-        "sistema",
-        "crm",
-        "software",
-        "desenvolvimento",
-        "cotação",
-        "orçamento",
-        "erro",
-        "falha",
-        "crítico",
-        "emergência",
-        "bug",
-        "suporte técnico",
-        "status",
-        "prazo",
-        "entrega",
-        "solicito",
-        "preciso",
-        "necessito",
-        "requer",
-        "ação",
-        "confirmação",
-        "informações",
-        "documentos",
-        "prioridade",
-    ]
-
-    # Contar palavras-chave
-    social_count = sum(1 for keyword in social_keywords if keyword in text_lower)
-    work_count = sum(1 for keyword in work_keywords if keyword in text_lower)
+    # Contar palavras-chave distintas de cada grupo (uma passada pelo texto)
+    hits = CORRECTION_KEYWORDS.scan(text)
+    social_count = hits.distinct("social")
+    work_count = hits.distinct("work")
 
     # Lógica de correção
     if social_count > work_count and social_count >= 2:
@@ -890,63 +1071,47 @@ def apply_intelligent_correction(
         return model_category, False
 
 
-def classify_email(content: str) -> Dict:
+def _scores_from_prediction(prediction) -> Dict[str, float]:
     """
-    Classifica email usando modelo DistilBERT com 100% de acurácia
-    Sistema de tradução automática multilíngue integrado
+    Converte a saída do pipeline (lista de labels/scores) em dicionário
 
     Args:
-        content: Conteúdo do email
+        prediction: Lista de dicts {"label", "score"} de um único email
 
     Returns:
-        Dict com category, confidence, scores e explanation
+        Dict label -> score
     """
-    # Usar apenas o conteúdo
-    text = content.strip()
-
-    # Se vazio, retornar categoria Improdutivo com confiança 0.0
-    if not text:
-        return {
-            "category": "Improdutivo",
-            "confidence": 0.0,
-            "scores": {"Produtivo": 0.0, "Improdutivo": 1.0},
-            "explanation": "Nenhum conteúdo recebido.",
-        }
-
-    # Sistema de tradução automática
-    translated_text, original_lang, translation_applied = ensure_english(text)
-
-    # Log da tradução se aplicada
-    if translation_applied:
-        st.info(
-            f"Texto traduzido de {original_lang.upper()} → EN: {translated_text[:100]}..."
-        )
-
-    # Carregar classificador DistilBERT
-    classifier = get_classifier()
-
-    if classifier is None:
-        return {
-            "category": "Erro",
-            "confidence": 0.0,
-            "scores": {"Produtivo": 0.0, "Improdutivo": 0.0},
-            "explanation": "Erro ao carregar modelo.",
-            "processed_text": translated_text,  # Usar texto traduzido bruto
-            "original_text": text,
-        }
-
-    # Classificar com DistilBERT usando texto traduzido BRUTO (sem pré-processamento)
-    # O modelo BERT deve receber o texto original para manter pontuação, maiúsculas, etc.
-    result = classifier(translated_text, truncation=True, max_length=512)
+    # O modelo retorna labels como strings ("Improdutivo", "Produtivo")
+    return {pred["label"]: float(pred["score"]) for pred in prediction}
+
+
+def _build_classification(
+    text: str,
+    translated_text: str,
+    original_lang: str,
+    translation_applied: bool,
+    scores: Dict[str, float],
+    inference_mode: str = "translate",
+    model_id: str = MODEL_ID,
+    cascade_stage: str = STAGE_TRANSFORMER,
+) -> Dict:
+    """
+    Monta o dicionário de resultado a partir dos scores do modelo
 
-    # Mapear resultados do DistilBERT
-    scores = {}
-    for pred in result[0]:
-        # O modelo retorna labels como strings ("Improdutivo", "Produtivo")
-        label_name = pred["label"]
-        scores[label_name] = float(pred["score"])
+    Args:
+        text: Texto original do email
+        translated_text: Texto enviado ao modelo (traduzido se necessário)
+        original_lang: Idioma detectado
+        translation_applied: Se houve tradução
+        scores: Scores do modelo por categoria
+        inference_mode: Caminho usado ("translate" ou "native_pt")
+        model_id: Modelo que produziu os scores
+        cascade_stage: Estágio que decidiu ("linear" ou "transformer")
 
-        # Encontrar categoria com maior score do modelo
+    Returns:
+        Dict no formato retornado por classify_email
+    """
+    # Encontrar categoria com maior score do modelo
     model_category = max(scores, key=scores.get)
     model_confidence = scores[model_category]
 
@@ -962,6 +1127,13 @@ def classify_email(content: str) -> Dict:
     else:
         explanation = "Este email não requer ação específica da nossa equipe."
 
+    if cascade_stage == STAGE_LINEAR:
+        method = "Modelo linear (cascata) + Correção Inteligente"
+    elif inference_mode == "native_pt":
+        method = "BERT PT-BR nativo + Correção Inteligente"
+    else:
+        method = "DistilBERT + Correção Inteligente"
+
     return {
         "category": final_category,
         "confidence": model_confidence,  # Usar confiança do modelo original
@@ -972,13 +1144,314 @@ def classify_email(content: str) -> Dict:
         "translated_text": translated_text,
         "original_language": original_lang,
         "translation_applied": translation_applied,
-        "method": "DistilBERT + Correção Inteligente",
+        "method": method,
+        "inference_mode": inference_mode,
+        "model_id": model_id,
+        "cascade_stage": cascade_stage,
         "correction_applied": correction_applied,
         "model_prediction": model_category,
         "model_confidence": model_confidence,
     }
 
 
+def _empty_classification() -> Dict:
+    """Resultado padrão para conteúdo vazio"""
+    return {
+        "category": "Improdutivo",
+        "confidence": 0.0,
+        "scores": {"Produtivo": 0.0, "Improdutivo": 1.0},
+        "explanation": "Nenhum conteúdo recebido.",
+    }
+
+
+def _model_error_classification(text: str, translated_text: str) -> Dict:
+    """Resultado padrão quando o modelo não pôde ser carregado"""
+    return {
+        "category": "Erro",
+        "confidence": 0.0,
+        "scores": {"Produtivo": 0.0, "Improdutivo": 0.0},
+        "explanation": "Erro ao carregar modelo.",
+        "processed_text": translated_text,  # Usar texto traduzido bruto
+        "original_text": text,
+    }
+
+
+def classify_email(content: str) -> Dict:
+    """
+    Classifica email usando modelo DistilBERT com 100% de acurácia
+    Sistema de tradução automática multilíngue integrado
+
+    No modo native_pt, emails em português vão direto para o modelo nativo
+    (sem tradução); a tradução fica apenas como fallback.
+
+    Args:
+        content: Conteúdo do email
+
+    Returns:
+        Dict com category, confidence, scores e explanation
+    """
+    # Usar apenas o conteúdo
+    text = content.strip()
+
+    # Se vazio, retornar categoria Improdutivo com confiança 0.0
+    if not text:
+        return _empty_classification()
+
+    # Textos repetidos (encaminhamentos, notificações) saem direto do cache
+    cache = get_prediction_cache()
+    cached = cache.get(text)
+    if cached is not None:
+        return cached
+
+    use_native, detected_lang = route_native(text)
+
+    if use_native:
+        # Modo nativo: texto original direto no modelo em português
+        translated_text, original_lang, translation_applied = (
+            text,
+            detected_lang or "auto",
+            False,
+        )
+        classifier = get_native_classifier()
+        inference_mode, model_id = "native_pt", NATIVE_MODEL_ID
+    else:
+        # Sistema de tradução automática
+        translated_text, original_lang, translation_applied = ensure_english(
+            text, detected_lang
+        )
+
+        # Log da tradução se aplicada
+        if translation_applied:
+            st.info(
+                f"Texto traduzido de {original_lang.upper()} → EN: {translated_text[:100]}..."
+            )
+
+        # Cascata: emails óbvios são decididos pelo modelo linear, sem
+        # forward pass do transformer
+        fast_classifier = get_fast_classifier()
+        if fast_classifier is not None:
+            scores = fast_classifier.predict_scores([translated_text])[0]
+            if max(scores.values()) >= CASCADE_THRESHOLD:
+                classification = _build_classification(
+                    text,
+                    translated_text,
+                    original_lang,
+                    translation_applied,
+                    scores,
+                    "translate",
+                    FAST_MODEL_ID,
+                    STAGE_LINEAR,
+                )
+                if not _translation_failed(original_lang, translation_applied):
+                    cache.set(text, classification)
+                return classification
+
+        # Carregar classificador DistilBERT
+        classifier = get_classifier()
+        inference_mode, model_id = "translate", MODEL_ID
+
+    if classifier is None:
+        return _model_error_classification(text, translated_text)
+
+    # Classificar usando o texto BRUTO (sem pré-processamento)
+    # O modelo BERT deve receber o texto original para manter pontuação, maiúsculas, etc.
+    if CHUNKED_INFERENCE:
+        # Textos longos são classificados em janelas (todas no mesmo forward)
+        result = _predict_bucketed(classifier, [translated_text], BATCH_SIZE)
+    else:
+        result = classifier(translated_text, truncation=True, max_length=512)
+
+    # Mapear resultados do modelo
+    scores = _scores_from_prediction(result[0])
+
+    classification = _build_classification(
+        text,
+        translated_text,
+        original_lang,
+        translation_applied,
+        scores,
+        inference_mode,
+        model_id,
+    )
+    if use_native or not _translation_failed(original_lang, translation_applied):
+        cache.set(text, classification)
+
+    return classification
+
+
+def _predict_bucketed(
+    classifier: TextClassificationPipeline, texts: List[str], batch_size: int
+) -> List:
+    """
+    Executa o pipeline em lotes de textos com tamanho parecido
+
+    No modo em janelas (CHUNKED_INFERENCE), textos acima de 512 tokens são
+    classificados por run_chunked_inference e os demais pelo pipeline.
+
+    Returns:
+        Predições no formato do pipeline, na ordem de entrada
+    """
+    predictions = [None] * len(texts)
+
+    if CHUNKED_INFERENCE:
+        token_ids = classifier.tokenizer(texts, add_special_tokens=False)["input_ids"]
+        budget = 512 - classifier.tokenizer.num_special_tokens_to_add()
+        long_texts = [i for i, ids in enumerate(token_ids) if len(ids) > budget]
+        if long_texts:
+            id2label = classifier.model.config.id2label
+            chunked = run_chunked_inference(
+                classifier.tokenizer,
+                classifier.model,
+                [texts[i] for i in long_texts],
+                aggregation=CHUNK_AGGREGATION,
+                max_windows=CHUNK_MAX_WINDOWS,
+                batch_size=batch_size,
+                token_ids=[token_ids[i] for i in long_texts],
+            )
+            for i, (_, _, scores) in zip(long_texts, chunked):
+                predictions[i] = sorted(
+                    (
+                        {"label": id2label[label_id], "score": score}
+                        for label_id, score in scores.items()
+                    ),
+                    key=lambda item: item["score"],
+                    reverse=True,
+                )
+        lengths = [len(ids) for ids in token_ids]
+    else:
+        lengths = [
+            len(ids)
+            for ids in classifier.tokenizer(texts, truncation=True, max_length=512)[
+                "input_ids"
+            ]
+        ]
+
+    # Ordenar por tamanho em tokens para agrupar textos parecidos no mesmo lote
+    order = sorted(
+        (i for i in range(len(texts)) if predictions[i] is None),
+        key=lambda i: lengths[i],
+    )
+
+    for start in range(0, len(order), batch_size):
+        bucket = order[start : start + batch_size]
+        # Cada lote é preenchido (padding) apenas até o maior texto do lote
+        outputs = classifier(
+            [texts[i] for i in bucket],
+            batch_size=len(bucket),
+            truncation=True,
+            max_length=512,
+        )
+        for i, output in zip(bucket, outputs):
+            predictions[i] = output
+
+    return predictions
+
+
+def classify_emails(texts: List[str], batch_size: int = BATCH_SIZE) -> List[Dict]:
+    """
+    Classifica vários emails de uma vez (processamento em lote)
+
+    Os textos são ordenados pelo número de tokens e agrupados em lotes de
+    tamanho parecido, de modo que o padding dinâmico de cada lote fique
+    mínimo e cada forward pass do modelo processe vários emails.
+
+    Args:
+        texts: Lista com o conteúdo dos emails
+        batch_size: Quantidade de emails por forward pass
+
+    Returns:
+        Lista de dicts no mesmo formato de classify_email, na ordem de entrada
+    """
+    results: List[Dict] = [None] * len(texts)
+
+    cache = get_prediction_cache()
+
+    # Emails vazios e já vistos não passam pelo modelo
+    pending = []
+    for idx, content in enumerate(texts):
+        text = (content or "").strip()
+        if not text:
+            results[idx] = _empty_classification()
+        elif (cached := cache.get(text)) is not None:
+            results[idx] = cached
+        else:
+            pending.append((idx, text))
+
+    if not pending:
+        return results
+
+    # Separar emails do modelo nativo (modo native_pt) dos que serão traduzidos
+    native_prepared, to_translate = [], []
+    for idx, text in pending:
+        use_native, detected_lang = route_native(text)
+        if use_native:
+            native_prepared.append((idx, text, text, detected_lang or "auto", False))
+        else:
+            to_translate.append((idx, text, detected_lang))
+
+    # Sistema de tradução automática (em lote por idioma)
+    translations = ensure_english_batch(
+        [text for _, text, _ in to_translate],
+        [lang for _, _, lang in to_translate],
+    )
+    translated_prepared = [
+        (idx, text, *translation)
+        for (idx, text, _), translation in zip(to_translate, translations)
+    ]
+
+    routes = [
+        (native_prepared, get_native_classifier, "native_pt", NATIVE_MODEL_ID),
+        (translated_prepared, get_classifier, "translate", MODEL_ID),
+    ]
+
+    for prepared, load_classifier, inference_mode, model_id in routes:
+        fast_classifier = get_fast_classifier()
+        if prepared and inference_mode == "translate" and fast_classifier is not None:
+            # Cascata: o transformer recebe apenas os emails incertos
+            fast_scores = fast_classifier.predict_scores([item[2] for item in prepared])
+            decided, uncertain = split_by_confidence(fast_scores, CASCADE_THRESHOLD)
+            for i in decided:
+                idx, *classification_args = prepared[i]
+                results[idx] = _build_classification(
+                    *classification_args,
+                    fast_scores[i],
+                    inference_mode,
+                    FAST_MODEL_ID,
+                    STAGE_LINEAR,
+                )
+                if not _translation_failed(*classification_args[2:4]):
+                    cache.set(classification_args[0], results[idx])
+            prepared = [prepared[i] for i in uncertain]
+
+        if not prepared:
+            continue
+
+        classifier = load_classifier()
+
+        if classifier is None:
+            for idx, text, translated_text, _, _ in prepared:
+                results[idx] = _model_error_classification(text, translated_text)
+            continue
+
+        predictions = _predict_bucketed(
+            classifier, [item[2] for item in prepared], batch_size
+        )
+
+        for (idx, *classification_args), prediction in zip(prepared, predictions):
+            results[idx] = _build_classification(
+                *classification_args,
+                _scores_from_prediction(prediction),
+                inference_mode,
+                model_id,
+            )
+            if inference_mode == "native_pt" or not _translation_failed(
+                *classification_args[2:4]
+            ):
+                cache.set(classification_args[0], results[idx])
+
+    return results
+
+
 def suggest_reply(
     category: str, tone: str, content: str, classification_info: Dict = None
 ) -> Tuple[str, float, str]:
@@ -1095,10 +1568,81 @@ Departamento de Comunicação""",
 
 
 # Interface principal
+# Janelas do dashboard (rótulo -> segundos)
+DASHBOARD_WINDOWS = {
+    "Últimas 24 horas": 24 * 3600,
+    "Últimos 7 dias": 7 * 24 * 3600,
+    "Últimos 30 dias": 30 * 24 * 3600,
+}
+
+
+def render_dashboard():
+    """
+    Dashboard operacional a partir dos agregados incrementais do histórico
+
+    Lê apenas os contadores por bucket da janela escolhida (history_aggregates),
+    nunca o histórico bruto: o custo não cresce com o volume de predições.
+    """
+    st.markdown("### Dashboard de Classificações")
+
+    writer = get_history_writer()
+    if writer is None or writer.aggregates is None:
+        st.info("Histórico desativado (defina HISTORY_DIR para habilitar).")
+        return
+
+    window_label = st.selectbox("Período", list(DASHBOARD_WINDOWS), index=0)
+    buckets = writer.aggregates.window(DASHBOARD_WINDOWS[window_label])
+    summary = summarize(buckets)
+
+    if not summary["total"]:
+        st.info("Nenhuma classificação registrada neste período.")
+        return
+
+    productive = summary["predictions"].get("Produtivo", 0)
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Classificações", f"{summary['total']:,}".replace(",", "."))
+    col2.metric("Produtivos", f"{productive / summary['total']:.1%}")
+    col3.metric("Correções por regra", f"{summary['correction_rate']:.1%}")
+    col4.metric("Traduzidos", f"{summary['translation_rate']:.1%}")
+    if summary["avg_latency_ms"] is not None:
+        st.caption(f"Latência média: {summary['avg_latency_ms']:.0f}ms")
+
+    st.markdown("#### Taxas por período")
+    totals = [bucket[METRIC_TOTAL] for bucket in buckets]
+
+    def bucket_rates(metric: str) -> List[float]:
+        return [b.get(metric, 0) / t for b, t in zip(buckets, totals)]
+
+    rates = pd.DataFrame(
+        {
+            "Produtivos": bucket_rates(PREDICTION_PREFIX + "Produtivo"),
+            "Correções por regra": bucket_rates(METRIC_CORRECTIONS),
+            "Traduzidos": bucket_rates(METRIC_TRANSLATIONS),
+        },
+        index=pd.to_datetime([bucket["bucket"] for bucket in buckets], unit="s"),
+    )
+    st.line_chart(rates)
+
+    st.markdown("#### Distribuição da confiança")
+    confidence = pd.DataFrame(
+        {"Classificações": summary["confidence_histogram"]},
+        index=[
+            f"{i / CONFIDENCE_BINS:.1f}–{(i + 1) / CONFIDENCE_BINS:.1f}"
+            for i in range(CONFIDENCE_BINS)
+        ],
+    )
+    st.bar_chart(confidence)
+
+
 def main():
     # Sidebar local com toggle e links
     render_sidebar()
 
+    page = st.sidebar.radio("Página", ["Classificador", "Dashboard"], index=0)
+    if page == "Dashboard":
+        render_dashboard()
+        return
+
     # Título principal centralizado e destacado
     st.markdown(
         """
@@ -1261,9 +1805,9 @@ Pedro"""
 
         # Upload de arquivo
         uploaded = st.file_uploader(
-            "Ou envie um arquivo (.txt ou .pdf)",
-            type=["txt", "pdf"],
-            help="Envie um arquivo .txt ou .pdf para análise",
+            "Ou envie um arquivo (.txt, .pdf ou .eml)",
+            type=["txt", "pdf", "eml"],
+            help="Envie um arquivo .txt, .pdf ou .eml para análise",
         )
 
         # Botão para limpar exemplo
@@ -1325,11 +1869,12 @@ Pedro"""
             )
             return
 
-        if len(final_content) > 10000:
+        if len(final_content) > MAX_INPUT_CHARS:
             st.warning(
-                "O texto é muito longo. Para melhor performance, limite a 10.000 caracteres."
+                "O texto é muito longo. Para melhor performance, limite a "
+                f"{MAX_INPUT_CHARS:,} caracteres.".replace(",", ".")
             )
-            final_content = final_content[:10000]
+            final_content = final_content[:MAX_INPUT_CHARS]
 
         # Medir tempo de inferência
         start_time = time.perf_counter()
@@ -1341,6 +1886,18 @@ Pedro"""
         # Medir tempo
         inference_time = (time.perf_counter() - start_time) * 1000  # ms
 
+        # Histórico de predições (apenas enfileira; gravado em segundo plano)
+        record_prediction(
+            final_content,
+            classification["category"],
+            classification["confidence"],
+            method=classification.get("method", ""),
+            latency_ms=inference_time,
+            language=classification.get("original_language"),
+            translation_applied=classification.get("translation_applied"),
+            correction_applied=classification.get("correction_applied"),
+        )
+
         # Log de performance para análise
         st.info(
             f"Performance: Classificação em {inference_time:.0f}ms | Confiança: {classification['confidence']:.1%}"
@@ -1519,14 +2076,15 @@ Pedro"""
             )
 
         with col3:
+            cache_stats = get_prediction_cache().stats()
             st.markdown(
-                """
+                f"""
             <div class="card">
                 <div class="card-header">
                     <h4>Performance</h4>
                 </div>
                 <div class="card-content">
-                    <p>Cache ativado</p>
+                    <p>Cache: {cache_stats['hits']} hits / {cache_stats['misses']} misses</p>
                     <p>Cold start: ~3-5s</p>
                 </div>
             </div>
@@ -0,0 +1,173 @@
+"""
+Agendador de micro-batching para requisições concorrentes
+
+Requisições que chegam dentro de uma janela curta (max_wait_ms) são
+agrupadas em um único lote (até max_batch_size) e processadas em um só
+forward pass; cada chamador recebe apenas o seu resultado.
+"""
+
+import asyncio
+import logging
+import time
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class BatchingMetrics:
+    """Métricas do agendador: fila, tamanhos de lote e espera adicionada"""
+
+    def __init__(self, window: int = 10000):
+        self.batch_sizes = Counter()
+        self.wait_ms = deque(maxlen=window)
+        self.queue_depth = 0
+        self.max_queue_depth = 0
+        self.total_requests = 0
+        self.total_batches = 0
+
+    def record_enqueue(self, depth: int):
+        """Registra uma nova requisição e a profundidade atual da fila"""
+        self.total_requests += 1
+        self.queue_depth = depth
+        self.max_queue_depth = max(self.max_queue_depth, depth)
+
+    def record_batch(self, size: int, waits_ms: List[float], depth: int):
+        """Registra um lote despachado e a espera de cada requisição"""
+        self.total_batches += 1
+        self.batch_sizes[size] += 1
+        self.wait_ms.extend(waits_ms)
+        self.queue_depth = depth
+
+    def snapshot(self) -> Dict:
+        """Retorna as métricas atuais em formato serializável"""
+        waits = sorted(self.wait_ms)
+
+        def pct(p: float) -> float:
+            if not waits:
+                return 0.0
+            return waits[min(len(waits) - 1, int(p / 100 * len(waits)))]
+
+        return {
+            "queue_depth": self.queue_depth,
+            "max_queue_depth": self.max_queue_depth,
+            "total_requests": self.total_requests,
+            "total_batches": self.total_batches,
+            "avg_batch_size": (
+                self.total_requests / self.total_batches if self.total_batches else 0.0
+            ),
+            "batch_size_histogram": dict(sorted(self.batch_sizes.items())),
+            "added_wait_ms": {
+                "mean": sum(waits) / len(waits) if waits else 0.0,
+                "p50": pct(50),
+                "p99": pct(99),
+                "max": waits[-1] if waits else 0.0,
+            },
+        }
+
+
+class MicroBatcher:
+    """
+    Fila assíncrona que agrupa requisições concorrentes em lotes
+
+    Args:
+        process_batch: Função síncrona que recebe uma lista de itens e
+            devolve uma lista de resultados na mesma ordem
+        max_batch_size: Tamanho máximo de cada lote
+        max_wait_ms: Tempo máximo que a primeira requisição de um lote
+            espera por outras antes do despacho
+    """
+
+    def __init__(
+        self,
+        process_batch: Callable[[List[Any]], List[Any]],
+        max_batch_size: int = 32,
+        max_wait_ms: float = 5.0,
+    ):
+        self.process_batch = process_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.metrics = BatchingMetrics()
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        # Um único thread: lotes são executados em sequência pelo modelo
+        self._executor = ThreadPoolExecutor(max_workers=1)
+
+    async def start(self):
+        """Inicia o loop de despacho no event loop atual"""
+        self._queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Interrompe o loop de despacho"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._executor.shutdown(wait=False)
+
+    async def submit(self, item: Any) -> Any:
+        """Enfileira um item e aguarda o resultado do seu lote"""
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((item, future, time.perf_counter()))
+        self.metrics.record_enqueue(self._queue.qsize())
+        return await future
+
+    async def run_exclusive(self, func: Callable[..., Any], *args) -> Any:
+        """
+        Executa func no mesmo thread dos lotes
+
+        Para trabalho que usa o modelo fora da fila (ex: lotes já montados
+        pelo cliente): a execução fica em sequência com os lotes, sem
+        disputar o modelo com o loop de despacho.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+
+    async def _collect(self) -> List[tuple]:
+        """Aguarda a primeira requisição e reúne as seguintes até a janela fechar"""
+        batch = [await self._queue.get()]
+        deadline = time.perf_counter() + self.max_wait_ms / 1000
+
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+
+        return batch
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+
+        while True:
+            batch = await self._collect()
+            dispatched_at = time.perf_counter()
+            self.metrics.record_batch(
+                len(batch),
+                [(dispatched_at - enqueued_at) * 1000 for _, _, enqueued_at in batch],
+                self._queue.qsize(),
+            )
+
+            items = [item for item, _, _ in batch]
+            try:
+                results = await loop.run_in_executor(
+                    self._executor, self.process_batch, items
+                )
+            except Exception as e:
+                logger.error(f"Erro ao processar lote de {len(items)} itens: {e}")
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            for (_, future, _), result in zip(batch, results):
+                # O chamador pode ter desistido (timeout/desconexão)
+                if not future.done():
+                    future.set_result(result)
@@ -0,0 +1,163 @@
+"""
+Cascata de classificação: modelo linear rápido antes do transformer
+
+Um modelo linear minúsculo (hashing de n-gramas + TF-IDF + regressão
+logística, treinado em data/processed/train.json) classifica os emails em
+microssegundos. Apenas os emails em que a confiança dele fica abaixo do
+limiar seguem para o transformer; os óbvios (saudações, parabéns, pedidos
+claros) são decididos no primeiro estágio.
+"""
+
+import json
+import logging
+import os
+from typing import Dict, List, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+FAST_MODEL_FILENAME = "model.joblib"
+FAST_MODEL_CONFIG = "fast_model_config.json"
+# Estágios registrados no resultado (campo "cascade_stage")
+STAGE_LINEAR = "linear"
+STAGE_TRANSFORMER = "transformer"
+
+
+def build_fast_pipeline(n_features: int = 2**18, C: float = 10.0):
+    """
+    Cria o pipeline linear (ainda não treinado)
+
+    Args:
+        n_features: Dimensão do hashing (sem vocabulário guardado em memória)
+        C: Inverso da regularização da regressão logística
+
+    Returns:
+        sklearn Pipeline com HashingVectorizer, TfidfTransformer e
+        LogisticRegression
+    """
+    from sklearn.feature_extraction.text import HashingVectorizer, TfidfTransformer
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.pipeline import Pipeline
+
+    return Pipeline(
+        [
+            (
+                "hashing",
+                HashingVectorizer(
+                    n_features=n_features,
+                    ngram_range=(1, 2),
+                    alternate_sign=False,
+                    norm=None,
+                ),
+            ),
+            ("tfidf", TfidfTransformer(sublinear_tf=True)),
+            (
+                "classifier",
+                LogisticRegression(C=C, class_weight="balanced", max_iter=1000),
+            ),
+        ]
+    )
+
+
+def train_fast_model(
+    texts: Sequence[str], labels: Sequence[str], output_dir: str, **pipeline_kwargs
+):
+    """
+    Treina o modelo linear e salva em um diretório de modelo
+
+    Args:
+        texts: Textos de treino
+        labels: Labels textuais ("Produtivo"/"Improdutivo")
+        output_dir: Diretório de saída (model.joblib + configuração)
+        **pipeline_kwargs: Repassados para build_fast_pipeline
+
+    Returns:
+        FastLinearClassifier treinado
+    """
+    import joblib
+
+    pipeline = build_fast_pipeline(**pipeline_kwargs)
+    pipeline.fit(list(texts), list(labels))
+
+    os.makedirs(output_dir, exist_ok=True)
+    joblib.dump(pipeline, os.path.join(output_dir, FAST_MODEL_FILENAME))
+    with open(os.path.join(output_dir, FAST_MODEL_CONFIG), "w", encoding="utf-8") as f:
+        json.dump(
+            {
+                "labels": [str(label) for label in pipeline.classes_],
+                "train_samples": len(texts),
+                **pipeline_kwargs,
+            },
+            f,
+            indent=2,
+        )
+
+    logger.info(f"Modelo linear salvo em: {output_dir}")
+    return FastLinearClassifier(pipeline)
+
+
+class FastLinearClassifier:
+    """
+    Primeiro estágio da cascata
+
+    Args:
+        pipeline: Pipeline sklearn treinado por train_fast_model
+    """
+
+    def __init__(self, pipeline):
+        self.pipeline = pipeline
+        self.labels = [str(label) for label in pipeline.classes_]
+
+    @classmethod
+    def load(cls, model_dir: str) -> "FastLinearClassifier":
+        """
+        Carrega o modelo salvo por train_fast_model
+
+        Raises:
+            FileNotFoundError: Se o diretório não tiver o modelo
+        """
+        import joblib
+
+        path = os.path.join(model_dir, FAST_MODEL_FILENAME)
+        if not os.path.exists(path):
+            raise FileNotFoundError(
+                f"Modelo linear não encontrado em {path} "
+                "(gere com scripts/train_fast_model.py)"
+            )
+        return cls(joblib.load(path))
+
+    def predict_scores(self, texts: Sequence[str]) -> List[Dict[str, float]]:
+        """
+        Probabilidades por label, no formato de _scores_from_prediction
+
+        Args:
+            texts: Textos para classificar
+
+        Returns:
+            Lista de dicts label -> probabilidade, na ordem de entrada
+        """
+        if not texts:
+            return []
+        probabilities = self.pipeline.predict_proba(list(texts))
+        return [
+            {label: float(p) for label, p in zip(self.labels, row)}
+            for row in probabilities
+        ]
+
+
+def split_by_confidence(
+    scores: Sequence[Dict[str, float]], threshold: float
+) -> Tuple[List[int], List[int]]:
+    """
+    Separa os emails decididos pelo modelo linear dos que vão ao transformer
+
+    Args:
+        scores: Saída de FastLinearClassifier.predict_scores
+        threshold: Confiança mínima para aceitar a predição do modelo linear
+
+    Returns:
+        tuple: (índices decididos no primeiro estágio, índices incertos)
+    """
+    decided, uncertain = [], []
+    for i, item in enumerate(scores):
+        (decided if max(item.values()) >= threshold else uncertain).append(i)
+    return decided, uncertain
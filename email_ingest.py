@@ -0,0 +1,332 @@
+"""
+Leitura de emails em .eml, mbox e Maildir
+
+Os arquivos são lidos em streaming (mensagem a mensagem; um mbox nunca é
+carregado inteiro) e o parsing MIME, que é CPU-bound, é distribuído entre
+processos. Para cada mensagem são decodificados cabeçalhos e charsets e é
+escolhido o corpo text/plain (ou o text/html convertido em texto).
+"""
+
+import email
+import email.policy
+import html
+import logging
+import os
+import re
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from html.parser import HTMLParser
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+EMAIL_EXTENSIONS = {".eml": "eml", ".mbox": "mbox", ".mbx": "mbox"}
+# Linhas ">From " (e ">>From ", ...) são escapes do formato mboxrd
+_MBOX_ESCAPED_FROM = re.compile(rb"^>(>*From )")
+
+
+@dataclass
+class EmailRecord:
+    """Mensagem decodificada, pronta para classificação"""
+
+    source: str
+    message_id: str
+    subject: str
+    sender: str
+    date: str
+    body: str
+
+    @property
+    def text(self) -> str:
+        """Texto enviado ao classificador (assunto + corpo)"""
+        if self.subject:
+            return f"{self.subject}\n\n{self.body}"
+        return self.body
+
+    def to_dict(self) -> Dict:
+        record = asdict(self)
+        record["text"] = self.text
+        return record
+
+
+class _HTMLTextExtractor(HTMLParser):
+    """Converte HTML em texto, ignorando scripts/estilos"""
+
+    _BLOCK_TAGS = {"br", "p", "div", "tr", "li", "h1", "h2", "h3", "h4", "table"}
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts: List[str] = []
+        self._skip = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in ("script", "style", "head"):
+            self._skip += 1
+        elif tag in self._BLOCK_TAGS:
+            self.parts.append("\n")
+
+    def handle_endtag(self, tag):
+        if tag in ("script", "style", "head"):
+            self._skip = max(0, self._skip - 1)
+        elif tag in self._BLOCK_TAGS:
+            self.parts.append("\n")
+
+    def handle_data(self, data):
+        if not self._skip:
+            self.parts.append(data)
+
+
+def html_to_text(markup: str) -> str:
+    """
+    Extrai o texto visível de um corpo HTML
+
+    Args:
+        markup: Conteúdo HTML
+
+    Returns:
+        Texto com quebras de linha nos elementos de bloco
+    """
+    parser = _HTMLTextExtractor()
+    try:
+        parser.feed(markup)
+        parser.close()
+        text = "".join(parser.parts)
+    except Exception:
+        # HTML muito malformado: remover as tags na força bruta
+        text = html.unescape(re.sub(r"<[^>]+>", " ", markup))
+
+    lines = (" ".join(line.split()) for line in text.splitlines())
+    return "\n".join(line for line in lines if line)
+
+
+def _decode_part(part) -> str:
+    """Decodifica o conteúdo de uma parte, tolerando charsets inválidos"""
+    try:
+        return part.get_content()
+    except (LookupError, UnicodeDecodeError, AssertionError):
+        payload = part.get_payload(decode=True) or b""
+        for charset in (part.get_content_charset(), "utf-8", "cp1252"):
+            if not charset:
+                continue
+            try:
+                return payload.decode(charset)
+            except (LookupError, UnicodeDecodeError):
+                continue
+        return payload.decode("latin-1")
+
+
+def _header(message, name: str) -> str:
+    try:
+        value = message.get(name)
+    except Exception:
+        # Cabeçalho com codificação RFC 2047 inválida
+        value = message.get_all(name, failobj=[""])[0]
+    return " ".join(str(value or "").split())
+
+
+def parse_message(raw: bytes, source: str = "") -> EmailRecord:
+    """
+    Faz o parsing de uma mensagem RFC 822
+
+    Args:
+        raw: Bytes da mensagem
+        source: Origem (arquivo e posição), usada como id se não houver
+            Message-ID
+
+    Returns:
+        EmailRecord com o corpo text/plain ou, na falta dele, o HTML em texto
+    """
+    message = email.message_from_bytes(raw, policy=email.policy.default)
+
+    plain, markup = [], []
+    for part in message.walk():
+        if part.is_multipart() or part.get_content_disposition() == "attachment":
+            continue
+        content_type = part.get_content_type()
+        if content_type == "text/plain":
+            plain.append(_decode_part(part))
+        elif content_type == "text/html":
+            markup.append(_decode_part(part))
+
+    if plain:
+        body = "\n\n".join(text.strip() for text in plain)
+    else:
+        body = "\n\n".join(html_to_text(text) for text in markup)
+
+    return EmailRecord(
+        source=source,
+        message_id=_header(message, "Message-ID") or source,
+        subject=_header(message, "Subject"),
+        sender=_header(message, "From"),
+        date=_header(message, "Date"),
+        body=body.strip(),
+    )
+
+
+# === Leitura das mensagens brutas ===
+
+
+def iter_mbox(path: str) -> Iterator[bytes]:
+    """
+    Mensagens de um mbox, lidas linha a linha (memória limitada à mensagem)
+
+    Args:
+        path: Arquivo mbox (mboxo/mboxrd)
+
+    Yields:
+        Bytes de cada mensagem, sem a linha separadora "From "
+    """
+    lines: List[bytes] = []
+    previous_blank = True
+
+    with open(path, "rb") as f:
+        for line in f:
+            if line.startswith(b"From ") and previous_blank:
+                if lines:
+                    yield b"".join(lines)
+                lines = []
+                previous_blank = False
+                continue
+
+            previous_blank = line in (b"\n", b"\r\n")
+            lines.append(_MBOX_ESCAPED_FROM.sub(rb"\1", line))
+
+    if lines:
+        yield b"".join(lines)
+
+
+def is_maildir(path: str) -> bool:
+    """Diretório no formato Maildir (com cur/ e new/)"""
+    return os.path.isdir(os.path.join(path, "cur")) and os.path.isdir(
+        os.path.join(path, "new")
+    )
+
+
+def iter_maildir(path: str) -> Iterator[str]:
+    """
+    Arquivos de mensagem de um Maildir, incluindo subpastas Maildir++
+
+    Args:
+        path: Raiz do Maildir
+
+    Yields:
+        Caminhos dos arquivos em cur/ e new/ (tmp/ é ignorado)
+    """
+    for subdir in ("cur", "new"):
+        directory = os.path.join(path, subdir)
+        for name in sorted(os.listdir(directory)):
+            if not name.startswith("."):
+                yield os.path.join(directory, name)
+
+    for name in sorted(os.listdir(path)):
+        folder = os.path.join(path, name)
+        if name.startswith(".") and is_maildir(folder):
+            yield from iter_maildir(folder)
+
+
+def _is_mbox_file(path: str) -> bool:
+    with open(path, "rb") as f:
+        return f.readline().startswith(b"From ")
+
+
+def iter_raw_messages(
+    paths: Union[str, Iterable[str]],
+) -> Iterator[Tuple[str, bytes]]:
+    """
+    Mensagens brutas de arquivos .eml, mbox, Maildirs ou diretórios com eles
+
+    Args:
+        paths: Caminho ou lista de caminhos
+
+    Yields:
+        Tuplas (origem, bytes da mensagem)
+    """
+    for path in [paths] if isinstance(paths, str) else paths:
+        if os.path.isdir(path):
+            if is_maildir(path):
+                for message_path in iter_maildir(path):
+                    with open(message_path, "rb") as f:
+                        yield message_path, f.read()
+            else:
+                children = sorted(
+                    os.path.join(path, name)
+                    for name in os.listdir(path)
+                    if not name.startswith(".")
+                )
+                yield from iter_raw_messages(
+                    child
+                    for child in children
+                    if os.path.isdir(child)
+                    or os.path.splitext(child)[1].lower() in EMAIL_EXTENSIONS
+                )
+        elif (
+            EMAIL_EXTENSIONS.get(os.path.splitext(path)[1].lower()) == "mbox"
+            or _is_mbox_file(path)
+        ):
+            for index, raw in enumerate(iter_mbox(path)):
+                yield f"{path}#{index}", raw
+        else:
+            with open(path, "rb") as f:
+                yield path, f.read()
+
+
+# === Parsing em paralelo ===
+
+
+def _parse_chunk(chunk: List[Tuple[str, bytes]]) -> List[EmailRecord]:
+    records = []
+    for source, raw in chunk:
+        try:
+            records.append(parse_message(raw, source))
+        except Exception as e:
+            # Registro vazio em vez de descartar: mantém a contagem de
+            # mensagens alinhada com o offset de retomada
+            logger.warning(f"Mensagem ilegível ({source}): {e}")
+            records.append(EmailRecord(source, source, "", "", "", ""))
+    return records
+
+
+def iter_emails(
+    paths: Union[str, Iterable[str]],
+    workers: int = 0,
+    chunk_size: int = 64,
+    skip: int = 0,
+) -> Iterator[EmailRecord]:
+    """
+    Mensagens decodificadas, na ordem dos arquivos, com parsing paralelo
+
+    Apenas alguns blocos de mensagens ficam em memória por vez, de modo que
+    caixas de qualquer tamanho podem ser processadas.
+
+    Args:
+        paths: Arquivos .eml/mbox, Maildirs ou diretórios
+        workers: Processos de parsing (0 = no processo atual)
+        chunk_size: Mensagens por tarefa enviada aos processos
+        skip: Mensagens iniciais a pular sem parsing (retomada)
+
+    Yields:
+        EmailRecord de cada mensagem (corpo vazio se ilegível)
+    """
+    raw_messages = islice(iter_raw_messages(paths), skip, None)
+    chunks = iter(lambda: list(islice(raw_messages, chunk_size)), [])
+
+    if workers <= 0:
+        for chunk in chunks:
+            yield from _parse_chunk(chunk)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(pool.submit(_parse_chunk, chunk))
+            if len(pending) >= workers * 2:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+def read_email_bytes(raw: bytes, source: str = "") -> str:
+    """Texto (assunto + corpo) de um único arquivo .eml"""
+    return parse_message(raw, source).text
@@ -0,0 +1,225 @@
+"""
+Agregados incrementais do histórico de predições (dashboard)
+
+Em vez de reler o histórico a cada rerun do Streamlit, a thread de escrita
+do histórico (history_store.HistoryWriter) soma cada lote gravado em
+contadores por intervalo de tempo (bucket): total, predições por
+categoria, correções por regra, traduções, histograma de confiança e
+latência. Os contadores ficam em SQLite (UPSERT com soma), compartilhados
+por todos os workers, e buckets antigos são descartados. Ler uma janela
+custa o mesmo independentemente do tamanho do histórico: apenas os
+buckets da janela são consultados.
+"""
+
+import logging
+import math
+import os
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+AGGREGATES_FILENAME = "aggregates.sqlite"
+# Configurações (sobrescrevíveis por variáveis de ambiente)
+AGGREGATE_BUCKET_SECONDS = int(os.getenv("HISTORY_BUCKET_SECONDS", "3600"))
+AGGREGATE_RETENTION_BUCKETS = int(os.getenv("HISTORY_RETENTION_BUCKETS", "2160"))
+CONFIDENCE_BINS = 10
+
+# Métricas guardadas por bucket
+METRIC_TOTAL = "total"
+METRIC_CORRECTIONS = "corrections"
+METRIC_TRANSLATIONS = "translations"
+METRIC_LATENCY_SUM = "latency_ms_sum"
+METRIC_LATENCY_COUNT = "latency_ms_count"
+PREDICTION_PREFIX = "prediction:"
+CONFIDENCE_PREFIX = "confidence_bin:"
+
+
+def confidence_bin(confidence: float) -> int:
+    """Índice do bin de confiança (0..CONFIDENCE_BINS-1)"""
+    if confidence is None or math.isnan(confidence):
+        return 0
+    return min(CONFIDENCE_BINS - 1, max(0, int(confidence * CONFIDENCE_BINS)))
+
+
+class HistoryAggregates:
+    """
+    Contadores por bucket de tempo mantidos a cada lote do histórico
+
+    Args:
+        path: Arquivo SQLite dos agregados
+        bucket_seconds: Largura de cada bucket
+        retention_buckets: Buckets mantidos (os mais antigos são apagados)
+    """
+
+    def __init__(
+        self,
+        path: str,
+        bucket_seconds: int = AGGREGATE_BUCKET_SECONDS,
+        retention_buckets: int = AGGREGATE_RETENTION_BUCKETS,
+    ):
+        self.path = path
+        self.bucket_seconds = bucket_seconds
+        self.retention_buckets = retention_buckets
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        with self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS buckets ("
+                "bucket INTEGER NOT NULL, metric TEXT NOT NULL, "
+                "value REAL NOT NULL, PRIMARY KEY (bucket, metric))"
+            )
+
+    def bucket_of(self, timestamp: float) -> int:
+        """Início (epoch) do bucket que contém o timestamp"""
+        return int(timestamp // self.bucket_seconds) * self.bucket_seconds
+
+    def update(self, records: Iterable[Dict]):
+        """
+        Soma um lote de registros aos contadores (uma transação por lote)
+
+        Args:
+            records: Registros no formato de history_store.make_record
+        """
+        deltas: Dict = defaultdict(float)
+        for record in records:
+            bucket = self.bucket_of(record["timestamp"])
+            deltas[bucket, METRIC_TOTAL] += 1
+            deltas[bucket, PREDICTION_PREFIX + str(record["prediction"])] += 1
+            confidence = confidence_bin(record["confidence"])
+            deltas[bucket, f"{CONFIDENCE_PREFIX}{confidence}"] += 1
+            if record.get("correction_applied"):
+                deltas[bucket, METRIC_CORRECTIONS] += 1
+            if record.get("translation_applied"):
+                deltas[bucket, METRIC_TRANSLATIONS] += 1
+            if record.get("latency_ms") is not None:
+                deltas[bucket, METRIC_LATENCY_SUM] += record["latency_ms"]
+                deltas[bucket, METRIC_LATENCY_COUNT] += 1
+        if not deltas:
+            return
+
+        retention = self.retention_buckets * self.bucket_seconds
+        oldest = self.bucket_of(time.time()) - retention
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO buckets (bucket, metric, value) VALUES (?, ?, ?) "
+                "ON CONFLICT (bucket, metric) DO UPDATE "
+                "SET value = value + excluded.value",
+                [(bucket, metric, value) for (bucket, metric), value in deltas.items()],
+            )
+            self._conn.execute("DELETE FROM buckets WHERE bucket < ?", (oldest,))
+
+    def window(self, seconds: float, now: Optional[float] = None) -> List[Dict]:
+        """
+        Buckets das últimas `seconds`, em ordem cronológica
+
+        Args:
+            seconds: Tamanho da janela
+            now: Fim da janela (padrão: agora)
+
+        Returns:
+            Lista de dicts {"bucket": epoch, "<métrica>": valor, ...}
+            (apenas buckets com predições)
+        """
+        now = time.time() if now is None else now
+        start = self.bucket_of(now - seconds)
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT bucket, metric, value FROM buckets "
+                "WHERE bucket >= ? AND bucket <= ? ORDER BY bucket",
+                (start, now),
+            ).fetchall()
+
+        buckets: Dict[int, Dict] = {}
+        for bucket, metric, value in rows:
+            buckets.setdefault(bucket, {"bucket": bucket})[metric] = value
+        return list(buckets.values())
+
+    def clear(self):
+        """Apaga todos os contadores (antes de um backfill)"""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM buckets")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def summarize(buckets: List[Dict]) -> Dict:
+    """
+    Totais de uma janela (saída de HistoryAggregates.window)
+
+    Returns:
+        dict com total, contagem por categoria, taxas de correção e de
+        tradução, latência média e histograma de confiança
+    """
+    total = sum(bucket.get(METRIC_TOTAL, 0) for bucket in buckets)
+    predictions: Dict[str, float] = defaultdict(float)
+    histogram = [0.0] * CONFIDENCE_BINS
+    totals: Dict[str, float] = defaultdict(float)
+    for bucket in buckets:
+        for metric, value in bucket.items():
+            if metric.startswith(PREDICTION_PREFIX):
+                predictions[metric[len(PREDICTION_PREFIX) :]] += value
+            elif metric.startswith(CONFIDENCE_PREFIX):
+                histogram[int(metric[len(CONFIDENCE_PREFIX) :])] += value
+            elif metric != "bucket":
+                totals[metric] += value
+
+    def rate(count: float) -> float:
+        return count / total if total else 0.0
+
+    latency_count = totals[METRIC_LATENCY_COUNT]
+    return {
+        "total": int(total),
+        "predictions": {label: int(count) for label, count in predictions.items()},
+        "correction_rate": rate(totals[METRIC_CORRECTIONS]),
+        "translation_rate": rate(totals[METRIC_TRANSLATIONS]),
+        "avg_latency_ms": (
+            totals[METRIC_LATENCY_SUM] / latency_count if latency_count else None
+        ),
+        "confidence_histogram": [int(count) for count in histogram],
+    }
+
+
+def backfill(aggregates: HistoryAggregates, root: str) -> int:
+    """
+    Reconstrói os contadores a partir do histórico gravado
+
+    Só é necessário após importar registros antigos (ex: o CSV legado) ou
+    apagar o arquivo de agregados; no uso normal eles são incrementais.
+
+    Args:
+        aggregates: Agregados a reconstruir (são apagados antes)
+        root: Diretório do histórico
+
+    Returns:
+        Número de registros somados
+    """
+    from history_store import query_history
+
+    table = query_history(
+        root,
+        columns=[
+            "timestamp",
+            "prediction",
+            "confidence",
+            "latency_ms",
+            "correction_applied",
+            "translation_applied",
+        ],
+    )
+    records = table.to_pylist()
+    for record in records:
+        record["timestamp"] = record["timestamp"].timestamp()
+
+    aggregates.clear()
+    aggregates.update(records)
+    return len(records)
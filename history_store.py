@@ -0,0 +1,576 @@
+"""
+Histórico de predições: escrita append-only em lote e compactação colunar
+
+O caminho de classificação apenas enfileira o registro (put_nowait, nunca
+bloqueia; com a fila cheia o registro é descartado e contado). Uma thread
+de fundo grava a fila em lotes em segmentos JSONL próprios de cada processo,
+de modo que vários workers escrevem ao mesmo tempo sem disputar arquivos.
+Os segmentos são rotacionados por tempo e por tamanho; os selados são
+compactados periodicamente em Parquet particionado por dia:
+
+    HISTORY_DIR/
+        segments/active-<inicio>-<pid>-<seq>.jsonl   (em escrita)
+        segments/<inicio>-<pid>-<seq>.jsonl          (selado, aguardando compactação)
+        parquet/day=2025-09-02/part-<inicio>-<pid>-<seq>.parquet
+
+query_history lê apenas as colunas pedidas e as partições (dias) do
+intervalo. Cada lote gravado também atualiza os contadores do dashboard
+(history_aggregates). A compactação e a consulta requerem pyarrow; a escrita não.
+"""
+
+import atexit
+import datetime
+import glob
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from typing import Dict, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+# Configurações (sobrescrevíveis por variáveis de ambiente; HISTORY_DIR=""
+# desativa o histórico)
+HISTORY_DIR = os.getenv("HISTORY_DIR", "data/history")
+HISTORY_QUEUE_SIZE = int(os.getenv("HISTORY_QUEUE_SIZE", "10000"))
+HISTORY_FLUSH_INTERVAL = float(os.getenv("HISTORY_FLUSH_INTERVAL", "1.0"))
+HISTORY_ROTATE_SECONDS = float(os.getenv("HISTORY_ROTATE_SECONDS", "3600"))
+HISTORY_ROTATE_BYTES = int(os.getenv("HISTORY_ROTATE_BYTES", str(64 * 1024 * 1024)))
+# Intervalo entre compactações automáticas (0 desativa; use então
+# scripts/compact_history.py em um cron)
+HISTORY_COMPACT_INTERVAL = float(os.getenv("HISTORY_COMPACT_INTERVAL", "3600"))
+HISTORY_PREVIEW_CHARS = 100
+
+SEGMENTS_DIR = "segments"
+PARQUET_DIR = "parquet"
+ACTIVE_PREFIX = "active-"
+COMPACT_LOCK = ".compact.lock"
+# Segmentos ativos sem escrita há mais que isto são de processos encerrados
+STALE_SEGMENT_SECONDS = 2 * HISTORY_ROTATE_SECONDS
+
+# Colunas do histórico (as mesmas do antigo data/email_history.csv + extras)
+HISTORY_COLUMNS = [
+    "timestamp",
+    "text_preview",
+    "prediction",
+    "score",
+    "confidence",
+    "method",
+    "latency_ms",
+    "worker",
+    "language",
+    "translation_applied",
+    "correction_applied",
+]
+
+
+def make_record(
+    text: str,
+    prediction: str,
+    confidence: float,
+    method: str = "",
+    latency_ms: Optional[float] = None,
+    timestamp: Optional[float] = None,
+    language: Optional[str] = None,
+    translation_applied: Optional[bool] = None,
+    correction_applied: Optional[bool] = None,
+) -> Dict:
+    """
+    Monta um registro do histórico
+
+    Args:
+        text: Texto classificado (apenas um prefixo é guardado)
+        prediction: Categoria final
+        confidence: Confiança da predição
+        method: Método/estágio que decidiu a predição
+        latency_ms: Tempo de classificação em ms
+        timestamp: Epoch em segundos (padrão: agora)
+        language: Idioma detectado
+        translation_applied: Se o texto foi traduzido antes do modelo
+        correction_applied: Se a correção por palavras-chave mudou a predição
+
+    Returns:
+        Dict com as colunas de HISTORY_COLUMNS
+    """
+    return {
+        "timestamp": time.time() if timestamp is None else timestamp,
+        "text_preview": " ".join(text.split())[:HISTORY_PREVIEW_CHARS],
+        "prediction": prediction,
+        "score": prediction,
+        "confidence": float(confidence),
+        "method": method,
+        "latency_ms": None if latency_ms is None else float(latency_ms),
+        "worker": os.getpid(),
+        "language": language,
+        "translation_applied": translation_applied,
+        "correction_applied": correction_applied,
+    }
+
+
+def _day(timestamp: float) -> str:
+    return datetime.datetime.fromtimestamp(
+        timestamp, tz=datetime.timezone.utc
+    ).strftime("%Y-%m-%d")
+
+
+def _segment_stamp(timestamp: float) -> str:
+    return datetime.datetime.fromtimestamp(
+        timestamp, tz=datetime.timezone.utc
+    ).strftime("%Y%m%dT%H%M%S")
+
+
+class HistoryWriter:
+    """
+    Escritor do histórico de um processo (não bloqueante)
+
+    Args:
+        root: Diretório do histórico
+        queue_size: Registros pendentes antes de começar a descartar
+        flush_interval: Espera máxima (s) até um lote ser gravado
+        rotate_seconds: Idade máxima de um segmento antes de ser selado
+        rotate_bytes: Tamanho máximo de um segmento antes de ser selado
+        compact_interval: Intervalo (s) entre compactações em segundo
+            plano (0 desativa)
+        aggregates: HistoryAggregates atualizado a cada lote gravado
+    """
+
+    def __init__(
+        self,
+        root: str = HISTORY_DIR,
+        queue_size: int = HISTORY_QUEUE_SIZE,
+        flush_interval: float = HISTORY_FLUSH_INTERVAL,
+        rotate_seconds: float = HISTORY_ROTATE_SECONDS,
+        rotate_bytes: int = HISTORY_ROTATE_BYTES,
+        compact_interval: float = HISTORY_COMPACT_INTERVAL,
+        aggregates=None,
+    ):
+        self.root = root
+        self.aggregates = aggregates
+        self.flush_interval = flush_interval
+        self.rotate_seconds = rotate_seconds
+        self.rotate_bytes = rotate_bytes
+        self.compact_interval = compact_interval
+        self.segments_dir = os.path.join(root, SEGMENTS_DIR)
+        os.makedirs(self.segments_dir, exist_ok=True)
+
+        self.written = 0
+        self.dropped = 0
+        self._queue: "queue.Queue[Optional[Dict]]" = queue.Queue(maxsize=queue_size)
+        self._file = None
+        self._segment_path: Optional[str] = None
+        self._segment_started = 0.0
+        self._segment_seq = 0
+        self._stop = threading.Event()
+        self._flushed = threading.Condition()
+        self._pending = 0
+
+        self._thread = threading.Thread(
+            target=self._run, name="history-writer", daemon=True
+        )
+        self._thread.start()
+        self._compactor = None
+        if compact_interval > 0:
+            self._compactor = threading.Thread(
+                target=self._compact_loop, name="history-compactor", daemon=True
+            )
+            self._compactor.start()
+        atexit.register(self.close)
+
+    def record(self, record: Dict) -> bool:
+        """
+        Enfileira um registro sem bloquear
+
+        Args:
+            record: Registro (ver make_record)
+
+        Returns:
+            True se foi enfileirado; False se a fila estava cheia ou o
+            escritor já foi fechado (o registro é descartado)
+        """
+        if self._stop.is_set():
+            return False
+        with self._flushed:
+            self._pending += 1
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            with self._flushed:
+                self._pending -= 1
+            self.dropped += 1
+            return False
+        return True
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Espera a fila atual ser gravada em disco (para testes e scripts)"""
+        deadline = time.monotonic() + timeout
+        with self._flushed:
+            while self._pending > 0:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._flushed.wait(remaining)
+        return True
+
+    def close(self):
+        """Grava o que estiver pendente e sela o segmento atual"""
+        if self._stop.is_set():
+            return
+        self._stop.set()
+        try:
+            self._queue.put(None, timeout=1)
+        except queue.Full:
+            pass  # a thread encerra ao ver _stop após esvaziar a fila
+        self._thread.join(timeout=10)
+
+    def _drain(self) -> List[Dict]:
+        """Bloqueia até o primeiro registro e junta o que mais estiver na fila"""
+        try:
+            first = self._queue.get(timeout=self.flush_interval)
+        except queue.Empty:
+            return []
+        batch = [first]
+        while True:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                return batch
+
+    def _run(self):
+        while True:
+            batch = self._drain()
+            stopping = None in batch or (self._stop.is_set() and not batch)
+            records = [record for record in batch if record is not None]
+
+            if records:
+                try:
+                    self._write(records)
+                except Exception as e:
+                    # O histórico nunca derruba a classificação
+                    logger.warning(f"Falha ao gravar histórico: {e}")
+                    self.dropped += len(records)
+                else:
+                    self._update_aggregates(records)
+                with self._flushed:
+                    self._pending -= len(records)
+                    self._flushed.notify_all()
+
+            if self._file is not None and (
+                stopping
+                or time.time() - self._segment_started >= self.rotate_seconds
+                or self._file.tell() >= self.rotate_bytes
+            ):
+                self._seal()
+            if stopping:
+                return
+
+    def _update_aggregates(self, records: List[Dict]):
+        if self.aggregates is None:
+            return
+        try:
+            self.aggregates.update(records)
+        except Exception as e:
+            logger.warning(f"Falha ao atualizar agregados do histórico: {e}")
+
+    def _write(self, records: List[Dict]):
+        if self._file is None:
+            self._segment_started = time.time()
+            # Sequência no nome: segmentos rotacionados no mesmo segundo
+            self._segment_seq += 1
+            name = (
+                f"{_segment_stamp(self._segment_started)}-{os.getpid()}-"
+                f"{self._segment_seq:04d}.jsonl"
+            )
+            self._segment_path = os.path.join(self.segments_dir, ACTIVE_PREFIX + name)
+            self._file = open(self._segment_path, "a", encoding="utf-8")
+
+        self._file.write(
+            "".join(json.dumps(record, ensure_ascii=False) + "\n" for record in records)
+        )
+        self._file.flush()
+        self.written += len(records)
+
+    def _seal(self):
+        """Fecha o segmento atual e o renomeia (libera para compactação)"""
+        self._file.close()
+        self._file = None
+        directory, name = os.path.split(self._segment_path)
+        sealed = os.path.join(directory, name[len(ACTIVE_PREFIX) :])
+        os.replace(self._segment_path, sealed)
+        self._segment_path = None
+
+    def _compact_loop(self):
+        while not self._stop.wait(self.compact_interval):
+            try:
+                compact_history(self.root)
+            except Exception as e:
+                logger.warning(f"Falha na compactação do histórico: {e}")
+
+
+def _acquire_compact_lock(root: str):
+    """Lock exclusivo entre processos; None se outro compactador está ativo"""
+    handle = open(os.path.join(root, COMPACT_LOCK), "a")
+    try:
+        import fcntl
+    except ImportError:  # Windows: sem lock entre processos
+        return handle
+    try:
+        fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        handle.close()
+        return None
+    return handle
+
+
+def _read_segment(path: str) -> List[Dict]:
+    records = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                # Linha truncada (processo encerrado no meio da escrita)
+                continue
+    return records
+
+
+def _history_schema():
+    import pyarrow as pa
+
+    return pa.schema(
+        [
+            ("timestamp", pa.timestamp("ms", tz="UTC")),
+            ("text_preview", pa.string()),
+            ("prediction", pa.string()),
+            ("score", pa.string()),
+            ("confidence", pa.float64()),
+            ("method", pa.string()),
+            ("latency_ms", pa.float64()),
+            ("worker", pa.int64()),
+            ("language", pa.string()),
+            ("translation_applied", pa.bool_()),
+            ("correction_applied", pa.bool_()),
+        ]
+    )
+
+
+def _records_to_table(records: Sequence[Dict]):
+    import pyarrow as pa
+
+    columns = {
+        column: [record.get(column) for record in records]
+        for column in HISTORY_COLUMNS
+    }
+    columns["timestamp"] = [
+        datetime.datetime.fromtimestamp(ts, tz=datetime.timezone.utc)
+        for ts in columns["timestamp"]
+    ]
+    return pa.Table.from_pydict(columns, schema=_history_schema())
+
+
+def compact_history(
+    root: str = HISTORY_DIR, stale_seconds: float = STALE_SEGMENT_SECONDS
+) -> Dict[str, int]:
+    """
+    Compacta os segmentos selados em Parquet particionado por dia
+
+    Cada segmento vira um arquivo por dia (part-<segmento>.parquet), gravado
+    de forma atômica antes de o segmento ser apagado; reexecutar após uma
+    falha apenas reescreve os mesmos arquivos. Segmentos ativos abandonados
+    (sem escrita há stale_seconds) são selados antes.
+
+    Args:
+        root: Diretório do histórico
+        stale_seconds: Idade a partir da qual um segmento ativo é abandonado
+
+    Returns:
+        dict com segments, records e files gravados (zeros se outro processo
+        estiver compactando)
+    """
+    import pyarrow.parquet as pq
+
+    stats = {"segments": 0, "records": 0, "files": 0}
+    segments_dir = os.path.join(root, SEGMENTS_DIR)
+    if not os.path.isdir(segments_dir):
+        return stats
+
+    lock = _acquire_compact_lock(root)
+    if lock is None:
+        logger.info("Compactação já em andamento em outro processo")
+        return stats
+
+    try:
+        now = time.time()
+        for path in glob.glob(os.path.join(segments_dir, ACTIVE_PREFIX + "*.jsonl")):
+            if now - os.path.getmtime(path) >= stale_seconds:
+                name = os.path.basename(path)[len(ACTIVE_PREFIX) :]
+                os.replace(path, os.path.join(segments_dir, name))
+
+        for path in sorted(glob.glob(os.path.join(segments_dir, "*.jsonl"))):
+            name = os.path.basename(path)
+            if name.startswith(ACTIVE_PREFIX):
+                continue
+
+            by_day: Dict[str, List[Dict]] = {}
+            for record in _read_segment(path):
+                by_day.setdefault(_day(record["timestamp"]), []).append(record)
+
+            for day, records in by_day.items():
+                partition = os.path.join(root, PARQUET_DIR, f"day={day}")
+                os.makedirs(partition, exist_ok=True)
+                stem = name[: -len(".jsonl")]
+                target = os.path.join(partition, f"part-{stem}.parquet")
+                records.sort(key=lambda record: record["timestamp"])
+                pq.write_table(_records_to_table(records), target + ".tmp")
+                os.replace(target + ".tmp", target)
+                stats["files"] += 1
+                stats["records"] += len(records)
+
+            os.remove(path)
+            stats["segments"] += 1
+    finally:
+        lock.close()
+
+    if stats["segments"]:
+        logger.info(
+            f"Histórico compactado: {stats['segments']} segmentos, "
+            f"{stats['records']} registros"
+        )
+    return stats
+
+
+def _as_datetime(value) -> Optional[datetime.datetime]:
+    """Aceita datetime, date, epoch ou string ISO; sem fuso = UTC"""
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return datetime.datetime.fromtimestamp(value, tz=datetime.timezone.utc)
+    if isinstance(value, str):
+        value = datetime.datetime.fromisoformat(value)
+    elif isinstance(value, datetime.date) and not isinstance(value, datetime.datetime):
+        value = datetime.datetime.combine(value, datetime.time())
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=datetime.timezone.utc)
+    return value
+
+
+def query_history(
+    root: str = HISTORY_DIR,
+    columns: Optional[Sequence[str]] = None,
+    start=None,
+    end=None,
+    include_segments: bool = True,
+):
+    """
+    Consulta o histórico lendo apenas as colunas e os dias necessários
+
+    Args:
+        root: Diretório do histórico
+        columns: Colunas desejadas (padrão: todas)
+        start: Início do intervalo, inclusivo (datetime, date, epoch ou ISO)
+        end: Fim do intervalo, exclusivo
+        include_segments: Incluir os registros ainda não compactados
+
+    Returns:
+        pyarrow.Table ordenada por timestamp
+    """
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.dataset as ds
+
+    columns = list(columns or HISTORY_COLUMNS)
+    unknown = set(columns) - set(HISTORY_COLUMNS)
+    if unknown:
+        raise ValueError(f"Colunas desconhecidas: {sorted(unknown)}")
+    # O filtro de intervalo precisa do timestamp mesmo se ele não for pedido
+    read_columns = columns if "timestamp" in columns else columns + ["timestamp"]
+    start, end = _as_datetime(start), _as_datetime(end)
+
+    timestamp_type = pa.timestamp("ms", "UTC")
+    row_filter = None
+    if start is not None:
+        row_filter = ds.field("timestamp") >= pa.scalar(start, timestamp_type)
+    if end is not None:
+        condition = ds.field("timestamp") < pa.scalar(end, timestamp_type)
+        row_filter = condition if row_filter is None else row_filter & condition
+
+    tables = []
+    parquet_dir = os.path.join(root, PARQUET_DIR)
+    if os.path.isdir(parquet_dir):
+        # Poda de partições: só os diretórios day=... do intervalo são abertos
+        days = []
+        for entry in sorted(os.listdir(parquet_dir)):
+            if not entry.startswith("day="):
+                continue
+            day = entry[len("day=") :]
+            if start is not None and day < start.strftime("%Y-%m-%d"):
+                continue
+            if end is not None and day > end.strftime("%Y-%m-%d"):
+                continue
+            days.append(os.path.join(parquet_dir, entry))
+        files = [
+            path
+            for day in days
+            for path in sorted(glob.glob(os.path.join(day, "*.parquet")))
+        ]
+        if files:
+            dataset = ds.dataset(files, schema=_history_schema(), format="parquet")
+            tables.append(dataset.to_table(columns=read_columns, filter=row_filter))
+
+    if include_segments:
+        records = []
+        for path in glob.glob(os.path.join(root, SEGMENTS_DIR, "*.jsonl")):
+            try:
+                records.extend(_read_segment(path))
+            except FileNotFoundError:  # compactado durante a leitura
+                continue
+        if records:
+            table = _records_to_table(records).select(read_columns)
+            if row_filter is not None:
+                table = ds.dataset(table).to_table(filter=row_filter)
+            tables.append(table)
+
+    if not tables:
+        return _history_schema().empty_table().select(columns)
+
+    table = pa.concat_tables(tables)
+    table = table.take(pc.sort_indices(table, [("timestamp", "ascending")]))
+    return table.select(columns)
+
+
+_WRITER: Optional[HistoryWriter] = None
+_WRITER_LOCK = threading.Lock()
+
+
+def get_history_writer() -> Optional[HistoryWriter]:
+    """Escritor compartilhado do processo (None se HISTORY_DIR estiver vazio)"""
+    global _WRITER
+    if not HISTORY_DIR:
+        return None
+    with _WRITER_LOCK:
+        if _WRITER is None:
+            from history_aggregates import AGGREGATES_FILENAME, HistoryAggregates
+
+            aggregates = HistoryAggregates(
+                os.path.join(HISTORY_DIR, AGGREGATES_FILENAME)
+            )
+            _WRITER = HistoryWriter(HISTORY_DIR, aggregates=aggregates)
+        return _WRITER
+
+
+def record_prediction(text: str, prediction: str, confidence: float, **kwargs) -> bool:
+    """
+    Atalho: registra uma predição com o escritor compartilhado
+
+    Nunca lança exceção nem bloqueia; devolve False se o registro não foi
+    enfileirado (histórico desativado, fila cheia ou erro).
+    """
+    try:
+        writer = get_history_writer()
+        if writer is None:
+            return False
+        return writer.record(make_record(text, prediction, confidence, **kwargs))
+    except Exception as e:
+        logger.warning(f"Histórico indisponível: {e}")
+        return False
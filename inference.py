@@ -1,22 +1,40 @@
 import os
 import torch
 from transformers import AutoTokenizer, AutoModelForSequenceClassification
-from typing import Tuple, Dict, Any
+from typing import Tuple, Dict, Any, List, Optional
 import logging
 
+from onnx_backend import INFERENCE_BACKEND, OnnxSequenceClassifier
+from quantization import is_quantized_dir, load_quantized_model
+from text_budget import (
+    clip_head_tail,
+    encode_with_budget,
+    special_tokens,
+    split_windows,
+    strip_signature,
+)
+
 # Configurar logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Temperatura da agregação "attention" em run_chunked_inference: quanto
+# menor, mais o resultado segue as janelas de maior confiança
+CHUNK_ATTENTION_TEMPERATURE = 0.1
+
 
 def load_model(
     model_dir: str,
+    backend: Optional[str] = None,
 ) -> Tuple[AutoTokenizer, AutoModelForSequenceClassification]:
     """
     Carrega o tokenizer e modelo do diretório ou Hugging Face Hub
 
     Args:
         model_dir: Caminho local ou nome do modelo no HF Hub (ex: 'usuario/repositorio')
+        backend: "pytorch" ou "onnx" (padrão: variável INFERENCE_BACKEND).
+            O backend ONNX usa <model_dir>/onnx/model.onnx. Diretórios
+            gerados por scripts/quantize_model.py são detectados automaticamente
 
     Returns:
         Tuple contendo (tokenizer, model)
@@ -55,7 +73,14 @@ def load_model(
             tokenizer = AutoTokenizer.from_pretrained(model_dir)
 
             # Carregar modelo
-            model = AutoModelForSequenceClassification.from_pretrained(model_dir)
+            if is_quantized_dir(model_dir):
+                logger.info("Usando modelo quantizado (INT8)")
+                model = load_quantized_model(model_dir)
+            elif (backend or INFERENCE_BACKEND) == "onnx":
+                logger.info("Usando backend ONNX Runtime")
+                model = OnnxSequenceClassifier(model_dir)
+            else:
+                model = AutoModelForSequenceClassification.from_pretrained(model_dir)
 
         logger.info("Modelo carregado com sucesso")
 
@@ -75,6 +100,38 @@ def load_model(
         raise
 
 
+def pad_input_ids(tokenizer: AutoTokenizer, input_ids: List[List[int]]) -> Dict:
+    """
+    Monta os tensores do modelo a partir de input_ids já tokenizados
+
+    Equivale a tokenizer.pad(..., return_tensors="pt"), sem o custo por
+    chamada dele (que passa do da própria tokenização em emails curtos).
+
+    Args:
+        tokenizer: Tokenizer do modelo (pad_token_id e padding_side)
+        input_ids: Tokens de cada texto, com tokens especiais
+
+    Returns:
+        dict com input_ids e attention_mask ([len(input_ids), maior texto])
+    """
+    length = max(len(ids) for ids in input_ids)
+    pad_id = tokenizer.pad_token_id or 0
+    left = tokenizer.padding_side == "left"
+    padded, mask = [], []
+    for ids in input_ids:
+        padding = length - len(ids)
+        if left:
+            padded.append([pad_id] * padding + ids)
+            mask.append([0] * padding + [1] * len(ids))
+        else:
+            padded.append(ids + [pad_id] * padding)
+            mask.append([1] * len(ids) + [0] * padding)
+    return {
+        "input_ids": torch.tensor(padded, dtype=torch.long),
+        "attention_mask": torch.tensor(mask, dtype=torch.long),
+    }
+
+
 def run_inference(
     tokenizer: AutoTokenizer, model: AutoModelForSequenceClassification, text: str
 ) -> Tuple[str, float, Dict[int, float]]:
@@ -96,10 +153,8 @@ def run_inference(
         # Mapeamento de IDs para labels
         id2label = {0: "Improdutivo", 1: "Produtivo"}
 
-        # Tokenizar texto
-        inputs = tokenizer(
-            text, truncation=True, padding=True, max_length=512, return_tensors="pt"
-        )
+        # Tokenizar uma única vez (início + final dentro de 512 tokens)
+        inputs = pad_input_ids(tokenizer, encode_with_budget(tokenizer, [text]))
 
         # Executar inferência
         with torch.no_grad():
@@ -131,21 +186,215 @@ def run_inference(
         raise
 
 
+def _forward_probabilities(
+    tokenizer: AutoTokenizer,
+    model: AutoModelForSequenceClassification,
+    encodings: List[List[int]],
+    batch_size: int,
+) -> torch.Tensor:
+    """
+    Executa o modelo sobre input_ids já tokenizados, em lotes por tamanho
+
+    Returns:
+        Tensor [len(encodings), num_classes] com as probabilidades, na ordem
+        de entrada (vazio, [0, num_classes], sem encodings)
+    """
+    if not encodings:
+        return torch.empty((0, model.config.num_labels))
+
+    order = sorted(range(len(encodings)), key=lambda i: len(encodings[i]))
+    probabilities = None
+
+    for start in range(0, len(order), batch_size):
+        bucket = order[start : start + batch_size]
+        inputs = pad_input_ids(tokenizer, [encodings[i] for i in bucket])
+        # Pipelines do app podem estar em GPU; o backend ONNX não tem device
+        device = getattr(model, "device", None)
+        if device is not None:
+            inputs = {name: tensor.to(device) for name, tensor in inputs.items()}
+
+        with torch.no_grad():
+            bucket_probabilities = torch.softmax(model(**inputs).logits, dim=1)
+
+        if probabilities is None:
+            probabilities = bucket_probabilities.new_empty(
+                (len(encodings), bucket_probabilities.shape[1])
+            )
+        probabilities[bucket] = bucket_probabilities
+
+    return probabilities
+
+
+def _to_result(probabilities: torch.Tensor) -> Tuple[str, float, Dict[int, float]]:
+    """Converte as probabilidades de um texto em (prediction, confidence, scores)"""
+    id2label = {0: "Improdutivo", 1: "Produtivo"}
+
+    predicted_class = torch.argmax(probabilities).item()
+    scores = {
+        0: probabilities[0].item(),  # Improdutivo
+        1: probabilities[1].item(),  # Produtivo
+    }
+    return id2label[predicted_class], scores[predicted_class], scores
+
+
+def run_batch_inference(
+    tokenizer: AutoTokenizer,
+    model: AutoModelForSequenceClassification,
+    texts: List[str],
+    batch_size: int = 32,
+) -> List[Tuple[str, float, Dict[int, float]]]:
+    """
+    Executa inferência em vários textos, agrupando-os em lotes
+
+    Os textos são ordenados por tamanho em tokens para que cada lote tenha
+    padding mínimo; os resultados são devolvidos na ordem de entrada.
+
+    Args:
+        tokenizer: Tokenizer carregado
+        model: Modelo carregado
+        texts: Textos para classificar
+        batch_size: Quantidade de textos por forward pass
+
+    Returns:
+        Lista de tuplas (prediction, confidence, scores), como em run_inference
+    """
+    try:
+        # Tokenizar uma única vez, sem padding (aplicado por lote)
+        encodings = encode_with_budget(tokenizer, texts)
+        probabilities = _forward_probabilities(tokenizer, model, encodings, batch_size)
+
+        logger.info(f"Classificação em lote concluída: {len(texts)} textos")
+
+        return [_to_result(row) for row in probabilities]
+
+    except Exception as e:
+        logger.error(f"Erro durante inferência em lote: {e}")
+        raise
+
+
+def _aggregate_windows(
+    probabilities: torch.Tensor, lengths: List[int], aggregation: str
+) -> torch.Tensor:
+    """
+    Combina as probabilidades das janelas de um documento
+
+    Args:
+        probabilities: Tensor [janelas, num_classes]
+        lengths: Número de tokens de cada janela
+        aggregation: "max", "mean" ou "attention"
+
+    Returns:
+        Tensor [num_classes] com probabilidades que somam 1
+    """
+    if aggregation == "max":
+        # Cada classe recebe a evidência mais forte encontrada em qualquer janela
+        combined = probabilities.max(dim=0).values
+        return combined / combined.sum()
+
+    if aggregation == "mean":
+        # Média ponderada pelo tamanho (a última janela costuma ser curta)
+        weights = torch.tensor(
+            lengths, dtype=probabilities.dtype, device=probabilities.device
+        )
+    elif aggregation == "attention":
+        # Janelas em que o modelo está mais seguro pesam mais
+        confidence = probabilities.max(dim=1).values
+        weights = torch.softmax(confidence / CHUNK_ATTENTION_TEMPERATURE, dim=0)
+    else:
+        raise ValueError(f"Agregação desconhecida: {aggregation}")
+
+    return (probabilities * weights.unsqueeze(1)).sum(dim=0) / weights.sum()
+
+
+def run_chunked_inference(
+    tokenizer: AutoTokenizer,
+    model: AutoModelForSequenceClassification,
+    texts: List[str],
+    aggregation: str = "max",
+    max_windows: int = 8,
+    overlap: int = 128,
+    batch_size: int = 32,
+    token_ids: Optional[List[List[int]]] = None,
+) -> List[Tuple[str, float, Dict[int, float]]]:
+    """
+    Classifica textos longos em janelas sobrepostas de 512 tokens
+
+    As janelas de todos os documentos são executadas juntas (em lotes de
+    batch_size) e os scores de cada documento são agregados em um único
+    resultado.
+
+    Args:
+        tokenizer: Tokenizer carregado
+        model: Modelo carregado
+        texts: Textos para classificar
+        aggregation: "max", "mean" ou "attention"
+        max_windows: Limite de janelas por documento (limita a latência)
+        overlap: Tokens compartilhados entre janelas vizinhas
+        batch_size: Quantidade de janelas por forward pass
+        token_ids: Tokens já calculados de cada texto (sem tokens
+            especiais), para evitar uma nova tokenização
+
+    Returns:
+        Lista de tuplas (prediction, confidence, scores), como em run_inference
+    """
+    try:
+        if not texts:
+            return []
+        if token_ids is None:
+            token_ids = tokenizer(texts, add_special_tokens=False)["input_ids"]
+        prefix, suffix = special_tokens(tokenizer)
+
+        # Janelas de cada documento ficam contíguas: spans[idx] = (início, fim)
+        windows: List[List[int]] = []
+        spans: List[Tuple[int, int]] = []
+        for ids in token_ids:
+            start = len(windows)
+            windows.extend(
+                split_windows(
+                    ids, prefix, suffix, overlap=overlap, max_windows=max_windows
+                )
+            )
+            spans.append((start, len(windows)))
+
+        probabilities = _forward_probabilities(tokenizer, model, windows, batch_size)
+
+        results = []
+        for start, end in spans:
+            combined = _aggregate_windows(
+                probabilities[start:end],
+                [len(window) for window in windows[start:end]],
+                aggregation,
+            )
+            results.append(_to_result(combined))
+
+        logger.info(
+            f"Classificação em janelas concluída: {len(token_ids)} textos, "
+            f"{len(windows)} janelas ({aggregation})"
+        )
+
+        return results
+
+    except Exception as e:
+        logger.error(f"Erro durante inferência em janelas: {e}")
+        raise
+
+
 def preprocess_for_inference(text: str) -> str:
     """
     Pré-processa texto para inferência
 
+    O corte no limite do modelo é feito em tokens (início + final) por
+    encode_with_budget; aqui o texto só é limitado a uma janela generosa de
+    caracteres para não tokenizar à toa emails muito longos.
+
     Args:
         text: Texto bruto
 
     Returns:
         Texto pré-processado
     """
-    # Remover espaços extras
-    text = " ".join(text.split())
+    # Remover assinatura/histórico citado antes de perder as quebras de linha
+    text = strip_signature(text)
 
-    # Limitar tamanho (o modelo tem limite de 512 tokens)
-    if len(text) > 2000:  # Aproximadamente 500 tokens
-        text = text[:2000] + "..."
-
-    return text
+    # Remover espaços extras
+    return " ".join(clip_head_tail(text).split())
@@ -0,0 +1,140 @@
+"""
+Motor de palavras-chave compilado, compartilhado pelas camadas de regras
+
+As palavras-chave de um conjunto de categorias são compiladas uma única vez e
+comparadas com palavras inteiras do texto ("oi" não casa dentro de "noite",
+mas o plural "problemas" casa com "problema"). Uma única passada pelo texto
+devolve as ocorrências de todas as categorias.
+"""
+
+from collections import Counter
+from typing import Dict, Iterable, List, Mapping, Set
+
+import ahocorasick
+
+
+class KeywordHits:
+    """
+    Resultado de KeywordEngine.scan
+
+    Args:
+        keyword_counts: Ocorrências de cada palavra-chave encontrada
+        keyword_categories: Categorias de cada palavra-chave
+    """
+
+    def __init__(
+        self, keyword_counts: Counter, keyword_categories: Mapping[str, Set[str]]
+    ):
+        self.keyword_counts = keyword_counts
+        self._keyword_categories = keyword_categories
+
+    def keywords(self, category: str) -> List[str]:
+        """Palavras-chave distintas da categoria encontradas no texto"""
+        return [
+            keyword
+            for keyword in self.keyword_counts
+            if category in self._keyword_categories[keyword]
+        ]
+
+    def distinct(self, category: str) -> int:
+        """Número de palavras-chave distintas da categoria no texto"""
+        return len(self.keywords(category))
+
+    def count(self, category: str) -> int:
+        """Total de ocorrências de palavras-chave da categoria"""
+        return sum(
+            self.keyword_counts[keyword] for keyword in self.keywords(category)
+        )
+
+    def categories(self) -> Counter:
+        """Ocorrências por categoria (apenas categorias encontradas)"""
+        counts = Counter()
+        for keyword, occurrences in self.keyword_counts.items():
+            for category in self._keyword_categories[keyword]:
+                counts[category] += occurrences
+        return counts
+
+    def __contains__(self, category: str) -> bool:
+        return any(
+            category in self._keyword_categories[keyword]
+            for keyword in self.keyword_counts
+        )
+
+
+def _is_word_char(char: str) -> bool:
+    return char.isalnum() or char == "_"
+
+
+def _line_break_variants(keyword: str) -> List[str]:
+    """Variantes de uma expressão com espaço ou quebra de linha entre palavras"""
+    first, *rest = keyword.split(" ")
+    variants = [first]
+    for part in rest:
+        variants = [v + sep + part for v in variants for sep in (" ", "\n")]
+    return variants
+
+
+class KeywordEngine:
+    """
+    Busca de várias categorias de palavras-chave em uma única passada
+
+    Usa um autômato Aho-Corasick (pyahocorasick): o custo é proporcional ao
+    texto e não ao número de palavras-chave. As ocorrências só contam em
+    limites de palavra, aceitam plural ("erros") e palavras-chave contidas
+    em outras também são creditadas ("bom dia pessoal" conta "bom dia"),
+    como na busca por substring substituída.
+
+    Args:
+        categories: Categoria -> palavras-chave (minúsculas; as palavras de
+            uma expressão são separadas por um espaço ou quebra de linha)
+    """
+
+    def __init__(self, categories: Mapping[str, Iterable[str]]):
+        self.categories: Dict[str, List[str]] = {
+            category: list(keywords) for category, keywords in categories.items()
+        }
+
+        self._keyword_categories: Dict[str, Set[str]] = {}
+        for category, keywords in self.categories.items():
+            for keyword in keywords:
+                self._keyword_categories.setdefault(keyword, set()).add(category)
+
+        self._automaton = ahocorasick.Automaton()
+        for keyword in self._keyword_categories:
+            for variant in _line_break_variants(keyword):
+                self._automaton.add_word(variant, keyword)
+        self._automaton.make_automaton()
+
+    def scan(self, text: str) -> KeywordHits:
+        """
+        Encontra todas as palavras-chave do texto
+
+        Args:
+            text: Texto original (a comparação ignora maiúsculas)
+
+        Returns:
+            KeywordHits com as ocorrências por palavra-chave e categoria
+        """
+        text = text.lower()
+        counts = Counter()
+
+        length = len(text)
+        for end, keyword in self._automaton.iter(text):
+            start = end - len(keyword) + 1
+            if start > 0 and _is_word_char(text[start - 1]):
+                continue
+            # Limite de palavra após a palavra-chave ou após o plural
+            after = end + 1
+            if after < length and _is_word_char(text[after]):
+                if text[after] == "s":
+                    after += 1
+                elif text.startswith("es", after):
+                    after += 2
+                else:
+                    continue
+                if after < length and _is_word_char(text[after]):
+                    continue
+            counts[keyword] += 1
+
+        return KeywordHits(counts, self._keyword_categories)
+
@@ -0,0 +1,221 @@
+"""
+Detecção de idioma rápida, determinística e com cache
+
+Substitui o langdetect (lento e não determinístico entre execuções) por um
+classificador por perfis: palavras funcionais frequentes de cada idioma e
+caracteres exclusivos (ã/õ, ñ, ß...) somam pontos, e vence o idioma com mais
+pontos. Apenas um prefixo limitado do texto é examinado, de modo que o custo
+não depende do tamanho do email, e os resultados ficam memoizados pelo hash
+do prefixo. O mesmo texto sempre recebe o mesmo idioma, em qualquer processo.
+"""
+
+import hashlib
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Configurações (sobrescrevíveis por variáveis de ambiente)
+LANGUAGE_PREFIX_CHARS = int(os.getenv("LANGUAGE_PREFIX_CHARS", "1000"))
+LANGUAGE_CACHE_SIZE = int(os.getenv("LANGUAGE_CACHE_SIZE", "10000"))
+DEFAULT_LANGUAGE = "en"
+# Textos mais curtos que isto ficam com o idioma padrão (como antes)
+MIN_TEXT_CHARS = 10
+
+_WORD = re.compile(r"[^\W\d_]+")
+
+# Palavras funcionais frequentes (códigos ISO 639-1, como no langdetect)
+LANGUAGE_PROFILES: Dict[str, List[str]] = {
+    # Palavras que também são inglês ficam em LANGUAGE_WEAK_WORDS
+    "pt": [
+        "não", "você", "vocês", "uma", "com", "para", "o", "da", "dos", "das",
+        "na", "nas", "nos", "um", "é", "são", "está", "estão", "estou", "mas",
+        "ao", "pelo", "pela", "obrigado", "obrigada", "bom", "boa", "olá",
+        "tudo", "muito", "também", "isso", "isto", "foi", "tem", "já", "seu",
+        "sua", "meu", "minha", "nosso", "nossa", "pra", "nós", "eles", "elas",
+        "ele", "ela", "mais", "ou", "quando", "até", "então", "segue", "favor",
+        "atenciosamente", "sobre", "hoje", "semana", "muitas", "muitos",
+        "feliz", "parabéns", "dia", "tarde", "noite", "equipe", "pessoal",
+        "que", "se", "sim", "sem", "ainda", "aqui", "agora", "depois", "vai",
+        "vou", "ser", "ter", "eu", "te", "esse", "essa", "mesmo", "onde",
+        "quem", "nada", "porque", "lhe", "assim", "sei", "fazer", "pouco",
+        "tanto",
+    ],
+    "en": [
+        "the", "and", "to", "of", "in", "is", "you", "that", "it", "for",
+        "on", "with", "this", "be", "are", "was", "have", "i", "we", "your",
+        "please", "thanks", "thank", "hi", "hello", "will", "can", "not",
+        "at", "from", "or", "by", "an", "if", "my", "our", "me", "would",
+        "could", "should", "there", "what", "regards", "dear", "best", "just",
+        "as", "do", "no", "know", "does", "did", "don", "so", "but", "all",
+        "about", "has", "had", "been", "were", "he", "she", "they", "him",
+        "her", "his", "them", "much", "many", "how", "yes", "am", "some",
+        "who", "why", "here", "now", "than", "too", "very", "any", "out",
+        "up", "get", "see", "go", "where", "when", "which", "make", "let",
+    ],
+    "es": [
+        "el", "la", "los", "las", "y", "es", "un", "una", "con", "para",
+        "por", "del", "al", "lo", "muy", "pero", "está", "son", "gracias",
+        "hola", "buenos", "buenas", "usted", "ustedes", "también", "esto",
+        "hay", "más", "cuando", "tiene", "nosotros", "saludos", "hoy", "semana",
+        "favor", "sobre", "ya", "mucho",
+    ],
+    "fr": [
+        "le", "la", "les", "et", "des", "un", "une", "est", "que", "qui",
+        "pour", "pas", "vous", "nous", "je", "ce", "dans", "sur", "avec", "au",
+        "du", "il", "elle", "merci", "bonjour", "mais", "ou", "très", "sont",
+        "être", "cordialement", "votre", "aujourd",
+    ],
+    "de": [
+        "der", "die", "das", "und", "ist", "nicht", "ich", "sie", "es", "ein",
+        "eine", "zu", "mit", "für", "auf", "den", "dem", "von", "wir", "ihr",
+        "sich", "auch", "bitte", "danke", "hallo", "guten", "tag", "sind",
+        "haben", "werden", "grüße", "ihnen",
+    ],
+    "it": [
+        "il", "lo", "gli", "di", "che", "per", "non", "sono", "con", "della",
+        "anche", "grazie", "ciao", "buongiorno", "questo", "questa", "ci", "è",
+        "del", "alla", "saluti", "oggi", "molto",
+    ],
+}
+
+# Palavras frequentes do idioma que também são palavras comuns de outro
+# ("as", "do", "no" em inglês): valem menos que as do perfil, para que em
+# frases curtas não decidam sozinhas o idioma
+LANGUAGE_WEAK_WORDS: Dict[str, List[str]] = {
+    "pt": ["as", "os", "do", "no", "e", "a", "em"],
+}
+WORD_WEIGHT = 2
+WEAK_WORD_WEIGHT = 1
+
+# Caracteres que praticamente só aparecem em um dos idiomas
+LANGUAGE_CHARACTERS: Dict[str, str] = {
+    "pt": "ãõ",
+    "es": "ñ¿¡",
+    "de": "ßäöü",
+    "fr": "œèëî",
+}
+CHARACTER_WEIGHT = 2 * WORD_WEIGHT
+
+
+class LanguageDetector:
+    """
+    Detector de idioma por perfis de palavras funcionais
+
+    Args:
+        prefix_chars: Caracteres examinados no início de cada texto
+        cache_size: Resultados mantidos em memória (LRU por hash do prefixo)
+        default: Idioma devolvido sem evidência suficiente
+    """
+
+    def __init__(
+        self,
+        prefix_chars: int = LANGUAGE_PREFIX_CHARS,
+        cache_size: int = LANGUAGE_CACHE_SIZE,
+        default: str = DEFAULT_LANGUAGE,
+    ):
+        self.prefix_chars = prefix_chars
+        self.cache_size = cache_size
+        self.default = default
+        # Ordem fixa dos idiomas: empates resolvidos sempre do mesmo jeito
+        self.languages = list(LANGUAGE_PROFILES)
+        # palavra -> [(índice do idioma, peso)]
+        self._word_languages: Dict[str, List[Tuple[int, int]]] = {}
+        for profiles, weight in (
+            (LANGUAGE_PROFILES, WORD_WEIGHT),
+            (LANGUAGE_WEAK_WORDS, WEAK_WORD_WEIGHT),
+        ):
+            for language, words in profiles.items():
+                index = self.languages.index(language)
+                for word in words:
+                    entries = self._word_languages.setdefault(word, [])
+                    if all(entry[0] != index for entry in entries):
+                        entries.append((index, weight))
+        self._characters = [
+            (self.languages.index(language), characters)
+            for language, characters in LANGUAGE_CHARACTERS.items()
+        ]
+        self._cache: "OrderedDict[bytes, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _score(self, prefix: str) -> str:
+        scores = [0] * len(self.languages)
+        for word in _WORD.findall(prefix):
+            for index, weight in self._word_languages.get(word, ()):
+                scores[index] += weight
+        for index, characters in self._characters:
+            for char in characters:
+                scores[index] += CHARACTER_WEIGHT * prefix.count(char)
+
+        best = max(scores)
+        if best == 0:
+            return self.default
+        # Empate com o idioma padrão: manter o padrão
+        default_index = self.languages.index(self.default)
+        if scores[default_index] == best:
+            return self.default
+        return self.languages[scores.index(best)]
+
+    def detect(self, text: Optional[str]) -> str:
+        """
+        Idioma do texto
+
+        Args:
+            text: Texto (apenas o prefixo é examinado)
+
+        Returns:
+            Código ISO 639-1 ("pt", "en", "es", ...); o idioma padrão para
+            textos curtos ou sem evidência
+        """
+        if not text or len(text.strip()) < MIN_TEXT_CHARS:
+            return self.default
+
+        prefix = text[: self.prefix_chars].lower()
+        key = hashlib.blake2b(prefix.encode("utf-8"), digest_size=16).digest()
+
+        with self._lock:
+            language = self._cache.get(key)
+            if language is not None:
+                self._cache.move_to_end(key)
+                return language
+
+        language = self._score(prefix)
+
+        with self._lock:
+            self._cache[key] = language
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return language
+
+    def detect_batch(self, texts: Sequence[Optional[str]]) -> List[str]:
+        """Idiomas de vários textos (textos repetidos são pontuados uma vez)"""
+        return [self.detect(text) for text in texts]
+
+    def clear(self):
+        """Esvazia o cache de resultados"""
+        with self._lock:
+            self._cache.clear()
+
+
+_DETECTOR: Optional[LanguageDetector] = None
+_DETECTOR_LOCK = threading.Lock()
+
+
+def get_language_detector() -> LanguageDetector:
+    """Instância compartilhada do detector (criada uma única vez)"""
+    global _DETECTOR
+    with _DETECTOR_LOCK:
+        if _DETECTOR is None:
+            _DETECTOR = LanguageDetector()
+        return _DETECTOR
+
+
+def detect_language(text: Optional[str]) -> str:
+    """Atalho: idioma de um texto com o detector compartilhado"""
+    return get_language_detector().detect(text)
+
+
+def detect_languages(texts: Sequence[Optional[str]]) -> List[str]:
+    """Atalho: idiomas de vários textos com o detector compartilhado"""
+    return get_language_detector().detect_batch(texts)
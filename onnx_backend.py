@@ -0,0 +1,215 @@
+"""
+Backend de inferência com ONNX Runtime
+
+O modelo exportado fica em <model_dir>/onnx/model.onnx (tokenizer e
+config.json continuam no diretório do modelo). As classes abaixo imitam a
+interface usada por inference.py (model(**inputs).logits) e por app.py
+(TextClassificationPipeline), de modo que o backend possa ser trocado por
+configuração (INFERENCE_BACKEND=onnx).
+"""
+
+import inspect
+import logging
+import os
+from types import SimpleNamespace
+from typing import Dict, List, Optional, Union
+
+import numpy as np
+import torch
+
+logger = logging.getLogger(__name__)
+
+INFERENCE_BACKEND = os.getenv("INFERENCE_BACKEND", "pytorch")
+ONNX_SUBDIR = "onnx"
+ONNX_FILENAME = "model.onnx"
+
+
+def onnx_model_path(model_dir: str) -> str:
+    """Caminho do arquivo ONNX associado a um diretório de modelo"""
+    return os.path.join(model_dir, ONNX_SUBDIR, ONNX_FILENAME)
+
+
+def export_onnx(model_dir: str, opset: int = 17, optimize: bool = True) -> str:
+    """
+    Exporta um modelo de classificação para ONNX com otimizações de grafo
+
+    Args:
+        model_dir: Diretório do modelo treinado (formato Hugging Face)
+        opset: Versão do opset ONNX
+        optimize: Aplica fusões de atenção/LayerNorm do ONNX Runtime
+
+    Returns:
+        Caminho do arquivo ONNX gerado
+    """
+    from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+    tokenizer = AutoTokenizer.from_pretrained(model_dir)
+    # Atenção "eager" exporta um grafo que as fusões do ORT reconhecem
+    model = AutoModelForSequenceClassification.from_pretrained(
+        model_dir, attn_implementation="eager"
+    )
+    model.eval()
+
+    output_path = onnx_model_path(model_dir)
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+
+    sample = tokenizer(["Exemplo de email para exportação"], return_tensors="pt")
+    input_names = [
+        name
+        for name in ("input_ids", "attention_mask", "token_type_ids")
+        if name in sample and name in inspect.signature(model.forward).parameters
+    ]
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    dynamic_axes["logits"] = {0: "batch"}
+
+    export_kwargs = {}
+    if "dynamo" in inspect.signature(torch.onnx.export).parameters:
+        # Exportador TorchScript: eixos dinâmicos estáveis para BERT
+        export_kwargs["dynamo"] = False
+
+    raw_path = output_path + ".raw" if optimize else output_path
+    logger.info(f"Exportando {model_dir} para ONNX (opset {opset})")
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            tuple(sample[name] for name in input_names),
+            raw_path,
+            input_names=input_names,
+            output_names=["logits"],
+            dynamic_axes=dynamic_axes,
+            opset_version=opset,
+            do_constant_folding=True,
+            **export_kwargs,
+        )
+
+    if optimize:
+        _optimize_graph(raw_path, output_path, model.config)
+        os.remove(raw_path)
+
+    logger.info(f"Modelo ONNX salvo em {output_path}")
+    return output_path
+
+
+def _optimize_graph(raw_path: str, output_path: str, config):
+    """Aplica as fusões de transformer do ONNX Runtime (com fallback genérico)"""
+    import onnxruntime as ort
+
+    try:
+        from onnxruntime.transformers import optimizer
+
+        num_heads = getattr(config, "num_attention_heads", None) or config.n_heads
+        hidden_size = getattr(config, "hidden_size", None) or config.dim
+        optimized = optimizer.optimize_model(
+            raw_path,
+            model_type="bert",
+            num_heads=num_heads,
+            hidden_size=hidden_size,
+        )
+        optimized.save_model_to_file(output_path)
+        return
+    except Exception as e:
+        logger.warning(f"Otimizador de transformers indisponível ({e}); usando ORT")
+
+    options = ort.SessionOptions()
+    options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_EXTENDED
+    options.optimized_model_filepath = output_path
+    ort.InferenceSession(raw_path, options, providers=["CPUExecutionProvider"])
+
+
+class OnnxSequenceClassifier:
+    """
+    Modelo ONNX com a mesma interface de chamada do modelo PyTorch
+
+    Args:
+        model_dir: Diretório do modelo (com onnx/model.onnx)
+        onnx_path: Caminho alternativo do arquivo ONNX
+        num_threads: Threads intra-op do ONNX Runtime (0 = padrão)
+    """
+
+    def __init__(
+        self, model_dir: str, onnx_path: Optional[str] = None, num_threads: int = 0
+    ):
+        import onnxruntime as ort
+        from transformers import AutoConfig
+
+        self.config = AutoConfig.from_pretrained(model_dir)
+        path = onnx_path or onnx_model_path(model_dir)
+        if not os.path.exists(path):
+            raise FileNotFoundError(
+                f"Modelo ONNX não encontrado: {path} "
+                "(execute scripts/export_onnx.py)"
+            )
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+
+        self.session = ort.InferenceSession(
+            path, options, providers=["CPUExecutionProvider"]
+        )
+        self.input_names = [i.name for i in self.session.get_inputs()]
+
+    def eval(self):
+        return self
+
+    def to(self, device):
+        return self
+
+    def __call__(self, **inputs) -> SimpleNamespace:
+        feed = {
+            name: np.asarray(inputs[name].cpu().numpy(), dtype=np.int64)
+            for name in self.input_names
+            if name in inputs
+        }
+        if "token_type_ids" in self.input_names and "token_type_ids" not in feed:
+            feed["token_type_ids"] = np.zeros_like(feed["input_ids"])
+
+        logits = self.session.run(["logits"], feed)[0]
+        return SimpleNamespace(logits=torch.from_numpy(logits))
+
+
+class OnnxTextClassificationPipeline:
+    """
+    Substituto do TextClassificationPipeline (top_k=None) sobre ONNX Runtime
+
+    Args:
+        model: OnnxSequenceClassifier carregado
+        tokenizer: Tokenizer do modelo
+    """
+
+    def __init__(self, model: OnnxSequenceClassifier, tokenizer):
+        self.model = model
+        self.tokenizer = tokenizer
+        self.id2label = model.config.id2label
+
+    def __call__(
+        self,
+        inputs: Union[str, List[str]],
+        truncation: bool = True,
+        max_length: int = 512,
+        batch_size: Optional[int] = None,
+        **kwargs,
+    ) -> List[List[Dict]]:
+        texts = [inputs] if isinstance(inputs, str) else list(inputs)
+        batch_size = batch_size or len(texts)
+        outputs: List[List[Dict]] = []
+
+        for start in range(0, len(texts), batch_size):
+            encoded = self.tokenizer(
+                texts[start : start + batch_size],
+                truncation=truncation,
+                max_length=max_length,
+                padding=True,
+                return_tensors="pt",
+            )
+            probabilities = torch.softmax(self.model(**encoded).logits, dim=-1)
+
+            for row in probabilities.tolist():
+                scores = [
+                    {"label": self.id2label[label_id], "score": score}
+                    for label_id, score in enumerate(row)
+                ]
+                outputs.append(sorted(scores, key=lambda s: s["score"], reverse=True))
+
+        return outputs
@@ -0,0 +1,334 @@
+"""
+Extração de texto de PDFs em paralelo, com limites e cache
+
+As páginas são divididas em faixas e extraídas por um pool de processos
+(pdfplumber; as páginas em que o pdfplumber lançou erro são reextraídas
+pelo pdfminer em uma única passada por faixa). Cada documento tem um limite de páginas e de tempo: se o
+prazo estoura, os processos são encerrados (um PDF patológico não trava a
+interface) e o texto das faixas já concluídas é devolvido. O resultado é
+guardado em cache pelo hash SHA-256 do conteúdo do arquivo; envios
+simultâneos do mesmo arquivo aguardam uma única extração.
+"""
+
+import hashlib
+import logging
+import math
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from dataclasses import dataclass, replace
+from multiprocessing import TimeoutError as PoolTimeoutError
+from multiprocessing import get_context
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Configurações (sobrescrevíveis por variáveis de ambiente)
+PDF_MAX_PAGES = int(os.getenv("PDF_MAX_PAGES", "200"))
+PDF_TIMEOUT_SECONDS = float(os.getenv("PDF_TIMEOUT_SECONDS", "30"))
+PDF_WORKERS = int(os.getenv("PDF_WORKERS", str(min(4, os.cpu_count() or 1))))
+PDF_CACHE_SIZE = int(os.getenv("PDF_CACHE_SIZE", "128"))
+# Diretório opcional para o cache em disco (ex: data/pdf_cache)
+PDF_CACHE_DIR = os.getenv("PDF_CACHE_DIR")
+
+
+@dataclass
+class PdfExtraction:
+    """Resultado da extração de um PDF"""
+
+    text: str
+    pages_extracted: int
+    total_pages: int
+    truncated: bool = False  # Passou de max_pages
+    timed_out: bool = False  # Prazo estourado; texto parcial
+    cached: bool = False
+
+
+def _count_pages(path: str) -> int:
+    """Número de páginas do PDF (executa no worker)"""
+    import pdfplumber
+
+    with pdfplumber.open(path) as pdf:
+        return len(pdf.pages)
+
+
+def _pdfminer_pages(path: str, pages: List[int]) -> List[Tuple[int, str]]:
+    """Texto de várias páginas com o pdfminer, em uma única passada"""
+    from pdfminer.high_level import extract_pages
+    from pdfminer.layout import LTTextContainer
+
+    try:
+        # extract_pages devolve as páginas pedidas na ordem do documento
+        layouts = extract_pages(path, page_numbers=pages)
+        return [
+            (
+                index,
+                "".join(
+                    element.get_text()
+                    for element in layout
+                    if isinstance(element, LTTextContainer)
+                ),
+            )
+            for index, layout in zip(sorted(pages), layouts)
+        ]
+    except Exception as e:
+        logger.warning(f"Páginas {[i + 1 for i in pages]} sem texto extraível: {e}")
+        return [(index, "") for index in pages]
+
+
+def _extract_pages(path: str, pages: List[int]) -> List[Tuple[int, str]]:
+    """
+    Extrai o texto de uma faixa de páginas (executa no worker)
+
+    Páginas em que o pdfplumber lançou erro são reextraídas pelo pdfminer
+    todas de uma vez ao final da faixa. Páginas que o pdfplumber leu sem
+    texto (ex: digitalizadas) ficam vazias: o pdfminer também não as lê.
+    """
+    import pdfplumber
+
+    results = []
+    failed = []
+    with pdfplumber.open(path) as pdf:
+        for index in pages:
+            try:
+                results.append((index, pdf.pages[index].extract_text() or ""))
+            except Exception:
+                failed.append(index)
+            # Liberar objetos de layout da página já processada
+            pdf.pages[index].close()
+
+    if failed:
+        results.extend(_pdfminer_pages(path, failed))
+    return [(index, text.strip()) for index, text in sorted(results)]
+
+
+class PdfExtractor:
+    """
+    Serviço de extração de PDFs com pool de processos, limites e cache
+
+    Args:
+        workers: Processos de extração
+        max_pages: Páginas processadas por documento (o resto é ignorado)
+        timeout_seconds: Prazo total por documento
+        cache_size: Documentos mantidos no cache em memória
+        cache_dir: Diretório do cache em disco (None desativa)
+    """
+
+    def __init__(
+        self,
+        workers: int = PDF_WORKERS,
+        max_pages: int = PDF_MAX_PAGES,
+        timeout_seconds: float = PDF_TIMEOUT_SECONDS,
+        cache_size: int = PDF_CACHE_SIZE,
+        cache_dir: Optional[str] = PDF_CACHE_DIR,
+    ):
+        self.workers = max(1, workers)
+        self.max_pages = max_pages
+        self.timeout_seconds = timeout_seconds
+        self.cache_size = cache_size
+        self.cache_dir = cache_dir
+        self._cache: "OrderedDict[str, PdfExtraction]" = OrderedDict()
+        # Extrações em andamento por hash (o lock protege cache e pool, não
+        # a extração em si)
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._pool = None
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def _get_pool(self):
+        if self._pool is None:
+            # spawn: seguro dentro de servidores com threads (Streamlit)
+            self._pool = get_context("spawn").Pool(self.workers)
+        return self._pool
+
+    def _reset_pool(self):
+        """Encerra processos presos em um documento patológico"""
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool.join()
+            self._pool = None
+
+    def _discard_pool(self, pool):
+        """Encerra um pool preso em um documento (se ainda for o atual)"""
+        with self._lock:
+            if self._pool is pool:
+                self._pool = None
+        pool.terminate()
+        pool.join()
+
+    def close(self):
+        """Encerra o pool de processos"""
+        with self._lock:
+            self._reset_pool()
+
+    # === Cache ===
+
+    def _cache_get(self, key: str) -> Optional[PdfExtraction]:
+        result = self._cache.get(key)
+        if result is not None:
+            self._cache.move_to_end(key)
+            return result
+
+        if self.cache_dir:
+            path = os.path.join(self.cache_dir, f"{key}.txt")
+            if os.path.exists(path):
+                with open(path, "r", encoding="utf-8") as f:
+                    header, _, text = f.read().partition("\n")
+                pages, total, truncated = header.split(":")
+                result = PdfExtraction(text, int(pages), int(total), truncated == "1")
+                self._cache_put(key, result, persist=False)
+                return result
+
+        return None
+
+    def _cache_put(self, key: str, result: PdfExtraction, persist: bool = True):
+        self._cache[key] = result
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+        if persist and self.cache_dir:
+            path = os.path.join(self.cache_dir, f"{key}.txt")
+            with open(path + ".tmp", "w", encoding="utf-8") as f:
+                f.write(
+                    f"{result.pages_extracted}:{result.total_pages}:"
+                    f"{int(result.truncated)}\n{result.text}"
+                )
+            os.replace(path + ".tmp", path)
+
+    # === Extração ===
+
+    def extract(self, data: bytes) -> PdfExtraction:
+        """
+        Extrai o texto de um PDF
+
+        Args:
+            data: Conteúdo do arquivo PDF
+
+        Returns:
+            PdfExtraction com o texto das páginas na ordem do documento
+
+        Raises:
+            TimeoutError: Se nem a contagem de páginas terminou no prazo
+        """
+        key = hashlib.sha256(data).hexdigest()
+
+        with self._lock:
+            cached = self._cache_get(key)
+            if cached is not None:
+                logger.info(f"PDF {key[:12]} servido do cache")
+                return replace(cached, cached=True)
+
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = self._inflight[key] = Future()
+
+        if not owner:
+            # O mesmo arquivo já está sendo extraído por outra sessão
+            return future.result()
+
+        try:
+            result = self._extract_uncached(data)
+        except BaseException as e:
+            with self._lock:
+                del self._inflight[key]
+            future.set_exception(e)
+            raise
+
+        with self._lock:
+            # Resultados parciais (timeout) não entram no cache
+            if not result.timed_out:
+                self._cache_put(key, result)
+            del self._inflight[key]
+        future.set_result(result)
+        return result
+
+    def _extract_uncached(self, data: bytes) -> PdfExtraction:
+        deadline = time.monotonic() + self.timeout_seconds
+        # Os workers leem o arquivo do disco: o conteúdo não é copiado
+        # para cada processo
+        with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as f:
+            f.write(data)
+            path = f.name
+
+        try:
+            with self._lock:
+                pool = self._get_pool()
+            try:
+                total_pages = pool.apply_async(_count_pages, (path,)).get(
+                    timeout=self.timeout_seconds
+                )
+            except PoolTimeoutError:
+                self._discard_pool(pool)
+                raise TimeoutError(
+                    f"PDF não pôde ser aberto em {self.timeout_seconds:.1f}s"
+                )
+
+            pages = list(range(min(total_pages, self.max_pages)))
+            size = max(1, math.ceil(len(pages) / self.workers))
+            tasks = [
+                pool.apply_async(_extract_pages, (path, pages[i : i + size]))
+                for i in range(0, len(pages), size)
+            ]
+
+            texts = {}
+            timed_out = False
+            for task in tasks:
+                try:
+                    remaining = max(0.0, deadline - time.monotonic())
+                    texts.update(task.get(timeout=remaining))
+                except PoolTimeoutError:
+                    timed_out = True
+                    break
+
+            if timed_out:
+                # Coletar faixas que terminaram antes de encerrar o pool
+                for task in tasks:
+                    if task.ready() and task.successful():
+                        texts.update(task.get())
+                logger.warning(
+                    f"Extração de PDF excedeu {self.timeout_seconds:.1f}s: "
+                    f"{len(texts)}/{len(pages)} páginas"
+                )
+                self._discard_pool(pool)
+
+            return PdfExtraction(
+                text="\n".join(texts[i] for i in sorted(texts) if texts[i]),
+                pages_extracted=len(texts),
+                total_pages=total_pages,
+                truncated=total_pages > len(pages),
+                timed_out=timed_out,
+            )
+        finally:
+            os.remove(path)
+
+
+_EXTRACTOR: Optional[PdfExtractor] = None
+_EXTRACTOR_LOCK = threading.Lock()
+
+
+def get_pdf_extractor() -> PdfExtractor:
+    """Instância compartilhada do extrator (pool criado sob demanda)"""
+    global _EXTRACTOR
+    with _EXTRACTOR_LOCK:
+        if _EXTRACTOR is None:
+            _EXTRACTOR = PdfExtractor()
+        return _EXTRACTOR
+
+
+def extract_pdf_text(data: bytes) -> str:
+    """
+    Atalho: texto de um PDF com o extrator compartilhado
+
+    Raises:
+        ValueError: Se nenhuma página tiver texto extraível
+    """
+    result = get_pdf_extractor().extract(data)
+    if not result.text:
+        raise ValueError("Não foi possível extrair texto do PDF")
+    return result.text
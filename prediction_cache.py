@@ -0,0 +1,280 @@
+"""
+Cache de predições endereçado por conteúdo
+
+A chave é o hash do texto normalizado combinado com a revisão do modelo
+(fingerprint dos arquivos do diretório do modelo). Há um nível em memória
+(LRU) e um nível opcional em disco (SQLite) com expiração por TTL e limite
+de tamanho. Quando os arquivos do modelo mudam, o cache é invalidado.
+"""
+
+import copy
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Sequence, Union
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_text(text: str) -> str:
+    """
+    Normaliza o texto para a chave do cache
+
+    Apenas espaços são colapsados: o modelo é cased, então maiúsculas e
+    pontuação continuam fazendo parte da chave.
+    """
+    return " ".join(text.split())
+
+
+def model_revision(model_dir: Union[str, Sequence[str]]) -> str:
+    """
+    Calcula a revisão do modelo a partir de nome, tamanho e mtime dos arquivos
+
+    Args:
+        model_dir: Diretório do modelo (ou lista de diretórios)
+
+    Returns:
+        Hash hexadecimal curto (diretórios ausentes entram como "missing")
+    """
+    model_dirs = [model_dir] if isinstance(model_dir, str) else model_dir
+
+    digest = hashlib.sha256()
+    for directory in model_dirs:
+        digest.update(f"[{directory}]\n".encode())
+        if not os.path.isdir(directory):
+            digest.update(b"missing\n")
+            continue
+
+        for root, dirs, files in os.walk(directory):
+            dirs.sort()
+            for name in sorted(files):
+                path = os.path.join(root, name)
+                stat = os.stat(path)
+                relative = os.path.relpath(path, directory)
+                digest.update(
+                    f"{relative}:{stat.st_size}:{stat.st_mtime_ns}\n".encode()
+                )
+
+    return digest.hexdigest()[:16]
+
+
+class PredictionCache:
+    """
+    Cache de predições com nível LRU em memória e nível SQLite opcional
+
+    Args:
+        model_dir: Diretório do modelo (ou lista) usado para a revisão/invalidação
+        max_entries: Tamanho máximo do nível em memória
+        disk_path: Caminho do arquivo SQLite (None desativa o nível em disco)
+        disk_max_entries: Tamanho máximo do nível em disco
+        ttl_seconds: Validade das entradas em disco (None = sem expiração)
+        revision_check_interval: Intervalo mínimo (s) entre verificações
+            de mudança no diretório do modelo
+        namespace: Prefixo da chave (ex: modo de inferência), para que
+            configurações diferentes não compartilhem resultados
+    """
+
+    def __init__(
+        self,
+        model_dir: Union[str, Sequence[str]],
+        max_entries: int = 1024,
+        disk_path: Optional[str] = None,
+        disk_max_entries: int = 100_000,
+        ttl_seconds: Optional[float] = None,
+        revision_check_interval: float = 5.0,
+        namespace: str = "",
+    ):
+        self.model_dir = model_dir
+        self.namespace = namespace
+        self.max_entries = max_entries
+        self.disk_path = disk_path
+        self.disk_max_entries = disk_max_entries
+        self.ttl_seconds = ttl_seconds
+        self.revision_check_interval = revision_check_interval
+
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[str, Dict]" = OrderedDict()
+        self._revision = model_revision(model_dir)
+        self._last_revision_check = time.monotonic()
+        self._disk_writes = 0
+        self.hits = 0
+        self.misses = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.invalidations = 0
+
+        self._db = None
+        if disk_path:
+            os.makedirs(os.path.dirname(os.path.abspath(disk_path)), exist_ok=True)
+            self._db = sqlite3.connect(disk_path, check_same_thread=False)
+            columns = [
+                row[1] for row in self._db.execute("PRAGMA table_info(predictions)")
+            ]
+            if columns and "namespace" not in columns:
+                # Formato antigo (namespace:revisão numa coluna só): é só cache
+                self._db.execute("DROP TABLE predictions")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS predictions ("
+                "key TEXT PRIMARY KEY, namespace TEXT, revision TEXT, "
+                "value TEXT, created_at REAL, last_access REAL)"
+            )
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS idx_last_access "
+                "ON predictions(last_access)"
+            )
+            # Entradas de revisões anteriores do modelo nunca mais serão lidas
+            self._purge_stale_revisions()
+
+    def _key(self, text: str) -> str:
+        payload = f"{self.namespace}\0{self._revision}\0{normalize_text(text)}"
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _check_revision(self):
+        """Invalida o cache se os arquivos do modelo mudaram"""
+        now = time.monotonic()
+        if now - self._last_revision_check < self.revision_check_interval:
+            return
+        self._last_revision_check = now
+
+        revision = model_revision(self.model_dir)
+        if revision == self._revision:
+            return
+
+        logger.info(
+            f"Modelo alterado ({self._revision} → {revision}), invalidando cache"
+        )
+        self._revision = revision
+        self._memory.clear()
+        self.invalidations += 1
+        if self._db is not None:
+            self._purge_stale_revisions()
+
+    def _purge_stale_revisions(self):
+        """Remove do disco entradas deste namespace com revisão antiga"""
+        self._db.execute(
+            "DELETE FROM predictions WHERE namespace = ? AND revision != ?",
+            (self.namespace, self._revision),
+        )
+        self._db.commit()
+
+    def _remember(self, key: str, value: Dict):
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, text: str) -> Optional[Dict]:
+        """
+        Busca a predição de um texto
+
+        Args:
+            text: Texto do email
+
+        Returns:
+            Cópia do resultado armazenado ou None
+        """
+        with self._lock:
+            self._check_revision()
+            key = self._key(text)
+
+            value = self._memory.get(key)
+            if value is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                self.memory_hits += 1
+                return copy.deepcopy(value)
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT value, created_at FROM predictions WHERE key = ?", (key,)
+                ).fetchone()
+                now = time.time()
+                if row is not None and (
+                    self.ttl_seconds is None or now - row[1] <= self.ttl_seconds
+                ):
+                    self._db.execute(
+                        "UPDATE predictions SET last_access = ? WHERE key = ?",
+                        (now, key),
+                    )
+                    self._db.commit()
+                    value = json.loads(row[0])
+                    self._remember(key, value)
+                    self.hits += 1
+                    self.disk_hits += 1
+                    return copy.deepcopy(value)
+
+            self.misses += 1
+            return None
+
+    def set(self, text: str, value: Dict):
+        """
+        Armazena a predição de um texto
+
+        Args:
+            text: Texto do email
+            value: Resultado da classificação (serializável em JSON)
+        """
+        with self._lock:
+            self._check_revision()
+            key = self._key(text)
+            self._remember(key, copy.deepcopy(value))
+
+            if self._db is not None:
+                now = time.time()
+                self._db.execute(
+                    "INSERT OR REPLACE INTO predictions VALUES (?, ?, ?, ?, ?, ?)",
+                    (key, self.namespace, self._revision, json.dumps(value), now, now),
+                )
+                self._disk_writes += 1
+                # Eviction em lote para não pagar o custo a cada escrita
+                if self._disk_writes % 100 == 0:
+                    self._evict_disk(now)
+                self._db.commit()
+
+    def _evict_disk(self, now: float):
+        """Remove entradas expiradas e as menos acessadas acima do limite"""
+        if self.ttl_seconds is not None:
+            self._db.execute(
+                "DELETE FROM predictions WHERE created_at < ?",
+                (now - self.ttl_seconds,),
+            )
+        self._db.execute(
+            "DELETE FROM predictions WHERE key IN ("
+            "SELECT key FROM predictions ORDER BY last_access DESC "
+            "LIMIT -1 OFFSET ?)",
+            (self.disk_max_entries,),
+        )
+
+    def clear(self):
+        """Remove todas as entradas dos dois níveis"""
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM predictions")
+                self._db.commit()
+
+    def stats(self) -> Dict:
+        """Contadores de acertos/erros e tamanho do cache"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            disk_entries = None
+            if self._db is not None:
+                disk_entries = self._db.execute(
+                    "SELECT COUNT(*) FROM predictions"
+                ).fetchone()[0]
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "memory_entries": len(self._memory),
+                "disk_entries": disk_entries,
+                "invalidations": self.invalidations,
+                "revision": self._revision,
+            }
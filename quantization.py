@@ -0,0 +1,213 @@
+"""
+Variantes quantizadas (INT8) do classificador para serving em CPU
+
+- "dynamic": torch.ao.quantization.quantize_dynamic nas camadas nn.Linear.
+  Pesos em INT8, ativações quantizadas em tempo de execução; não precisa
+  de calibração.
+- "static": quantização estática do grafo ONNX (ONNX Runtime), com as
+  faixas das ativações calibradas em textos de data/processed/train.json.
+
+O diretório gerado contém config.json, tokenizer e quantization_config.json.
+inference.load_model e app.py o reconhecem pela presença desse arquivo.
+"""
+
+import json
+import logging
+import os
+from typing import Dict, Iterable, List, Optional
+
+import torch
+
+from onnx_backend import ONNX_FILENAME, ONNX_SUBDIR, OnnxSequenceClassifier
+
+logger = logging.getLogger(__name__)
+
+QUANTIZATION_CONFIG = "quantization_config.json"
+QUANTIZED_WEIGHTS = "quantized_model.pt"
+QUANTIZATION_METHODS = ("dynamic", "static")
+
+
+def is_quantized_dir(model_dir: str) -> bool:
+    """Indica se o diretório contém um modelo quantizado por este módulo"""
+    return os.path.isfile(os.path.join(model_dir, QUANTIZATION_CONFIG))
+
+
+def read_quantization_config(model_dir: str) -> Dict:
+    """Lê o quantization_config.json de um diretório quantizado"""
+    path = os.path.join(model_dir, QUANTIZATION_CONFIG)
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _write_quantization_config(output_dir: str, config: Dict):
+    path = os.path.join(output_dir, QUANTIZATION_CONFIG)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(config, f, indent=2, ensure_ascii=False)
+
+
+def _quantize_linear(model: torch.nn.Module) -> torch.nn.Module:
+    """Substitui as camadas nn.Linear por equivalentes INT8 dinâmicas"""
+    return torch.ao.quantization.quantize_dynamic(
+        model, {torch.nn.Linear}, dtype=torch.qint8
+    )
+
+
+def quantize_dynamic_model(model_dir: str, output_dir: str) -> str:
+    """
+    Gera a variante com quantização dinâmica INT8 das camadas lineares
+
+    Args:
+        model_dir: Diretório do modelo fp32 (formato Hugging Face)
+        output_dir: Diretório de saída do modelo quantizado
+
+    Returns:
+        Caminho do diretório gerado
+    """
+    from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+    tokenizer = AutoTokenizer.from_pretrained(model_dir)
+    model = AutoModelForSequenceClassification.from_pretrained(model_dir)
+    model.eval()
+
+    logger.info(f"Quantizando (dinâmico, INT8) {model_dir}")
+    quantized = _quantize_linear(model)
+
+    os.makedirs(output_dir, exist_ok=True)
+    model.config.save_pretrained(output_dir)
+    tokenizer.save_pretrained(output_dir)
+    torch.save(quantized.state_dict(), os.path.join(output_dir, QUANTIZED_WEIGHTS))
+    _write_quantization_config(
+        output_dir,
+        {
+            "method": "dynamic",
+            "dtype": "qint8",
+            "modules": ["Linear"],
+            "source": model_dir,
+        },
+    )
+
+    logger.info(f"Modelo quantizado salvo em {output_dir}")
+    return output_dir
+
+
+class _CalibrationReader:
+    """CalibrationDataReader do ONNX Runtime a partir de textos de treino"""
+
+    def __init__(self, tokenizer, texts: List[str], input_names: List[str]):
+        samples = []
+        for text in texts:
+            encoded = tokenizer(
+                text, truncation=True, max_length=512, return_tensors="np"
+            )
+            samples.append(
+                {name: encoded[name] for name in input_names if name in encoded}
+            )
+        self._samples = iter(samples)
+
+    def get_next(self):
+        return next(self._samples, None)
+
+
+def quantize_static_model(
+    model_dir: str,
+    output_dir: str,
+    calibration_texts: Iterable[str],
+    onnx_path: Optional[str] = None,
+) -> str:
+    """
+    Gera a variante com quantização estática INT8 do grafo ONNX
+
+    Args:
+        model_dir: Diretório do modelo fp32 (com onnx/model.onnx exportado)
+        output_dir: Diretório de saída do modelo quantizado
+        calibration_texts: Textos representativos para calibrar as ativações
+        onnx_path: Grafo ONNX de origem (padrão: <model_dir>/onnx/model.onnx)
+
+    Returns:
+        Caminho do diretório gerado
+
+    Raises:
+        FileNotFoundError: Se o modelo ONNX não tiver sido exportado
+    """
+    import onnxruntime as ort
+    from onnxruntime.quantization import QuantFormat, QuantType, quantize_static
+    from transformers import AutoConfig, AutoTokenizer
+
+    source = onnx_path or os.path.join(model_dir, ONNX_SUBDIR, ONNX_FILENAME)
+    if not os.path.exists(source):
+        raise FileNotFoundError(
+            f"Modelo ONNX não encontrado: {source} (execute scripts/export_onnx.py)"
+        )
+
+    tokenizer = AutoTokenizer.from_pretrained(model_dir)
+    input_names = [
+        i.name
+        for i in ort.InferenceSession(
+            source, providers=["CPUExecutionProvider"]
+        ).get_inputs()
+    ]
+
+    os.makedirs(os.path.join(output_dir, ONNX_SUBDIR), exist_ok=True)
+    AutoConfig.from_pretrained(model_dir).save_pretrained(output_dir)
+    tokenizer.save_pretrained(output_dir)
+
+    texts = list(calibration_texts)
+    logger.info(f"Quantizando (estático, INT8) {source} com {len(texts)} amostras")
+    quantize_static(
+        source,
+        os.path.join(output_dir, ONNX_SUBDIR, ONNX_FILENAME),
+        _CalibrationReader(tokenizer, texts, input_names),
+        quant_format=QuantFormat.QDQ,
+        # Só as projeções (MatMul) são quantizadas; a cabeça de classificação
+        # (Gemm) e as operações elementares ficam em fp32 para preservar a acurácia
+        op_types_to_quantize=["MatMul"],
+        activation_type=QuantType.QInt8,
+        weight_type=QuantType.QInt8,
+    )
+    _write_quantization_config(
+        output_dir,
+        {
+            "method": "static",
+            "dtype": "qint8",
+            "format": "onnx-qdq",
+            "calibration_samples": len(texts),
+            "source": model_dir,
+        },
+    )
+
+    logger.info(f"Modelo quantizado salvo em {output_dir}")
+    return output_dir
+
+
+def load_quantized_model(model_dir: str):
+    """
+    Carrega um modelo gerado por quantize_dynamic_model/quantize_static_model
+
+    Args:
+        model_dir: Diretório quantizado
+
+    Returns:
+        Modelo com a interface model(**inputs).logits (PyTorch para o método
+        dinâmico, ONNX Runtime para o estático)
+
+    Raises:
+        ValueError: Se o método registrado for desconhecido
+    """
+    method = read_quantization_config(model_dir)["method"]
+    if method == "static":
+        return OnnxSequenceClassifier(model_dir)
+    if method != "dynamic":
+        raise ValueError(f"Método de quantização desconhecido: {method}")
+
+    from transformers import AutoConfig, AutoModelForSequenceClassification
+
+    # Recriar a arquitetura, quantizar e só então carregar os pesos INT8
+    model = AutoModelForSequenceClassification.from_config(
+        AutoConfig.from_pretrained(model_dir)
+    )
+    model.eval()
+    model = _quantize_linear(model)
+    model.load_state_dict(
+        torch.load(os.path.join(model_dir, QUANTIZED_WEIGHTS), weights_only=False)
+    )
+    return model
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Benchmark do perfil de treino em CPU (bf16 autocast / torch.compile)
+
+Executa train_epoch de train_improved.py nos mesmos lotes de
+data/processed/train.json com cada perfil — fp32 eager (baseline), bf16,
+fp32 + compile e bf16 + compile — e compara o tempo por passo (mediana) e o
+pico de memória residente. Cada perfil roda em um subprocesso próprio para
+que o pico de memória de um não contamine o outro.
+
+Uso:
+    python scripts/benchmark_cpu_training.py --model neuralmind/bert-base-portuguese-cased --steps 30
+"""
+
+import argparse
+import copy
+import itertools
+import json
+import os
+import subprocess
+import sys
+
+# Adicionar o diretório raiz ao path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+PROFILES = {
+    "fp32": {"bf16": False, "use_compile": False},
+    "bf16": {"bf16": True, "use_compile": False},
+    "fp32+compile": {"bf16": False, "use_compile": True},
+    "bf16+compile": {"bf16": True, "use_compile": True},
+}
+
+
+def run_profile(args):
+    """Roda um perfil e imprime o resultado como JSON na última linha"""
+    import torch
+    from torch.optim import AdamW
+    from transformers import (
+        AutoModelForSequenceClassification,
+        AutoTokenizer,
+        get_linear_schedule_with_warmup,
+    )
+
+    import train_improved
+    from cpu_training import configure_cpu_training, peak_memory_mb
+    from dataset_cache import load_tokenized_split
+
+    device = torch.device("cpu")
+    train_improved.device = device
+    torch.manual_seed(args.seed)
+
+    tokenizer = AutoTokenizer.from_pretrained(args.model)
+    model = AutoModelForSequenceClassification.from_pretrained(args.model, num_labels=2)
+    dataset = load_tokenized_split("train", tokenizer, args.max_length)
+    dataloader = train_improved.create_dataloader(dataset, tokenizer, args.batch_size)
+    batches = list(itertools.islice(dataloader, args.steps))
+    memory_before = peak_memory_mb()
+
+    sample_batch = copy.copy(batches[0])
+    sample_batch["labels"] = sample_batch["labels"].long()
+    train_model, amp_context, profile = configure_cpu_training(
+        model, device, sample_batch, **PROFILES[args.run_profile]
+    )
+    optimizer = AdamW(model.parameters(), lr=5e-5)
+    scheduler = get_linear_schedule_with_warmup(optimizer, 0, len(batches))
+    metrics = train_improved.train_epoch(
+        train_model, batches, optimizer, scheduler, None, 0, amp_context
+    )
+
+    result = {
+        "profile": args.run_profile,
+        "precision": profile["precision"],
+        "compiled": profile["compiled"],
+        "step_time_ms": metrics["step_time_ms"],
+        "peak_memory_mb": metrics["peak_memory_mb"],
+        "training_memory_mb": metrics["peak_memory_mb"] - memory_before,
+        "loss": metrics["loss"],
+    }
+    print(json.dumps(result))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark bf16/compile em CPU")
+    parser.add_argument("--model", default="neuralmind/bert-base-portuguese-cased")
+    parser.add_argument("--max-length", type=int, default=256)
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--steps", type=int, default=30)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument(
+        "--profiles", default=",".join(PROFILES), help="Perfis separados por vírgula"
+    )
+    parser.add_argument("--run-profile", choices=PROFILES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_profile:
+        run_profile(args)
+        return
+
+    from cpu_training import cpu_supports_bf16
+
+    print(f"🖥️ bf16 nativo na CPU: {'sim' if cpu_supports_bf16() else 'não'}")
+    results = []
+    for name in args.profiles.split(","):
+        print(f"🚀 Perfil {name}...")
+        output = subprocess.run(
+            [
+                sys.executable,
+                os.path.abspath(__file__),
+                "--run-profile",
+                name,
+                "--model",
+                args.model,
+                "--max-length",
+                str(args.max_length),
+                "--batch-size",
+                str(args.batch_size),
+                "--steps",
+                str(args.steps),
+                "--seed",
+                str(args.seed),
+            ],
+            capture_output=True,
+            text=True,
+        )
+        if output.returncode != 0:
+            print(f"❌ Perfil {name} falhou:\n{output.stderr[-2000:]}")
+            continue
+        results.append(json.loads(output.stdout.strip().splitlines()[-1]))
+
+    if not results:
+        return
+
+    base = results[0]
+    print(
+        f"\n{'Perfil':<14}{'compilado':>10}{'ms/passo':>10}{'speedup':>9}"
+        f"{'pico MB':>9}{'treino MB':>11}{'loss':>8}"
+    )
+    for result in results:
+        speedup = base["step_time_ms"] / result["step_time_ms"]
+        print(
+            f"{result['profile']:<14}{'sim' if result['compiled'] else 'não':>10}"
+            f"{result['step_time_ms']:>10.1f}{speedup:>8.2f}x"
+            f"{result['peak_memory_mb']:>9.0f}{result['training_memory_mb']:>11.0f}"
+            f"{result['loss']:>8.4f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
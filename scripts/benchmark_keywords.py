@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Benchmark das regras de palavras-chave: busca por substring vs motor compilado
+
+Compara, por email, o custo da busca antiga (listas reconstruídas a cada
+chamada e um "keyword in text_lower" por palavra-chave, em cada uma das três
+camadas de regras) com uma única passada do KeywordEngine por camada.
+
+Os conjuntos são emails corporativos curtos e threads longas sintéticas
+(corpo com vários parágrafos e histórico citado), montados a partir de
+frases típicas em português.
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+# Adicionar o diretório raiz ao path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import CORRECTION_KEYWORDS
+from scripts.smart_classifier import SMART_KEYWORDS
+from utils import REPLY_KEYWORDS
+
+ENGINES = (CORRECTION_KEYWORDS, SMART_KEYWORDS, REPLY_KEYWORDS)
+
+
+def substring_scan(text):
+    """Busca anterior: uma varredura do texto por palavra-chave"""
+    hits = []
+    for engine in ENGINES:
+        text_lower = text.lower()
+        # As listas eram montadas dentro de cada função, a cada chamada
+        categories = {
+            category: list(keywords)
+            for category, keywords in engine.categories.items()
+        }
+        hits.append(
+            {
+                category: sum(1 for keyword in keywords if keyword in text_lower)
+                for category, keywords in categories.items()
+            }
+        )
+    return hits
+
+
+def engine_scan(text):
+    """Busca atual: uma passada do motor compilado por camada"""
+    return [engine.scan(text).categories() for engine in ENGINES]
+
+
+SENTENCES = [
+    "Bom dia, poderia confirmar se o relatório financeiro de março já está disponível no sistema?",
+    "Segue em anexo a planilha atualizada com os indicadores do trimestre.",
+    "Precisamos alinhar o cronograma de entrega da próxima versão do aplicativo.",
+    "O servidor de homologação apresentou lentidão durante a noite de ontem.",
+    "Conforme conversado, encaminho os documentos para análise do jurídico.",
+    "A equipe de infraestrutura vai atualizar os certificados na sexta-feira.",
+    "Gostaria de agradecer a todos pelo empenho nas últimas semanas.",
+    "Os clientes relataram dificuldades para acessar o portal após a atualização.",
+    "Vamos revisar os contratos pendentes antes do fechamento do mês.",
+    "Lembrando que o treinamento obrigatório termina na próxima quinta.",
+    "A nota fiscal foi emitida e enviada para o financeiro do fornecedor.",
+    "Aproveito para informar que o escritório estará fechado no feriado.",
+]
+
+
+def build_emails(count: int, paragraphs: int, seed: int = 0):
+    """Monta emails com corpo de `paragraphs` frases e histórico citado"""
+    rng = random.Random(seed)
+    emails = []
+    for i in range(count):
+        body = "\n\n".join(rng.choice(SENTENCES) for _ in range(paragraphs))
+        quoted = "\n".join(f"> {rng.choice(SENTENCES)}" for _ in range(paragraphs // 3))
+        emails.append(
+            f"Olá equipe,\n\n{body}\n\nAtenciosamente,\nMaria\n\n"
+            f"Em seg, 3 de jun, João escreveu:\n{quoted}"
+        )
+    return emails
+
+
+def cpu_time_per_email(scan, texts, repeats: int):
+    """Tempo de CPU médio por email (µs)"""
+    for text in texts[:10]:
+        scan(text)  # aquecimento
+    start = time.process_time()
+    for _ in range(repeats):
+        for text in texts:
+            scan(text)
+    return (time.process_time() - start) / (repeats * len(texts)) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de palavras-chave")
+    parser.add_argument("--emails", type=int, default=200)
+    parser.add_argument("--paragraphs", type=int, default=100)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    short_texts = build_emails(args.emails, 3)
+    long_texts = build_emails(args.emails, args.paragraphs)
+
+    print("📊 Tempo de CPU das regras de palavras-chave por email (3 camadas)")
+    print(f"{'Conjunto':<22}{'substring (µs)':>16}{'motor (µs)':>14}{'speedup':>10}")
+    print("-" * 62)
+    for name, texts in (("curtos", short_texts), ("longos", long_texts)):
+        before = cpu_time_per_email(substring_scan, texts, args.repeats)
+        after = cpu_time_per_email(engine_scan, texts, args.repeats)
+        print(f"{name:<22}{before:>16.1f}{after:>14.1f}{before / after:>9.1f}x")
+
+    # Falsos positivos da busca por substring
+    example = "Boa noite, segue o relatório de atualização."
+    print(f"\n🔍 Exemplo: {example!r}")
+    print(f"   substring: 'oi' encontrado = {'oi' in example.lower()}")
+    print(f"   motor:     social = {CORRECTION_KEYWORDS.scan(example).keywords('social')}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Benchmark da detecção de idioma: langdetect vs detector por perfis
+
+Mede o custo por email (sem cache e com cache) do detector do app
+(language_detection) em emails curtos e longos, verifica que o resultado é
+idêntico entre execuções, mede a acurácia em frases curtas ambíguas entre
+inglês e português e, se o langdetect estiver instalado, compara custo e
+concordância com ele.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+# Adicionar o diretório raiz ao path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from language_detection import LanguageDetector
+
+SAMPLE_EMAILS = [
+    "Bom dia, poderia confirmar se o relatório financeiro de março já está disponível no sistema?",
+    "Oi pessoal! Só passando para desejar um ótimo fim de semana a todos.",
+    "Preciso que vocês revisem o contrato até sexta-feira, é urgente.",
+    "Feliz aniversário, Maria! Muitas felicidades e saúde.",
+    "Estamos com um erro crítico no servidor de produção desde ontem à noite.",
+    "Please send the quarterly report before the meeting tomorrow.",
+    "Thanks for the update, I will review the documents and get back to you.",
+    "Hola, ¿podrías enviarme el informe mañana? Gracias.",
+    "Bonjour, merci pour votre message, je vous réponds dans la journée.",
+    "Hallo, bitte senden Sie mir die Unterlagen bis Freitag. Danke!",
+]
+
+# Frases curtas cheias de palavras funcionais comuns a inglês e português
+# ("as", "do", "no"...), com o idioma esperado
+MIXED_SENTENCES = [
+    ("en", "No, I do not know as much as him."),
+    ("en", "Do you know where he is now?"),
+    ("en", "As soon as you can, do it."),
+    ("en", "No one told me about it."),
+    ("en", "She has as many as we do."),
+    ("en", "I am not sure, so let me know."),
+    ("en", "Why do they need it so soon?"),
+    ("en", "Yes, we had no time for that."),
+    ("en", "Do not send it to them yet."),
+    ("en", "He was here as early as noon."),
+    ("en", "Is it done? No idea."),
+    ("en", "Let me see what I can do."),
+    ("pt", "Não sei se ele vai hoje."),
+    ("pt", "Os dados estão no sistema."),
+    ("pt", "E o relatório do mês?"),
+    ("pt", "As reuniões são às dez."),
+    ("pt", "Eu vou ver isso agora."),
+    ("pt", "Do jeito que está, não dá."),
+    ("pt", "No fim do dia te aviso."),
+    ("pt", "Em breve mando o arquivo."),
+    ("pt", "Você pode me ligar depois?"),
+    ("pt", "Ainda não recebi o email."),
+    ("pt", "Ela disse que já foi feito."),
+    ("pt", "Tudo certo por aqui, obrigado."),
+]
+
+
+def time_per_email(detect, texts, repeats: int) -> float:
+    """Tempo médio por email (µs)"""
+    start = time.perf_counter()
+    for _ in range(repeats):
+        for text in texts:
+            detect(text)
+    return (time.perf_counter() - start) / (repeats * len(texts)) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de detecção de idioma")
+    parser.add_argument("--repeats", type=int, default=200)
+    parser.add_argument("--long-paragraphs", type=int, default=200)
+    args = parser.parse_args()
+
+    short_texts = SAMPLE_EMAILS
+    long_texts = ["\n\n".join([text] * args.long_paragraphs) for text in SAMPLE_EMAILS]
+
+    uncached = LanguageDetector(cache_size=0)
+    cached = LanguageDetector()
+
+    print("📊 Detecção de idioma (µs por email)")
+    print(f"{'Conjunto':<10}{'sem cache':>12}{'com cache':>12}{'langdetect':>14}")
+    print("-" * 48)
+
+    try:
+        from langdetect import DetectorFactory
+        from langdetect import detect as langdetect_detect
+
+        langdetect_detect(short_texts[0])  # carregar os perfis
+    except ImportError:
+        langdetect_detect = None
+
+    for name, texts in (("curtos", short_texts), ("longos", long_texts)):
+        cost = time_per_email(uncached.detect, texts, args.repeats)
+        cached.detect_batch(texts)  # preencher o cache
+        cost_cached = time_per_email(cached.detect, texts, args.repeats)
+        if langdetect_detect is not None:
+            baseline = time_per_email(langdetect_detect, texts, 1)
+            baseline_text = f"{baseline:>14.1f}"
+        else:
+            baseline_text = f"{'n/d':>14}"
+        print(f"{name:<10}{cost:>12.1f}{cost_cached:>12.1f}{baseline_text}")
+
+    # Determinismo: detectores independentes devolvem sempre o mesmo idioma
+    runs = [LanguageDetector(cache_size=0).detect_batch(short_texts) for _ in range(5)]
+    print(
+        f"\n🔁 Resultados idênticos em 5 execuções: {all(r == runs[0] for r in runs)}"
+    )
+
+    detector = LanguageDetector(cache_size=0)
+    misses = [
+        (expected, language, text)
+        for expected, text in MIXED_SENTENCES
+        if (language := detector.detect(text)) != expected
+    ]
+    hits = len(MIXED_SENTENCES) - len(misses)
+    print(f"🎯 Frases curtas EN/PT: {hits}/{len(MIXED_SENTENCES)} corretas")
+    for expected, language, text in misses:
+        print(f"   ❌ esperado {expected}, detectado {language}: {text}")
+
+    if langdetect_detect is not None:
+        # Sem semente fixa o langdetect pode mudar de resposta entre execuções
+        DetectorFactory.seed = 0
+        reference = [langdetect_detect(text) for text in short_texts]
+        agreement = sum(a == b for a, b in zip(runs[0], reference)) / len(reference)
+        print(f"🤝 Concordância com langdetect: {agreement:.0%}")
+
+    for text, language in zip(short_texts, runs[0]):
+        print(f"   {language}  {text[:60]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Benchmark de lotes agrupados por comprimento vs padding fixo
+
+Compara três estratégias em data/processed/train.json:
+    - fixo: todo exemplo preenchido até max_length (comportamento anterior)
+    - dinâmico: lotes aleatórios, padding até o maior de cada lote
+    - agrupado: LengthGroupedBatchSampler + padding dinâmico
+
+Para cada uma mostra os tokens processados por época e, com --epochs > 0,
+treina uma cópia do modelo a partir dos mesmos pesos, medindo o tempo por
+época e a acurácia em validation.json.
+"""
+
+import argparse
+import copy
+import os
+import random
+import sys
+import time
+
+# Adicionar o diretório raiz ao path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import torch
+from torch.optim import AdamW
+from torch.utils.data import DataLoader
+from transformers import (
+    AutoModelForSequenceClassification,
+    AutoTokenizer,
+    DataCollatorWithPadding,
+)
+
+from dataset_cache import load_tokenized_splits
+from length_batching import (
+    LengthGroupedBatchSampler,
+    create_length_grouped_dataloader,
+    padded_tokens,
+    sequence_lengths,
+)
+
+
+def random_batches(n: int, batch_size: int, seed: int):
+    indices = list(range(n))
+    random.Random(seed).shuffle(indices)
+    return [indices[i : i + batch_size] for i in range(0, n, batch_size)]
+
+
+def build_dataloader(strategy: str, dataset, tokenizer, args, lengths):
+    """DataLoader de treino para a estratégia"""
+    if strategy == "agrupado":
+        return create_length_grouped_dataloader(
+            dataset,
+            DataCollatorWithPadding(tokenizer=tokenizer),
+            args.batch_size,
+            lengths=lengths,
+        )
+    collator = DataCollatorWithPadding(
+        tokenizer=tokenizer,
+        padding="max_length" if strategy == "fixo" else "longest",
+        max_length=args.max_length,
+    )
+    return DataLoader(
+        dataset, batch_size=args.batch_size, shuffle=True, collate_fn=collator
+    )
+
+
+def train_and_evaluate(model, dataloader, eval_dataloader, epochs: int):
+    """Treina e devolve (segundos por época, acurácia)"""
+    optimizer = AdamW(model.parameters(), lr=5e-5)
+    start = time.perf_counter()
+    model.train()
+    for _ in range(epochs):
+        for batch in dataloader:
+            optimizer.zero_grad()
+            model(**batch).loss.backward()
+            optimizer.step()
+    seconds_per_epoch = (time.perf_counter() - start) / epochs
+
+    model.eval()
+    correct = total = 0
+    with torch.no_grad():
+        for batch in eval_dataloader:
+            labels = batch.pop("labels")
+            predictions = model(**batch).logits.argmax(dim=-1)
+            correct += int((predictions == labels).sum())
+            total += len(labels)
+    return seconds_per_epoch, correct / total
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de lotes por comprimento")
+    parser.add_argument("--model", default="models/model_distilbert_cased")
+    parser.add_argument("--max-length", type=int, default=512)
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument(
+        "--epochs", type=int, default=0, help="Épocas de treino por estratégia"
+    )
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    tokenizer = AutoTokenizer.from_pretrained(args.model)
+    splits = load_tokenized_splits(
+        tokenizer, args.max_length, splits=("train", "validation")
+    )
+    train, validation = splits["train"], splits["validation"]
+    lengths = sequence_lengths(train)
+    real = sum(lengths)
+
+    grouped = LengthGroupedBatchSampler(lengths, args.batch_size, seed=args.seed)
+    tokens = {
+        "fixo": len(lengths) * args.max_length,
+        "dinâmico": padded_tokens(
+            lengths, random_batches(len(lengths), args.batch_size, args.seed)
+        ),
+        "agrupado": padded_tokens(lengths, grouped.batches()),
+    }
+
+    print(f"📊 {len(lengths)} exemplos, {real:,} tokens de texto")
+    print(f"   Comprimento médio: {real / len(lengths):.1f}, máximo: {max(lengths)}")
+    print(f"\n{'Estratégia':<12}{'tokens/época':>16}{'padding':>10}")
+    for strategy, count in tokens.items():
+        print(f"{strategy:<12}{count:>16,}{1 - real / count:>10.1%}")
+
+    if args.epochs <= 0:
+        return
+
+    torch.manual_seed(args.seed)
+    base = AutoModelForSequenceClassification.from_pretrained(args.model)
+    eval_dataloader = create_length_grouped_dataloader(
+        validation,
+        DataCollatorWithPadding(tokenizer=tokenizer),
+        args.batch_size * 2,
+        shuffle=False,
+    )
+
+    print(f"\n{'Estratégia':<12}{'s/época':>10}{'acurácia':>10}")
+    for strategy in tokens:
+        torch.manual_seed(args.seed)
+        dataloader = build_dataloader(strategy, train, tokenizer, args, lengths)
+        seconds, accuracy = train_and_evaluate(
+            copy.deepcopy(base), dataloader, eval_dataloader, args.epochs
+        )
+        print(f"{strategy:<12}{seconds:>10.1f}{accuracy:>10.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Benchmark de latência: modo "translate" vs modo "native_pt"
+
+- translate: detecção de idioma → tradução PT→EN → DistilBERT em inglês
+- native_pt: detecção de idioma → BERT PT-BR direto (sem tradução)
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+# Adicionar o diretório raiz ao path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmark_translation import SAMPLE_EMAILS, detect
+from config.local_model import MODEL_CONFIG
+from inference import load_model, run_inference
+from translation import get_translation_backend
+
+
+def measure(fn, texts) -> list:
+    """Latência (ms) de fn para cada texto"""
+    latencies = []
+    for text in texts:
+        start = time.perf_counter()
+        fn(text)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do modo nativo PT")
+    parser.add_argument("--model-dir", default="models/model_distilbert_cased")
+    parser.add_argument("--native-model-dir", default=MODEL_CONFIG["local_path"])
+    parser.add_argument("--translation-backend", default=None)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    en_tokenizer, en_model = load_model(args.model_dir)
+    pt_tokenizer, pt_model = load_model(args.native_model_dir)
+    translator = get_translation_backend(args.translation_backend)
+
+    def translate_path(text):
+        if detect(text) == "pt":
+            text = translator.translate(text, "pt", "en")
+        return run_inference(en_tokenizer, en_model, text)
+
+    def native_path(text):
+        if detect(text) == "pt":
+            return run_inference(pt_tokenizer, pt_model, text)
+        return run_inference(en_tokenizer, en_model, text)
+
+    # Aquecimento (carga do modelo de tradução e primeiras alocações)
+    translate_path(SAMPLE_EMAILS[0])
+    native_path(SAMPLE_EMAILS[0])
+    translator.clear_cache()
+
+    texts = SAMPLE_EMAILS * args.repeat
+    print(f"🚀 Benchmark com {len(texts)} emails em português")
+
+    for name, fn in [("translate", translate_path), ("native_pt", native_path)]:
+        # Cache de tradução desligado na prática: cada rodada começa vazia
+        translator.clear_cache()
+        latencies = measure(fn, texts)
+        print(
+            f"  {name:<10} média {statistics.mean(latencies):8.1f}ms | "
+            f"p50 {statistics.median(latencies):8.1f}ms | "
+            f"max {max(latencies):8.1f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Benchmark do treino empacotado vs lotes agrupados por comprimento
+
+Mostra a eficiência do empacotamento (tokens reais / tokens processados)
+em data/processed/train.json e confere que o forward empacotado reproduz os
+logits do forward normal (mesmo modelo, modo eval). Com --epochs > 0 treina
+uma cópia do modelo em cada modo a partir dos mesmos pesos e compara o tempo
+por época e a acurácia em test.json (avaliado sem empacotamento).
+"""
+
+import argparse
+import copy
+import os
+import sys
+import time
+
+# Adicionar o diretório raiz ao path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import torch
+import torch.nn.functional as F
+from torch.optim import AdamW
+from torch.utils.data import DataLoader
+from transformers import (
+    AutoModelForSequenceClassification,
+    AutoTokenizer,
+    DataCollatorWithPadding,
+)
+
+from dataset_cache import load_tokenized_splits
+from length_batching import (
+    LengthGroupedBatchSampler,
+    create_length_grouped_dataloader,
+    padded_tokens,
+    sequence_lengths,
+)
+from packing import (
+    PackedDataCollator,
+    PackedDataset,
+    packed_forward,
+    packed_logit_difference,
+)
+
+
+def train_epochs(model, dataloader, epochs: int, packed: bool) -> float:
+    """Treina e devolve os segundos por época"""
+    optimizer = AdamW(model.parameters(), lr=5e-5)
+    start = time.perf_counter()
+    model.train()
+    for _ in range(epochs):
+        for batch in dataloader:
+            optimizer.zero_grad()
+            if packed:
+                logits, labels = packed_forward(model, batch)
+                loss = F.cross_entropy(logits, labels)
+            else:
+                loss = model(**batch).loss
+            loss.backward()
+            optimizer.step()
+    return (time.perf_counter() - start) / epochs
+
+
+def evaluate(model, dataloader) -> float:
+    """Acurácia sem empacotamento"""
+    model.eval()
+    correct = total = 0
+    with torch.no_grad():
+        for batch in dataloader:
+            labels = batch.pop("labels")
+            predictions = model(**batch).logits.argmax(dim=-1)
+            correct += int((predictions == labels).sum())
+            total += len(labels)
+    return correct / total
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de empacotamento")
+    parser.add_argument("--model", default="models/model_distilbert_cased")
+    parser.add_argument("--max-length", type=int, default=128)
+    parser.add_argument("--pack-length", type=int, default=128)
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument(
+        "--epochs", type=int, default=0, help="Épocas de treino por modo"
+    )
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    tokenizer = AutoTokenizer.from_pretrained(args.model)
+    splits = load_tokenized_splits(tokenizer, args.max_length, splits=("train", "test"))
+    train, test = splits["train"], splits["test"]
+    lengths = sequence_lengths(train)
+    packed = PackedDataset(train, args.pack_length)
+    summary = packed.summary()
+
+    grouped = padded_tokens(
+        lengths,
+        LengthGroupedBatchSampler(lengths, args.batch_size, seed=args.seed).batches(),
+    )
+    print(f"📊 {summary['examples']} exemplos, {packed.real_tokens:,} tokens de texto")
+    print(
+        f"   Agrupado por comprimento: {grouped:,} tokens/época "
+        f"(eficiência {packed.real_tokens / grouped:.1%})"
+    )
+    print(
+        f"   Empacotado: {summary['packs']} pacotes de {args.pack_length}, "
+        f"{summary['examples_per_pack']:.1f} exemplos/pacote "
+        f"(eficiência {summary['efficiency']:.1%})"
+    )
+
+    torch.manual_seed(args.seed)
+    base = AutoModelForSequenceClassification.from_pretrained(args.model)
+    difference = packed_logit_difference(
+        base, test.select(range(min(64, len(test)))), tokenizer, args.pack_length
+    )
+    print(f"🔍 Diferença máxima de logits (empacotado vs normal): {difference:.2e}")
+
+    if args.epochs <= 0:
+        return
+
+    eval_dataloader = create_length_grouped_dataloader(
+        test,
+        DataCollatorWithPadding(tokenizer=tokenizer),
+        args.batch_size * 2,
+        shuffle=False,
+    )
+    # Mesmo número de exemplos por passo nos dois modos
+    pack_batch_size = max(1, round(args.batch_size / summary["examples_per_pack"]))
+    dataloaders = {
+        "agrupado": create_length_grouped_dataloader(
+            train,
+            DataCollatorWithPadding(tokenizer=tokenizer),
+            args.batch_size,
+            lengths=lengths,
+        ),
+        "empacotado": DataLoader(
+            packed,
+            batch_size=pack_batch_size,
+            shuffle=True,
+            collate_fn=PackedDataCollator(tokenizer),
+        ),
+    }
+
+    print(f"\n{'Modo':<12}{'s/época':>10}{'acurácia (test)':>18}")
+    for mode, dataloader in dataloaders.items():
+        torch.manual_seed(args.seed)
+        model = copy.deepcopy(base)
+        seconds = train_epochs(model, dataloader, args.epochs, mode == "empacotado")
+        print(f"{mode:<12}{seconds:>10.1f}{evaluate(model, eval_dataloader):>18.4f}")
+
+
+if __name__ == "__main__":
+    main()
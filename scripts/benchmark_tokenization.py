@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Benchmark de tokenização: corte por caracteres vs orçamento de tokens
+
+Compara o tempo de CPU por email, do texto bruto até os tensores de entrada
+do modelo, entre:
+- texto inteiro: tokenização com truncation=True do texto completo (o que
+  run_inference/run_batch_inference faziam com textos não pré-processados);
+- 2000 caracteres: o preprocess_for_inference antigo + truncation=True;
+- orçamento: o pré-processamento atual (text_budget.encode_with_budget),
+  que tokeniza só as janelas de início e final dos emails longos, e
+  inference.pad_input_ids.
+
+Cada conjunto é medido com um email por chamada (como run_inference no app)
+e em lotes (como run_batch_inference). Os conjuntos são os emails curtos de
+data/processed/test.json e emails longos sintéticos (threads com assinatura
+e histórico citado).
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+# Adicionar o diretório raiz ao path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from transformers import AutoTokenizer
+
+from inference import pad_input_ids, preprocess_for_inference
+from text_budget import encode_with_budget
+
+DATASET_PATH = "data/processed/test.json"
+
+
+def full_encode(tokenizer, texts):
+    """Tokenização do texto completo, truncado depois em 512 tokens"""
+    return tokenizer(
+        texts, truncation=True, padding=True, max_length=512, return_tensors="pt"
+    )
+
+
+def legacy_encode(tokenizer, texts):
+    """Pré-processamento anterior: corte em 2000 caracteres e truncation"""
+    clipped = []
+    for text in texts:
+        text = " ".join(text.split())
+        if len(text) > 2000:
+            text = text[:2000] + "..."
+        clipped.append(text)
+    return full_encode(tokenizer, clipped)
+
+
+def budget_encode(tokenizer, texts):
+    """Pré-processamento atual: orçamento de tokens início + final"""
+    return pad_input_ids(
+        tokenizer,
+        encode_with_budget(
+            tokenizer, [preprocess_for_inference(text) for text in texts]
+        ),
+    )
+
+
+def build_long_emails(texts, count: int, paragraphs: int):
+    """Monta threads longas a partir de textos reais"""
+    emails = []
+    for i in range(count):
+        body = "\n\n".join(texts[(i + j) % len(texts)] for j in range(paragraphs))
+        quoted = "\n".join(f"> {texts[(i + j) % len(texts)]}" for j in range(20))
+        emails.append(
+            f"Assunto: Atualização do projeto {i}\nOlá equipe,\n\n{body}\n\n"
+            f"Atenciosamente,\nMaria Silva\nGerente de Projetos\n\n"
+            f"Em seg, 3 de jun, Maria escreveu:\n{quoted}"
+        )
+    return emails
+
+
+def cpu_time_per_email(encode, tokenizer, texts, repeats: int, batch_size: int):
+    """Tempo de CPU médio por email (µs) e tokens reais médios por email"""
+    batches = [texts[i : i + batch_size] for i in range(0, len(texts), batch_size)]
+    encode(tokenizer, texts[:10])  # aquecimento
+    start = time.process_time()
+    for _ in range(repeats):
+        for batch in batches:
+            encode(tokenizer, batch)
+    elapsed = time.process_time() - start
+    tokens = sum(
+        encode(tokenizer, batch)["attention_mask"].sum().item() for batch in batches
+    )
+    return elapsed / (repeats * len(texts)) * 1e6, tokens / len(texts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de tokenização")
+    parser.add_argument("--model-dir", default="models/model_distilbert_cased")
+    parser.add_argument("--long-emails", type=int, default=200)
+    parser.add_argument("--paragraphs", type=int, default=60)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--batch-size", type=int, default=32)
+    args = parser.parse_args()
+
+    tokenizer = AutoTokenizer.from_pretrained(args.model_dir)
+    with open(DATASET_PATH, "r", encoding="utf-8") as f:
+        short_texts = [item["text"] for item in json.load(f)]
+    long_texts = build_long_emails(short_texts, args.long_emails, args.paragraphs)
+
+    print("📊 Tempo de CPU por email (texto → tensores do modelo)")
+    print(f"{'Conjunto':<30}{'Método':<18}{'µs/email':>12}{'tokens':>10}")
+    print("-" * 70)
+    for name, texts in (("curtos (test.json)", short_texts), ("longos", long_texts)):
+        for batch_size in (1, args.batch_size):
+            label = f"{name}, lote {batch_size}"
+            results = {}
+            for method, encode in (
+                ("texto inteiro", full_encode),
+                ("2000 caracteres", legacy_encode),
+                ("orçamento", budget_encode),
+            ):
+                results[method] = cpu_time_per_email(
+                    encode, tokenizer, texts, args.repeats, batch_size
+                )
+                micros, tokens = results[method]
+                print(f"{label:<30}{method:<18}{micros:>12.1f}{tokens:>10.1f}")
+            after = results["orçamento"][0]
+            for baseline in ("texto inteiro", "2000 caracteres"):
+                reduction = 1 - after / results[baseline][0]
+                print(f"{'':<30}{'vs ' + baseline:<18}{reduction:>12.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Benchmark de latência ponta a ponta: detecção de idioma → tradução → modelo
+
+Compara o caminho atual (GoogleTranslator, uma chamada de rede por email)
+com o backend MarianMT local, por email e em lote.
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+# Adicionar o diretório raiz ao path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from inference import load_model, run_batch_inference, run_inference
+from language_detection import detect_language
+from translation import get_translation_backend
+
+SAMPLE_EMAILS = [
+    "Bom dia, poderia confirmar se o relatório financeiro de março já está disponível no sistema?",
+    "Oi pessoal! Só passando para desejar um ótimo fim de semana a todos.",
+    "Preciso que vocês revisem o contrato até sexta-feira, é urgente.",
+    "Feliz aniversário, Maria! Muitas felicidades e saúde.",
+    "Estamos com um erro crítico no servidor de produção desde ontem à noite.",
+    "Gostaria de agendar uma reunião para discutir o cronograma do projeto.",
+    "Obrigado pelo envio dos documentos, vou analisar e retorno em breve.",
+    "Você foi selecionado para ganhar um cupom de R$500! Clique aqui e resgate agora.",
+]
+
+
+def detect(text: str) -> str:
+    """Mesma detecção usada pelo app"""
+    return detect_language(text)
+
+
+def run_single(backend, tokenizer, model, texts):
+    """Um email por vez: detecção → tradução → inferência"""
+    latencies = []
+    for text in texts:
+        start = time.perf_counter()
+        if detect(text) == "pt":
+            text = backend.translate(text, "pt", "en")
+        run_inference(tokenizer, model, text)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def run_batched(backend, tokenizer, model, texts):
+    """Todos os emails em uma chamada de tradução e uma de inferência"""
+    start = time.perf_counter()
+    languages = [detect(text) for text in texts]
+    pt_indices = [i for i, lang in enumerate(languages) if lang == "pt"]
+    translated = backend.translate_batch([texts[i] for i in pt_indices], "pt", "en")
+    texts = list(texts)
+    for i, text in zip(pt_indices, translated):
+        texts[i] = text
+    run_batch_inference(tokenizer, model, texts)
+    return (time.perf_counter() - start) * 1000
+
+
+def report(name: str, latencies: list):
+    ordered = sorted(latencies)
+    p95 = ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))]
+    print(
+        f"  {name:<24} média {statistics.mean(latencies):8.1f}ms | "
+        f"p50 {statistics.median(latencies):8.1f}ms | p95 {p95:8.1f}ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de tradução")
+    parser.add_argument("--model-dir", default="models/model_distilbert_cased")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--backends", default="google,marian", help="Backends separados por vírgula"
+    )
+    args = parser.parse_args()
+
+    tokenizer, model = load_model(args.model_dir)
+    texts = SAMPLE_EMAILS * args.repeat
+
+    print(f"🚀 Benchmark com {len(texts)} emails")
+    for name in args.backends.split(","):
+        try:
+            backend = get_translation_backend(name)
+            # Aquecimento (carga do modelo / conexão); cache limpo depois
+            backend.translate(SAMPLE_EMAILS[0], "pt", "en")
+        except Exception as e:
+            print(f"  ⚠️ Backend {name} indisponível: {e}")
+            continue
+
+        backend.clear_cache()
+        report(f"{name} (por email)", run_single(backend, tokenizer, model, texts))
+
+        backend.clear_cache()
+        total = run_batched(backend, tokenizer, model, texts)
+        print(
+            f"  {name + ' (lote)':<24} total {total:8.1f}ms | "
+            f"{total / len(texts):.1f}ms/email"
+        )
+
+        # Emails repetidos saem do cache de traduções
+        report(f"{name} (cache quente)", run_single(backend, tokenizer, model, texts))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,399 @@
+#!/usr/bin/env python3
+"""
+Classificação em massa de corpora de emails (CSV, JSONL ou Parquet)
+
+As linhas são lidas em streaming (o arquivo nunca é carregado inteiro),
+agrupadas em blocos e distribuídas para um pool de processos; cada processo
+carrega o modelo uma única vez. As predições são gravadas incrementalmente
+(JSONL ou arquivos Parquet parciais) e o offset processado é salvo em um
+checkpoint, de modo que uma execução interrompida continue de onde parou.
+
+Também lê caixas de email (.eml, mbox e Maildir, via email_ingest), com o
+parsing MIME feito em streaming.
+
+Exemplos:
+    python scripts/bulk_classify.py emails.csv predicoes.jsonl --workers 8
+    python scripts/bulk_classify.py emails.parquet saida_parquet/ \\
+        --text-column body --id-column message_id
+    python scripts/bulk_classify.py caixa.mbox predicoes.jsonl \\
+        --id-column message_id --parse-workers 2
+
+Para throughput máximo use um worker por núcleo com 1 thread cada (padrão):
+os workers não disputam threads entre si e o ganho é quase linear.
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from collections import deque
+from itertools import islice
+from multiprocessing import get_context
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# Adicionar o diretório raiz ao path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+DEFAULT_MODEL_DIR = "models/model_distilbert_cased"
+
+# Modelo do processo worker (carregado uma vez em _init_worker)
+_WORKER_STATE: Dict = {}
+
+
+# === Leitura em streaming ===
+
+
+def read_csv(path: str, skip: int) -> Iterator[Dict]:
+    """Linhas de um CSV com cabeçalho, a partir da linha skip"""
+    csv.field_size_limit(sys.maxsize)
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        yield from islice(csv.DictReader(f), skip, None)
+
+
+def read_jsonl(path: str, skip: int) -> Iterator[Dict]:
+    """Objetos de um JSONL (um por linha), pulando os skip primeiros"""
+    with open(path, "r", encoding="utf-8") as f:
+        # O checkpoint conta registros, não linhas: linhas em branco não contam
+        records = (line for line in f if line.strip())
+        for line in islice(records, skip, None):
+            yield json.loads(line)
+
+
+def read_parquet(path: str, skip: int) -> Iterator[Dict]:
+    """Linhas de um Parquet lidas por lotes, pulando row groups já processados"""
+    import pyarrow.parquet as pq
+
+    parquet = pq.ParquetFile(path)
+    for group in range(parquet.num_row_groups):
+        rows = parquet.metadata.row_group(group).num_rows
+        if skip >= rows:
+            skip -= rows
+            continue
+        for batch in parquet.iter_batches(row_groups=[group], batch_size=4096):
+            records = batch.to_pylist()
+            if skip:
+                records, skip = records[skip:], max(0, skip - len(records))
+            yield from records
+
+
+def read_emails(path: str, skip: int, workers: int = 0) -> Iterator[Dict]:
+    """Mensagens de um .eml, mbox ou Maildir (campos de EmailRecord + text)"""
+    from email_ingest import iter_emails
+
+    for record in iter_emails(path, workers=workers, skip=skip):
+        yield record.to_dict()
+
+
+READERS = {
+    "csv": read_csv,
+    "jsonl": read_jsonl,
+    "parquet": read_parquet,
+    "eml": read_emails,
+    "mbox": read_emails,
+    "maildir": read_emails,
+}
+
+
+def detect_format(path: str) -> str:
+    """Formato de entrada pela extensão do arquivo (diretório = Maildir/.eml)"""
+    if os.path.isdir(path):
+        return "maildir"
+    extension = os.path.splitext(path)[1].lower().lstrip(".")
+    extension = {
+        "json": "jsonl",
+        "ndjson": "jsonl",
+        "pq": "parquet",
+        "mbx": "mbox",
+    }.get(
+        extension, extension
+    )
+    if extension not in READERS:
+        raise ValueError(f"Formato de entrada não suportado: {path}")
+    return extension
+
+
+# === Workers ===
+
+
+def _init_worker(model_dir: str, threads: int):
+    """Carrega o modelo uma vez por processo, com threads limitadas"""
+    import torch
+
+    from inference import load_model
+
+    torch.set_num_threads(threads)
+    _WORKER_STATE["tokenizer"], _WORKER_STATE["model"] = load_model(model_dir)
+
+
+def _classify_chunk(args: Tuple[List[Tuple], int]) -> List[Dict]:
+    """Classifica um bloco de (id, texto) no processo worker"""
+    from inference import preprocess_for_inference, run_batch_inference
+
+    rows, batch_size = args
+    texts = [preprocess_for_inference(text or "") for _, text in rows]
+    non_empty = [i for i, text in enumerate(texts) if text]
+
+    predictions = dict(
+        zip(
+            non_empty,
+            run_batch_inference(
+                _WORKER_STATE["tokenizer"],
+                _WORKER_STATE["model"],
+                [texts[i] for i in non_empty],
+                batch_size,
+            )
+            if non_empty
+            else [],
+        )
+    )
+
+    results = []
+    for i, (row_id, _) in enumerate(rows):
+        # Textos vazios seguem a convenção do app: Improdutivo com confiança 0
+        prediction, confidence, scores = predictions.get(
+            i, ("Improdutivo", 0.0, {0: 1.0, 1: 0.0})
+        )
+        results.append(
+            {
+                "id": row_id,
+                "prediction": prediction,
+                "confidence": confidence,
+                "score_improdutivo": scores[0],
+                "score_produtivo": scores[1],
+            }
+        )
+    return results
+
+
+# === Saída e checkpoint ===
+
+
+class Checkpoint:
+    """Offset processado e estado da saída, gravados de forma atômica"""
+
+    def __init__(self, path: str, input_path: str):
+        self.path = path
+        self.input_path = os.path.abspath(input_path)
+        self.state = {"offset": 0, "output_bytes": 0, "parts": 0}
+
+    def load(self) -> bool:
+        """Carrega o checkpoint existente (False se não houver)"""
+        if not os.path.exists(self.path):
+            return False
+        with open(self.path, "r", encoding="utf-8") as f:
+            state = json.load(f)
+        if state.get("input") != self.input_path:
+            raise ValueError(
+                f"Checkpoint {self.path} pertence a outra entrada: {state.get('input')}"
+            )
+        self.state.update(state)
+        return True
+
+    def save(self, **updates):
+        self.state.update(updates, input=self.input_path, updated_at=time.time())
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.state, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+
+class JsonlWriter:
+    """Acrescenta predições a um JSONL; retoma truncando escritas sem checkpoint"""
+
+    def __init__(self, path: str, checkpoint: Checkpoint):
+        self.checkpoint = checkpoint
+        self.file = open(path, "a+b")
+        # Linhas gravadas depois do último checkpoint seriam duplicadas
+        self.file.truncate(checkpoint.state["output_bytes"])
+        self.file.seek(0, os.SEEK_END)
+
+    def write(self, results: List[Dict], offset: int):
+        for result in results:
+            self.file.write((json.dumps(result, ensure_ascii=False) + "\n").encode())
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.checkpoint.save(offset=offset, output_bytes=self.file.tell())
+
+    def close(self):
+        self.file.close()
+
+
+class ParquetWriter:
+    """Grava predições em arquivos Parquet parciais (part-00000.parquet, ...)"""
+
+    def __init__(self, directory: str, checkpoint: Checkpoint, rows_per_file: int):
+        self.directory = directory
+        self.checkpoint = checkpoint
+        self.rows_per_file = rows_per_file
+        self.buffer: List[Dict] = []
+        os.makedirs(directory, exist_ok=True)
+
+    def write(self, results: List[Dict], offset: int):
+        self.buffer.extend(results)
+        self.offset = offset
+        if len(self.buffer) >= self.rows_per_file:
+            self.flush()
+
+    def flush(self):
+        if not self.buffer:
+            return
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        part = self.checkpoint.state["parts"]
+        path = os.path.join(self.directory, f"part-{part:05d}.parquet")
+        pq.write_table(pa.Table.from_pylist(self.buffer), path + ".tmp")
+        os.replace(path + ".tmp", path)
+        self.buffer = []
+        self.checkpoint.save(offset=self.offset, parts=part + 1)
+
+    def close(self):
+        self.flush()
+
+
+def reset_output(output: str, parquet: bool):
+    """Remove a saída de uma execução anterior (nova execução do zero)"""
+    if parquet:
+        if os.path.isdir(output):
+            for name in os.listdir(output):
+                if name.startswith("part-") and name.endswith(".parquet"):
+                    os.remove(os.path.join(output, name))
+    elif os.path.exists(output):
+        os.remove(output)
+
+
+# === Execução ===
+
+
+def iter_chunks(
+    records: Iterator[Dict],
+    start: int,
+    chunk_rows: int,
+    text_column: str,
+    id_column: Optional[str],
+) -> Iterator[List[Tuple]]:
+    """Agrupa registros em blocos de (id, texto); o id padrão é o nº da linha"""
+    index = start
+    while True:
+        chunk = []
+        for record in islice(records, chunk_rows):
+            row_id = record.get(id_column) if id_column else index
+            chunk.append((row_id, record.get(text_column)))
+            index += 1
+        if not chunk:
+            return
+        yield chunk
+
+
+def main():
+    cpu_count = os.cpu_count() or 1
+
+    parser = argparse.ArgumentParser(description="Classificação em massa de emails")
+    parser.add_argument(
+        "input", help="Arquivo .csv, .jsonl, .parquet, .eml, mbox ou Maildir"
+    )
+    parser.add_argument(
+        "output", help="Arquivo .jsonl ou diretório para arquivos .parquet"
+    )
+    parser.add_argument("--format", choices=sorted(READERS), help="Padrão: extensão")
+    parser.add_argument("--text-column", default="text")
+    parser.add_argument("--id-column", help="Padrão: número da linha")
+    parser.add_argument("--model-dir", default=DEFAULT_MODEL_DIR)
+    parser.add_argument("--workers", type=int, default=cpu_count)
+    parser.add_argument(
+        "--threads-per-worker",
+        type=int,
+        help="Padrão: núcleos divididos entre os workers",
+    )
+    parser.add_argument(
+        "--parse-workers",
+        type=int,
+        default=0,
+        help="Processos para o parsing MIME de entradas de email",
+    )
+    parser.add_argument("--chunk-rows", type=int, default=512)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--rows-per-file", type=int, default=100_000)
+    parser.add_argument("--checkpoint", help="Padrão: <output>.checkpoint.json")
+    parser.add_argument("--limit", type=int, help="Processar no máximo N linhas")
+    parser.add_argument(
+        "--restart", action="store_true", help="Ignorar checkpoint existente"
+    )
+    args = parser.parse_args()
+
+    input_format = args.format or detect_format(args.input)
+    output_parquet = not args.output.endswith(".jsonl")
+    threads = args.threads_per_worker or max(1, cpu_count // args.workers)
+
+    checkpoint = Checkpoint(
+        args.checkpoint or args.output.rstrip("/") + ".checkpoint.json", args.input
+    )
+    if not args.restart and checkpoint.load():
+        print(f"♻️ Retomando a partir da linha {checkpoint.state['offset']}")
+    else:
+        reset_output(args.output, output_parquet)
+        checkpoint.save()
+
+    writer = (
+        ParquetWriter(args.output, checkpoint, args.rows_per_file)
+        if output_parquet
+        else JsonlWriter(args.output, checkpoint)
+    )
+
+    start = checkpoint.state["offset"]
+    if READERS[input_format] is read_emails:
+        records = read_emails(args.input, start, args.parse_workers)
+    else:
+        records = READERS[input_format](args.input, start)
+    if args.limit is not None:
+        records = islice(records, max(0, args.limit - start))
+    chunks = iter_chunks(
+        records, start, args.chunk_rows, args.text_column, args.id_column
+    )
+
+    print(f"🚀 {args.workers} workers x {threads} threads | modelo: {args.model_dir}")
+    context = get_context("spawn")
+    processed = 0
+    started_at = time.perf_counter()
+
+    with context.Pool(
+        args.workers, initializer=_init_worker, initargs=(args.model_dir, threads)
+    ) as pool:
+        # Poucos blocos em voo: memória limitada e saída na ordem de entrada
+        pending = deque()
+        offset = start
+
+        def drain_one():
+            nonlocal processed, offset
+            size, result = pending.popleft()
+            results = result.get()
+            offset += size
+            processed += size
+            writer.write(results, offset)
+            elapsed = time.perf_counter() - started_at
+            print(
+                f"\r📨 {offset} linhas | {processed / elapsed:.1f} linhas/s",
+                end="",
+                flush=True,
+            )
+
+        for chunk in chunks:
+            task = pool.apply_async(_classify_chunk, ((chunk, args.batch_size),))
+            pending.append((len(chunk), task))
+            if len(pending) >= args.workers * 2:
+                drain_one()
+        while pending:
+            drain_one()
+
+    writer.close()
+    elapsed = time.perf_counter() - started_at
+    print(
+        f"\n✅ {processed} linhas em {elapsed:.1f}s "
+        f"({processed / elapsed if elapsed else 0:.1f} linhas/s) → {args.output}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Relatório da cascata: modelo linear + transformer em data/processed/test.json
+
+Para cada limiar mostra a fração do tráfego decidida pelo modelo linear
+(sem forward pass do transformer), a acurácia da cascata e o throughput,
+comparados com o transformer sozinho. O tempo do transformer é medido
+executando-o de fato apenas nos emails incertos de cada limiar.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+# Adicionar o diretório raiz ao path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import torch
+
+from cascade import FastLinearClassifier, split_by_confidence
+from inference import load_model, run_batch_inference
+
+TEST_PATH = "data/processed/test.json"
+
+
+def timed_transformer(tokenizer, model, texts, batch_size: int):
+    """Predições do transformer e tempo gasto (s)"""
+    if not texts:
+        return [], 0.0
+    start = time.perf_counter()
+    predictions = run_batch_inference(tokenizer, model, texts, batch_size)
+    return [label for label, _, _ in predictions], time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Relatório da cascata")
+    parser.add_argument("--model-dir", default="models/model_distilbert_cased")
+    parser.add_argument("--fast-model-dir", default="models/fast_linear")
+    parser.add_argument("--dataset", default=TEST_PATH)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument(
+        "--thresholds", type=float, nargs="+", default=[0.8, 0.9, 0.95, 0.98, 0.99]
+    )
+    parser.add_argument("--threads", type=int, default=1)
+    args = parser.parse_args()
+
+    torch.set_num_threads(args.threads)
+
+    with open(args.dataset, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    texts = [item["text"] for item in data]
+    labels = [item["label_text"] for item in data]
+
+    fast = FastLinearClassifier.load(args.fast_model_dir)
+    tokenizer, model = load_model(args.model_dir)
+
+    # Aquecimento dos dois estágios
+    fast.predict_scores(texts[:32])
+    run_batch_inference(tokenizer, model, texts[:32], args.batch_size)
+
+    start = time.perf_counter()
+    fast_scores = fast.predict_scores(texts)
+    fast_seconds = time.perf_counter() - start
+    fast_labels = [max(scores, key=scores.get) for scores in fast_scores]
+
+    transformer_labels, transformer_seconds = timed_transformer(
+        tokenizer, model, texts, args.batch_size
+    )
+
+    def accuracy(predictions):
+        return sum(p == t for p, t in zip(predictions, labels)) / len(labels)
+
+    baseline_throughput = len(texts) / transformer_seconds
+
+    print(f"\n📊 CASCATA em {args.dataset} ({len(texts)} emails)")
+    print("=" * 72)
+    print(
+        f"{'Configuração':<20}{'curto-circuito':>16}{'acurácia':>10}"
+        f"{'emails/s':>12}{'speedup':>10}"
+    )
+    print("-" * 72)
+    print(
+        f"{'transformer':<20}{0:>16.1%}{accuracy(transformer_labels):>10.4f}"
+        f"{baseline_throughput:>12.1f}{1:>9.2f}x"
+    )
+
+    for threshold in args.thresholds:
+        decided, uncertain = split_by_confidence(fast_scores, threshold)
+        uncertain_labels, seconds = timed_transformer(
+            tokenizer, model, [texts[i] for i in uncertain], args.batch_size
+        )
+        predictions = list(fast_labels)
+        for i, label in zip(uncertain, uncertain_labels):
+            predictions[i] = label
+
+        throughput = len(texts) / (fast_seconds + seconds)
+        print(
+            f"{f'cascata {threshold:.2f}':<20}{len(decided) / len(texts):>16.1%}"
+            f"{accuracy(predictions):>10.4f}{throughput:>12.1f}"
+            f"{throughput / baseline_throughput:>9.2f}x"
+        )
+
+    fast_throughput = len(texts) / fast_seconds
+    print(
+        f"{'linear apenas':<20}{1:>16.1%}{accuracy(fast_labels):>10.4f}"
+        f"{fast_throughput:>12.1f}{fast_throughput / baseline_throughput:>9.2f}x"
+    )
+    print("-" * 72)
+    print("💡 Limiar no app: CASCADE_INFERENCE=1 CASCADE_THRESHOLD=<limiar>")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Teste de paridade e velocidade: PyTorch vs ONNX Runtime
+
+Classifica data/processed/test.json com os dois backends, verifica que as
+decisões de rótulo são idênticas e que as probabilidades diferem no máximo
+pela tolerância, e compara o tempo total. Sai com código 1 se falhar.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+# Adicionar o diretório raiz ao path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from inference import load_model, run_batch_inference
+
+DATASET_PATH = "data/processed/test.json"
+
+
+def timed_predictions(backend: str, model_dir: str, texts: list, batch_size: int):
+    """Carrega o backend e retorna (predições, segundos)"""
+    tokenizer, model = load_model(model_dir, backend=backend)
+    run_batch_inference(tokenizer, model, texts[:batch_size], batch_size)  # aquecimento
+
+    start = time.perf_counter()
+    predictions = run_batch_inference(tokenizer, model, texts, batch_size)
+    return predictions, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Paridade PyTorch x ONNX")
+    parser.add_argument("--model-dir", default="models/model_distilbert_cased")
+    parser.add_argument("--dataset", default=DATASET_PATH)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--tolerance", type=float, default=1e-3)
+    args = parser.parse_args()
+
+    with open(args.dataset, "r", encoding="utf-8") as f:
+        texts = [item["text"] for item in json.load(f)]
+
+    print(f"🧪 Paridade em {len(texts)} amostras de {args.dataset}")
+    torch_preds, torch_time = timed_predictions(
+        "pytorch", args.model_dir, texts, args.batch_size
+    )
+    onnx_preds, onnx_time = timed_predictions(
+        "onnx", args.model_dir, texts, args.batch_size
+    )
+
+    mismatches = [
+        i for i, (a, b) in enumerate(zip(torch_preds, onnx_preds)) if a[0] != b[0]
+    ]
+    max_diff = max(
+        abs(a[2][label] - b[2][label])
+        for a, b in zip(torch_preds, onnx_preds)
+        for label in a[2]
+    )
+
+    print("📊 Resultados:")
+    print(f"  - Rótulos divergentes: {len(mismatches)}")
+    print(f"  - Diferença máxima de probabilidade: {max_diff:.2e}")
+    print(f"  - PyTorch: {torch_time:.2f}s ({len(texts) / torch_time:.1f} emails/s)")
+    print(f"  - ONNX:    {onnx_time:.2f}s ({len(texts) / onnx_time:.1f} emails/s)")
+    print(f"  - Speedup: {torch_time / onnx_time:.2f}x")
+
+    if mismatches or max_diff > args.tolerance:
+        for i in mismatches[:10]:
+            print(f"  ❌ '{texts[i][:60]}': {torch_preds[i][0]} vs {onnx_preds[i][0]}")
+        print("❌ Paridade falhou")
+        sys.exit(1)
+
+    print("✅ Paridade OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Teste de paridade do forward empacotado (packing.py) vs forward normal
+
+Para cada arquitetura suportada (BERT e DistilBERT) monta um modelo pequeno
+com pesos aleatórios e o vocabulário do tokenizer, e — com --model-dir —
+também o modelo treinado. Classifica amostras de data/processed/test.json
+sem empacotamento e empacotadas (packed_forward) e verifica que os logits
+diferem no máximo pela tolerância. Sai com código 1 se falhar.
+"""
+
+import argparse
+import json
+import os
+import sys
+
+# Adicionar o diretório raiz ao path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import torch
+from datasets import Dataset
+from transformers import (
+    AutoModelForSequenceClassification,
+    AutoTokenizer,
+    BertConfig,
+    BertForSequenceClassification,
+    DistilBertConfig,
+    DistilBertForSequenceClassification,
+)
+
+from packing import packed_logit_difference
+
+DATASET_PATH = "data/processed/test.json"
+
+
+def small_models(vocab_size: int) -> dict:
+    """Modelos pequenos de cada arquitetura suportada (pesos aleatórios)"""
+    torch.manual_seed(0)
+    return {
+        "bert": BertForSequenceClassification(
+            BertConfig(
+                vocab_size=vocab_size,
+                hidden_size=64,
+                num_hidden_layers=2,
+                num_attention_heads=4,
+                intermediate_size=128,
+                num_labels=2,
+            )
+        ),
+        "distilbert": DistilBertForSequenceClassification(
+            DistilBertConfig(
+                vocab_size=vocab_size,
+                dim=64,
+                n_layers=2,
+                n_heads=4,
+                hidden_dim=128,
+                num_labels=2,
+                attn_implementation="sdpa",
+            )
+        ),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Paridade do treino empacotado")
+    parser.add_argument("--tokenizer", default="models/model_distilbert_cased")
+    parser.add_argument("--model-dir", help="Conferir também um modelo treinado")
+    parser.add_argument("--dataset", default=DATASET_PATH)
+    parser.add_argument("--samples", type=int, default=64)
+    parser.add_argument("--pack-length", type=int, default=128)
+    parser.add_argument("--tolerance", type=float, default=1e-4)
+    args = parser.parse_args()
+
+    tokenizer = AutoTokenizer.from_pretrained(args.tokenizer)
+    with open(args.dataset, "r", encoding="utf-8") as f:
+        items = json.load(f)[: args.samples]
+    dataset = Dataset.from_dict(
+        {
+            **tokenizer(
+                [item["text"] for item in items],
+                truncation=True,
+                max_length=args.pack_length,
+            ),
+            "labels": [item["label"] for item in items],
+        }
+    )
+
+    models = small_models(len(tokenizer))
+    if args.model_dir:
+        models[args.model_dir] = AutoModelForSequenceClassification.from_pretrained(
+            args.model_dir
+        )
+
+    print(f"🧪 Paridade empacotado x normal em {len(dataset)} amostras")
+    failed = False
+    for name, model in models.items():
+        difference = packed_logit_difference(
+            model, dataset, tokenizer, args.pack_length
+        )
+        ok = difference <= args.tolerance
+        failed = failed or not ok
+        print(f"  {'✅' if ok else '❌'} {name}: diferença máxima {difference:.2e}")
+
+    if failed:
+        print("❌ Paridade falhou")
+        sys.exit(1)
+    print("✅ Paridade OK")
+
+
+if __name__ == "__main__":
+    main()
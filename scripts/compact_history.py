@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Compacta o histórico de predições e consulta um intervalo
+
+Sela os segmentos abandonados, converte os segmentos JSONL em Parquet
+particionado por dia (history_store.compact_history) e mostra um resumo.
+Pode ser agendado em um cron quando HISTORY_COMPACT_INTERVAL=0. Com
+--import-csv, migra o antigo data/email_history.csv para o histórico (e
+reconstrói os agregados do dashboard, como --rebuild-aggregates).
+
+Exemplos:
+    python scripts/compact_history.py
+    python scripts/compact_history.py --import-csv data/email_history.csv
+    python scripts/compact_history.py --start 2025-09-01 --end 2025-09-08
+"""
+
+import argparse
+import csv
+import datetime
+import os
+import sys
+from collections import Counter
+
+# Adicionar o diretório raiz ao path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from history_aggregates import AGGREGATES_FILENAME, HistoryAggregates, backfill
+from history_store import (
+    HISTORY_DIR,
+    HistoryWriter,
+    compact_history,
+    make_record,
+    query_history,
+)
+
+
+def import_csv(path: str, root: str) -> int:
+    """Copia as linhas do CSV legado (timestamp,text_preview,...) para o histórico"""
+    writer = HistoryWriter(root, compact_interval=0)
+    count = 0
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        for row in csv.DictReader(f):
+            timestamp = datetime.datetime.strptime(
+                row["timestamp"], "%Y-%m-%d %H:%M:%S"
+            ).replace(tzinfo=datetime.timezone.utc)
+            record = make_record(
+                row["text_preview"],
+                row["prediction"],
+                float(row["confidence"]),
+                method="csv",
+                timestamp=timestamp.timestamp(),
+            )
+            while not writer.record(record):
+                writer.flush()
+            count += 1
+    writer.close()
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compactação do histórico")
+    parser.add_argument("--root", default=HISTORY_DIR or "data/history")
+    parser.add_argument("--import-csv", help="CSV legado para importar antes")
+    parser.add_argument(
+        "--rebuild-aggregates",
+        action="store_true",
+        help="Reconstrói os contadores do dashboard a partir do histórico",
+    )
+    parser.add_argument("--start", help="Início do resumo (ISO, inclusivo)")
+    parser.add_argument("--end", help="Fim do resumo (ISO, exclusivo)")
+    args = parser.parse_args()
+
+    if args.import_csv:
+        count = import_csv(args.import_csv, args.root)
+        print(f"📥 {count} registros importados de {args.import_csv}")
+
+    stats = compact_history(args.root)
+    print(
+        f"🗜️  {stats['segments']} segmentos compactados "
+        f"({stats['records']} registros, {stats['files']} arquivos Parquet)"
+    )
+
+    if args.rebuild_aggregates or args.import_csv:
+        aggregates = HistoryAggregates(os.path.join(args.root, AGGREGATES_FILENAME))
+        count = backfill(aggregates, args.root)
+        aggregates.close()
+        print(f"📈 Agregados do dashboard reconstruídos com {count} registros")
+
+    table = query_history(
+        args.root,
+        columns=["timestamp", "prediction", "confidence"],
+        start=args.start,
+        end=args.end,
+    )
+    print(f"\n📊 {table.num_rows} predições no intervalo")
+    if table.num_rows:
+        timestamps = table.column("timestamp").to_pylist()
+        print(f"   De {timestamps[0]} até {timestamps[-1]}")
+        for prediction, count in Counter(
+            table.column("prediction").to_pylist()
+        ).most_common():
+            print(f"   {prediction}: {count}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Perfil de treino otimizado para CPU: autocast bf16 e torch.compile opcional
+
+O GradScaler/autocast de train_improved.py só vale para CUDA; em CPU o treino
+rodava em fp32 eager. Aqui:
+
+    - bf16: torch.autocast("cpu", dtype=torch.bfloat16) quando o processador
+      tem bf16 nativo (AVX512-BF16 ou AMX); sem suporte nativo o bf16 é
+      emulado e fica mais lento que fp32, então o padrão é não ativar. Os
+      pesos e o otimizador continuam em fp32 (sem GradScaler: o bf16 tem a
+      mesma faixa do fp32);
+    - compile: torch.compile(dynamic=True) — os lotes têm comprimento
+      variável (padding dinâmico). A compilação é validada com um passo de
+      aquecimento; se falhar, o treino segue com o modelo eager.
+
+Configuração por ambiente:
+    CPU_BF16=auto|1|0      (padrão auto: só com bf16 nativo)
+    TORCH_COMPILE=1        (padrão desativado)
+"""
+
+import contextlib
+import logging
+import os
+import sys
+from typing import Callable, Dict, Tuple
+
+import torch
+
+logger = logging.getLogger(__name__)
+
+CPU_BF16 = os.getenv("CPU_BF16", "auto")
+TORCH_COMPILE = os.getenv("TORCH_COMPILE", "0") == "1"
+
+# Flags de /proc/cpuinfo que indicam bf16 nativo
+_BF16_CPU_FLAGS = ("avx512_bf16", "amx_bf16")
+
+
+def cpu_supports_bf16() -> bool:
+    """Se o processador tem instruções bf16 nativas (Linux: /proc/cpuinfo)"""
+    try:
+        with open("/proc/cpuinfo", "r", encoding="utf-8") as f:
+            flags = set(f.read().split())
+    except OSError:
+        return False
+    return any(flag in flags for flag in _BF16_CPU_FLAGS)
+
+
+def resolve_bf16(setting: str = CPU_BF16) -> bool:
+    """Traduz CPU_BF16 (auto/1/0) em ligar ou não o autocast bf16"""
+    if setting == "1":
+        return True
+    if setting == "0":
+        return False
+    return cpu_supports_bf16()
+
+
+def autocast_context(device: torch.device, bf16: bool) -> Callable:
+    """
+    Fábrica de contextos de precisão para o forward
+
+    Args:
+        device: Dispositivo do treino
+        bf16: Autocast bf16 em CPU
+
+    Returns:
+        Função sem argumentos que devolve um context manager
+    """
+    if device.type == "cuda":
+        return lambda: torch.autocast("cuda", dtype=torch.float16)
+    if bf16:
+        return lambda: torch.autocast("cpu", dtype=torch.bfloat16)
+    return contextlib.nullcontext
+
+
+def compile_model(model, sample_batch: Dict, amp_context: Callable):
+    """
+    Compila o modelo e valida com um passo de forward/backward
+
+    Args:
+        model: Modelo (eager)
+        sample_batch: Lote para o passo de aquecimento (já no dispositivo)
+        amp_context: Contexto de precisão usado no treino
+
+    Returns:
+        Modelo compilado, ou o próprio model se a compilação falhar
+    """
+    if not hasattr(torch, "compile"):
+        logger.warning("⚠️ torch.compile indisponível (torch < 2.0); usando eager")
+        return model
+
+    try:
+        compiled = torch.compile(model, dynamic=True)
+        with amp_context():
+            loss = compiled(**sample_batch).loss
+        loss.backward()
+        model.zero_grad(set_to_none=True)
+        return compiled
+    except Exception as e:
+        logger.warning(
+            f"⚠️ torch.compile falhou ({type(e).__name__}: {e}); usando eager"
+        )
+        model.zero_grad(set_to_none=True)
+        return model
+
+
+def configure_cpu_training(
+    model,
+    device: torch.device,
+    sample_batch: Dict,
+    bf16: bool = None,
+    use_compile: bool = TORCH_COMPILE,
+) -> Tuple[object, Callable, Dict]:
+    """
+    Monta o perfil de treino (precisão + compilação)
+
+    Args:
+        model: Modelo já no dispositivo
+        device: Dispositivo do treino
+        sample_batch: Lote de exemplo para validar a compilação
+        bf16: Autocast bf16 em CPU (padrão: resolve_bf16())
+        use_compile: Compilar com torch.compile
+
+    Returns:
+        tuple: (modelo para o treino, fábrica de contextos de precisão,
+        dict com o perfil efetivo)
+    """
+    if bf16 is None:
+        bf16 = resolve_bf16()
+    bf16 = bf16 and device.type == "cpu"
+    amp_context = autocast_context(device, bf16)
+
+    train_model = model
+    if use_compile:
+        train_model = compile_model(model, sample_batch, amp_context)
+
+    precision = "fp16" if device.type == "cuda" else ("bf16" if bf16 else "fp32")
+    profile = {"precision": precision, "compiled": train_model is not model}
+    return train_model, amp_context, profile
+
+
+def peak_memory_mb() -> float:
+    """Pico de memória residente do processo em MB (0 se indisponível)"""
+    try:
+        import resource
+    except ImportError:  # Windows
+        return 0.0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reporta em KB, macOS em bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
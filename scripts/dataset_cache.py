@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Cache persistente dos splits já tokenizados, compartilhado pelos scripts de treino
+
+Cada split (train/validation/test) é tokenizado uma única vez e salvo em
+formato Arrow (datasets.save_to_disk); as execuções seguintes abrem os
+arquivos memory-mapped em vez de reler o JSON e tokenizar de novo. O
+diretório de cada split é chaveado por um fingerprint do conteúdo do JSON de
+origem, do tokenizer (nome, classe, vocabulário) e dos parâmetros de
+tokenização (max_length, padding): qualquer mudança gera uma nova entrada.
+
+Uso direto (pré-aquece ou inspeciona o cache):
+    python scripts/dataset_cache.py --tokenizer neuralmind/bert-base-portuguese-cased
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import shutil
+import time
+from typing import Dict, Optional, Sequence
+
+from datasets import Dataset, load_from_disk
+
+logger = logging.getLogger(__name__)
+
+DATASET_PATH = "data/processed"
+DATASET_CACHE_DIR = os.getenv("DATASET_CACHE_DIR", "data/cache/tokenized")
+SPLITS = ("train", "validation", "test")
+# Incrementar quando o formato gravado mudar (invalida todas as entradas)
+CACHE_VERSION = 1
+
+
+def _file_digest(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def tokenizer_fingerprint(tokenizer) -> str:
+    """
+    Identifica o tokenizer pelo nome, classe, normalização e vocabulário
+
+    O vocabulário entra no hash para que um diretório local re-treinado com
+    o mesmo nome não reaproveite tokens antigos.
+    """
+    digest = hashlib.sha256()
+    digest.update(f"{tokenizer.name_or_path}|{type(tokenizer).__name__}".encode())
+    digest.update(
+        json.dumps(
+            {
+                key: tokenizer.init_kwargs.get(key)
+                for key in ("do_lower_case", "strip_accents", "tokenize_chinese_chars")
+            },
+            sort_keys=True,
+        ).encode()
+    )
+    digest.update(json.dumps(sorted(tokenizer.get_vocab().items())).encode())
+    return digest.hexdigest()[:16]
+
+
+def dataset_fingerprint(
+    source_path: str, tokenizer, max_length: int, padding: bool
+) -> str:
+    """
+    Fingerprint de um split tokenizado
+
+    Args:
+        source_path: JSON de origem (o conteúdo entra no hash)
+        tokenizer: Tokenizer usado
+        max_length: Comprimento máximo (truncamento)
+        padding: Se as sequências são preenchidas na tokenização
+
+    Returns:
+        Hash hexadecimal curto
+    """
+    digest = hashlib.sha256()
+    digest.update(
+        f"v{CACHE_VERSION}|{_file_digest(source_path)}|"
+        f"{tokenizer_fingerprint(tokenizer)}|{max_length}|{padding}".encode()
+    )
+    return digest.hexdigest()[:16]
+
+
+def cache_entry_name(
+    split: str, source_path: str, tokenizer, max_length: int, padding: bool
+) -> str:
+    """Nome do diretório do split no cache ("<split>-<fingerprint>")"""
+    fingerprint = dataset_fingerprint(source_path, tokenizer, max_length, padding)
+    return f"{split}-{fingerprint}"
+
+
+def _tokenize_split(source_path: str, tokenizer, max_length: int, padding: bool):
+    with open(source_path, "r", encoding="utf-8") as f:
+        dataset = Dataset.from_list(json.load(f))
+
+    # Renomear coluna label para labels (requerido pelo Hugging Face)
+    dataset = dataset.rename_column("label", "labels")
+    return dataset.map(
+        lambda examples: tokenizer(
+            examples["text"],
+            truncation=True,
+            padding=padding,
+            max_length=max_length,
+        ),
+        batched=True,
+        remove_columns=["text", "label_text"],
+    )
+
+
+def load_tokenized_split(
+    split: str,
+    tokenizer,
+    max_length: int,
+    dataset_path: str = DATASET_PATH,
+    cache_dir: str = DATASET_CACHE_DIR,
+    padding: bool = False,
+) -> Dataset:
+    """
+    Carrega um split tokenizado do cache (tokeniza e grava se ausente)
+
+    Args:
+        split: Nome do split ("train", "validation" ou "test")
+        tokenizer: Tokenizer usado na tokenização
+        max_length: Comprimento máximo (truncamento)
+        dataset_path: Diretório com os JSON processados
+        cache_dir: Diretório do cache tokenizado
+        padding: Repassado ao tokenizer; o padrão (False) deixa o padding
+            para o collator, por lote (ver length_batching)
+
+    Returns:
+        Dataset memory-mapped com input_ids, attention_mask (...) e labels
+    """
+    source_path = os.path.join(dataset_path, f"{split}.json")
+    target = os.path.join(
+        cache_dir, cache_entry_name(split, source_path, tokenizer, max_length, padding)
+    )
+
+    if os.path.isdir(target):
+        logger.info(f"   ⚡ {split}: cache tokenizado em {target}")
+        return load_from_disk(target)
+
+    start_time = time.time()
+    dataset = _tokenize_split(source_path, tokenizer, max_length, padding)
+
+    # Gravação atômica: uma execução interrompida não deixa entrada parcial
+    tmp_dir = f"{target}.tmp-{os.getpid()}"
+    dataset.save_to_disk(tmp_dir)
+    try:
+        os.replace(tmp_dir, target)
+    except OSError:
+        # Outro processo gravou a mesma entrada ao mesmo tempo
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    logger.info(
+        f"   ✅ {split}: {len(dataset)} amostras tokenizadas em "
+        f"{time.time() - start_time:.1f}s (cache: {target})"
+    )
+    return load_from_disk(target)
+
+
+def load_tokenized_splits(
+    tokenizer,
+    max_length: int,
+    dataset_path: str = DATASET_PATH,
+    cache_dir: str = DATASET_CACHE_DIR,
+    padding: bool = False,
+    splits: Sequence[str] = SPLITS,
+) -> Dict[str, Dataset]:
+    """Atalho: vários splits com load_tokenized_split (dict split -> Dataset)"""
+    return {
+        split: load_tokenized_split(
+            split, tokenizer, max_length, dataset_path, cache_dir, padding
+        )
+        for split in splits
+    }
+
+
+def prune_cache(
+    cache_dir: str = DATASET_CACHE_DIR, keep: Optional[Sequence[str]] = None
+) -> int:
+    """Remove as entradas do cache que não estão em keep (nomes de diretório)"""
+    if not os.path.isdir(cache_dir):
+        return 0
+    keep = set(keep or ())
+    removed = 0
+    for name in os.listdir(cache_dir):
+        if name not in keep:
+            shutil.rmtree(os.path.join(cache_dir, name), ignore_errors=True)
+            removed += 1
+    return removed
+
+
+def main():
+    from transformers import AutoTokenizer
+
+    parser = argparse.ArgumentParser(description="Cache de datasets tokenizados")
+    parser.add_argument("--tokenizer", required=True)
+    parser.add_argument("--max-length", type=int, default=512)
+    parser.add_argument("--dataset-path", default=DATASET_PATH)
+    parser.add_argument("--cache-dir", default=DATASET_CACHE_DIR)
+    parser.add_argument(
+        "--padding", action="store_true", help="Padding já na tokenização"
+    )
+    parser.add_argument(
+        "--prune", action="store_true", help="Remove entradas de outras configurações"
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    tokenizer = AutoTokenizer.from_pretrained(args.tokenizer)
+
+    start_time = time.time()
+    datasets = load_tokenized_splits(
+        tokenizer,
+        args.max_length,
+        args.dataset_path,
+        args.cache_dir,
+        padding=args.padding,
+    )
+    print(f"✅ Splits prontos em {time.time() - start_time:.2f}s")
+    for split, dataset in datasets.items():
+        print(f"   {split}: {len(dataset)} amostras, colunas {dataset.column_names}")
+
+    if args.prune:
+        keep = [
+            cache_entry_name(
+                split,
+                os.path.join(args.dataset_path, f"{split}.json"),
+                tokenizer,
+                args.max_length,
+                args.padding,
+            )
+            for split in datasets
+        ]
+        print(f"🧹 {prune_cache(args.cache_dir, keep)} entradas antigas removidas")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,393 @@
+#!/usr/bin/env python3
+"""
+Destilação do classificador fine-tuned em um modelo aluno menor
+
+O modelo atual (professor) gera os logits do conjunto de treino uma única
+vez; eles ficam em cache em disco (chaveados pela revisão do professor e
+pelos textos) e são reaproveitados em novas execuções. O aluno é o próprio
+professor com menos camadas (camadas espaçadas uniformemente, pesos
+copiados) e é treinado com alvos suaves:
+
+    loss = alpha * KL(aluno/T || professor/T) * T² + (1 - alpha) * CE(aluno, rótulo)
+
+O diretório gerado pode ser usado diretamente como MODEL_ID no app. Ao final,
+um relatório compara acurácia, latência e tamanho do aluno com o professor.
+"""
+
+import argparse
+import copy
+import hashlib
+import math
+import os
+import shutil
+import sys
+import time
+from dataclasses import dataclass
+from typing import List
+
+# Adicionar o diretório raiz ao path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import torch
+import torch.nn.functional as F
+from transformers import (
+    AutoModelForSequenceClassification,
+    AutoTokenizer,
+    DataCollatorWithPadding,
+    EarlyStoppingCallback,
+    TrainingArguments,
+)
+
+from length_batching import LengthGroupedTrainer
+from prediction_cache import model_revision
+from quantize_model import directory_size_mb, measure_isolated
+from train import (
+    DATASET_PATH,
+    EmailClassifierTrainer,
+    ModelConfig,
+    ProgressCallback,
+    SystemMonitor,
+    TrainingStage,
+    logger,
+)
+
+TEACHER_DIR = "models/model_distilbert_cased"
+TEST_PATH = "data/processed/test.json"
+
+
+@dataclass
+class DistillationConfig(ModelConfig):
+    """Configuração da destilação (o professor também fornece o tokenizer)"""
+
+    model_name: str = TEACHER_DIR
+    output_dir: str = "models/model_distilbert_student"
+    student_layers: int = 4
+    temperature: float = 2.0
+    alpha: float = 0.7
+    logits_cache_dir: str = "data/teacher_logits"
+    num_epochs: int = 3
+    batch_size: int = 16
+    learning_rate: float = 5e-5
+
+
+class DistillationLossTrainer(LengthGroupedTrainer):
+    """Trainer com perda de destilação (alvos suaves + rótulos)"""
+
+    def __init__(self, temperature: float, alpha: float, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.temperature = temperature
+        self.alpha = alpha
+
+    def compute_loss(
+        self, model, inputs, return_outputs=False, num_items_in_batch=None
+    ):
+        labels = inputs.pop("labels")
+        # Validação e teste não têm logits do professor: apenas CE
+        teacher_logits = inputs.pop("teacher_logits", None)
+        outputs = model(**inputs)
+        logits = outputs.logits
+
+        loss = F.cross_entropy(logits, labels)
+        if teacher_logits is not None:
+            temperature = self.temperature
+            soft_loss = F.kl_div(
+                F.log_softmax(logits / temperature, dim=-1),
+                F.log_softmax(teacher_logits.to(logits.dtype) / temperature, dim=-1),
+                reduction="batchmean",
+                log_target=True,
+            ) * (temperature**2)
+            loss = self.alpha * soft_loss + (1 - self.alpha) * loss
+
+        return (loss, outputs) if return_outputs else loss
+
+
+def _encoder_layers(model) -> torch.nn.ModuleList:
+    """Lista de camadas do encoder (BERT, DistilBERT, RoBERTa...)"""
+    num_layers = model.config.num_hidden_layers
+    for _, module in model.named_modules():
+        if isinstance(module, torch.nn.ModuleList) and len(module) == num_layers:
+            return module
+    raise ValueError("Camadas do encoder não encontradas no modelo professor")
+
+
+def build_student(teacher, num_layers: int):
+    """
+    Cria o aluno copiando o professor e mantendo `num_layers` camadas
+
+    As camadas mantidas são espaçadas uniformemente (incluindo a primeira e a
+    última), com embeddings e cabeça de classificação do professor.
+    """
+    teacher_layers = len(_encoder_layers(teacher))
+    if not 0 < num_layers < teacher_layers:
+        raise ValueError(
+            f"O aluno precisa de 1 a {teacher_layers - 1} camadas (pedido: {num_layers})"
+        )
+
+    student = copy.deepcopy(teacher)
+    layers = _encoder_layers(student)
+    keep = np.linspace(0, teacher_layers - 1, num_layers).round().astype(int)
+    kept = torch.nn.ModuleList([layers[i] for i in keep])
+    layers._modules.clear()
+    for i, layer in enumerate(kept):
+        layers.add_module(str(i), layer)
+    student.config.num_hidden_layers = num_layers
+
+    logger.info(f"   Camadas do professor mantidas no aluno: {keep.tolist()}")
+    return student
+
+
+class DistillationTrainer(EmailClassifierTrainer):
+    """EmailClassifierTrainer que treina um aluno a partir do modelo atual"""
+
+    def __init__(self, config: DistillationConfig):
+        super().__init__(config)
+        self.teacher = None
+
+    def load_tokenizer_and_model(self):
+        """Carrega o professor (e seu tokenizer) e cria o aluno"""
+        logger.info(
+            f"🤖 [{TrainingStage.LOADING_MODEL}] Carregando professor: {self.config.model_name}"
+        )
+        self.tokenizer = AutoTokenizer.from_pretrained(self.config.model_name)
+        self.teacher = AutoModelForSequenceClassification.from_pretrained(
+            self.config.model_name
+        )
+        self.teacher.eval()
+
+        self.model = build_student(self.teacher, self.config.student_layers)
+        self.model.config.label2id = self.config.label2id
+        self.model.config.id2label = self.config.id2label
+
+        teacher_params = sum(p.numel() for p in self.teacher.parameters())
+        student_params = sum(p.numel() for p in self.model.parameters())
+        logger.info(f"   📊 Parâmetros do professor: {teacher_params:,}")
+        logger.info(
+            f"   📊 Parâmetros do aluno: {student_params:,} "
+            f"({student_params / teacher_params:.0%})"
+        )
+        SystemMonitor.log_system_status(TrainingStage.LOADING_MODEL)
+
+    def _logits_cache_path(self, texts: List[str]) -> str:
+        digest = hashlib.sha256()
+        digest.update(model_revision(self.config.model_name).encode())
+        digest.update(f"{self.config.max_length}\n".encode())
+        for text in texts:
+            digest.update(text.encode("utf-8"))
+            digest.update(b"\0")
+        return os.path.join(
+            self.config.logits_cache_dir, f"{digest.hexdigest()[:24]}.npy"
+        )
+
+    def teacher_logits(self, texts: List[str], batch_size: int = 64) -> np.ndarray:
+        """
+        Logits do professor para os textos, calculados uma única vez
+
+        Args:
+            texts: Textos do conjunto de treino
+            batch_size: Textos por forward pass do professor
+
+        Returns:
+            Array [len(texts), num_labels] (float32)
+        """
+        path = self._logits_cache_path(texts)
+        if os.path.exists(path):
+            logger.info(f"♻️ Logits do professor carregados do cache: {path}")
+            return np.load(path)
+
+        logger.info(f"🧑‍🏫 Calculando logits do professor para {len(texts)} textos...")
+        start_time = time.time()
+        encodings = self.tokenizer(
+            texts, truncation=True, max_length=self.config.max_length
+        )["input_ids"]
+
+        # Lotes por tamanho: padding mínimo no forward do professor
+        order = sorted(range(len(texts)), key=lambda i: len(encodings[i]))
+        logits = np.zeros((len(texts), self.config.num_labels), dtype=np.float32)
+        for start in range(0, len(order), batch_size):
+            bucket = order[start : start + batch_size]
+            inputs = self.tokenizer.pad(
+                {"input_ids": [encodings[i] for i in bucket]}, return_tensors="pt"
+            )
+            with torch.no_grad():
+                logits[bucket] = self.teacher(**inputs).logits.float().numpy()
+
+        os.makedirs(self.config.logits_cache_dir, exist_ok=True)
+        np.save(path + ".tmp.npy", logits)
+        os.replace(path + ".tmp.npy", path)
+        logger.info(
+            f"   ✅ Logits salvos em {path} ({time.time() - start_time:.1f}s)"
+        )
+        return logits
+
+    def prepare_datasets(self, train_dataset, val_dataset, test_dataset):
+        """Tokeniza os splits e anexa os logits do professor ao treino"""
+        logits = self.teacher_logits(list(train_dataset["text"]))
+        train_dataset = train_dataset.add_column("teacher_logits", logits.tolist())
+        return super().prepare_datasets(train_dataset, val_dataset, test_dataset)
+
+    def load_tokenized_datasets(self):
+        """Splits tokenizados do cache, com os logits do professor no treino"""
+        train_dataset, val_dataset, test_dataset = super().load_tokenized_datasets()
+        # O cache tokenizado não guarda o texto; a ordem é a do JSON
+        texts = [
+            item["text"]
+            for item in self._load_json_dataset(f"{DATASET_PATH}/train.json")
+        ]
+        logits = self.teacher_logits(texts)
+        train_dataset = train_dataset.add_column("teacher_logits", logits.tolist())
+        return train_dataset, val_dataset, test_dataset
+
+    def setup_trainer(self, train_dataset, val_dataset, use_class_weights=False):
+        """Configura o trainer com a perda de destilação"""
+        logger.info(f"⚙️ [{TrainingStage.SETTING_UP_TRAINER}] Configurando destilação...")
+
+        # Warmup de 6% dos passos (em passos: compatível com transformers 4 e 5)
+        total_steps = math.ceil(len(train_dataset) / self.config.batch_size)
+        warmup_steps = int(0.06 * total_steps * self.config.num_epochs)
+
+        training_args = TrainingArguments(
+            output_dir=self.config.output_dir,
+            num_train_epochs=self.config.num_epochs,
+            per_device_train_batch_size=self.config.batch_size,
+            per_device_eval_batch_size=self.config.batch_size * 2,
+            learning_rate=self.config.learning_rate,
+            weight_decay=0.01,
+            lr_scheduler_type="linear",
+            warmup_steps=warmup_steps,
+            eval_strategy="epoch",
+            save_strategy="epoch",
+            load_best_model_at_end=True,
+            metric_for_best_model="f1",
+            greater_is_better=True,
+            fp16=torch.cuda.is_available(),
+            # teacher_logits não é argumento do forward do modelo
+            remove_unused_columns=False,
+            report_to="none",
+            seed=42,
+            data_seed=42,
+            save_total_limit=1,
+            logging_steps=50,
+        )
+
+        self.trainer = DistillationLossTrainer(
+            temperature=self.config.temperature,
+            alpha=self.config.alpha,
+            model=self.model,
+            args=training_args,
+            train_dataset=train_dataset,
+            eval_dataset=val_dataset,
+            data_collator=DataCollatorWithPadding(tokenizer=self.tokenizer),
+            compute_metrics=self.compute_metrics,
+            callbacks=[
+                EarlyStoppingCallback(early_stopping_patience=2),
+                ProgressCallback(),
+            ],
+        )
+        logger.info(
+            f"   Temperatura: {self.config.temperature} | alpha: {self.config.alpha}"
+        )
+
+    def train(self):
+        """Treina o aluno e salva um diretório pronto para MODEL_ID"""
+        train_result = self.trainer.train()
+
+        logger.info(f"💾 [{TrainingStage.SAVING}] Salvando aluno...")
+        self.trainer.save_model(self.config.output_dir)
+        self.tokenizer.save_pretrained(self.config.output_dir)
+
+        # Checkpoints intermediários não fazem parte do modelo servido
+        for name in os.listdir(self.config.output_dir):
+            if name.startswith("checkpoint-"):
+                shutil.rmtree(os.path.join(self.config.output_dir, name))
+
+        return train_result
+
+
+def print_report(teacher: dict, student: dict):
+    """Imprime a comparação professor x aluno"""
+    agreement = sum(
+        a == b for a, b in zip(teacher["labels"], student["labels"])
+    ) / len(teacher["labels"])
+
+    rows = [
+        ("Acurácia", "accuracy", "{:.4f}"),
+        ("Latência p50 (ms)", "p50_ms", "{:.2f}"),
+        ("Latência p99 (ms)", "p99_ms", "{:.2f}"),
+        ("Throughput lote (emails/s)", "throughput", "{:.1f}"),
+        ("RSS do modelo (MB)", "model_rss_mb", "{:.1f}"),
+        ("Tamanho em disco (MB)", "disk_mb", "{:.1f}"),
+    ]
+
+    print("\n📊 RELATÓRIO DE DESTILAÇÃO")
+    print("=" * 64)
+    print(f"{'Métrica':<28}{'professor':>12}{'aluno':>12}{'razão':>12}")
+    print("-" * 64)
+    for title, key, fmt in rows:
+        before, after = teacher[key], student[key]
+        ratio = after / before if before else float("nan")
+        print(
+            f"{title:<28}{fmt.format(before):>12}{fmt.format(after):>12}"
+            f"{ratio:>11.2f}x"
+        )
+    print("-" * 64)
+    print(f"Concordância de rótulos professor x aluno: {agreement:.2%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Destilação do classificador")
+    parser.add_argument("--teacher-dir", default=TEACHER_DIR)
+    parser.add_argument("--output-dir", help="Padrão: <teacher-dir>_student<N>")
+    parser.add_argument("--student-layers", type=int, default=4)
+    parser.add_argument("--temperature", type=float, default=2.0)
+    parser.add_argument("--alpha", type=float, default=0.7)
+    parser.add_argument("--epochs", type=int, default=3)
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--learning-rate", type=float, default=5e-5)
+    parser.add_argument("--max-length", type=int, default=512)
+    parser.add_argument("--logits-cache-dir", default="data/teacher_logits")
+    parser.add_argument("--dataset", default=TEST_PATH)
+    parser.add_argument("--latency-samples", type=int, default=100)
+    parser.add_argument(
+        "--skip-report", action="store_true", help="Apenas treinar o aluno"
+    )
+    args = parser.parse_args()
+
+    output_dir = args.output_dir or (
+        f"{args.teacher_dir.rstrip('/')}_student{args.student_layers}"
+    )
+    config = DistillationConfig(
+        model_name=args.teacher_dir,
+        output_dir=output_dir,
+        max_length=args.max_length,
+        student_layers=args.student_layers,
+        temperature=args.temperature,
+        alpha=args.alpha,
+        logits_cache_dir=args.logits_cache_dir,
+        num_epochs=args.epochs,
+        batch_size=args.batch_size,
+        learning_rate=args.learning_rate,
+    )
+
+    trainer = DistillationTrainer(config)
+    trainer.load_tokenizer_and_model()
+    train_dataset, val_dataset, test_dataset = trainer.load_tokenized_datasets()
+    trainer.setup_trainer(train_dataset, val_dataset)
+    trainer.train()
+    trainer.evaluate(test_dataset)
+    print(f"✅ Aluno salvo em: {output_dir} ({directory_size_mb(output_dir):.1f} MB)")
+
+    if args.skip_report:
+        return
+
+    print("📏 Medindo professor...")
+    teacher = measure_isolated(args.teacher_dir, args.dataset, args.latency_samples)
+    print("📏 Medindo aluno...")
+    student = measure_isolated(output_dir, args.dataset, args.latency_samples)
+    print_report(teacher, student)
+
+    print(f"\n💡 Use no app/API com: MODEL_ID={output_dir} / MODEL_DIR={output_dir}")
+
+
+if __name__ == "__main__":
+    main()
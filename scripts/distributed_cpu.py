@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Treino data-parallel em CPU: N processos DistributedDataParallel sobre gloo
+
+Cada worker é iniciado pelo torchrun (ver train_ddp.py), que define RANK,
+LOCAL_RANK, WORLD_SIZE e LOCAL_WORLD_SIZE. Aqui ficam as peças usadas pelo
+worker:
+
+    - configure_worker_threads: divide os núcleos disponíveis entre os
+      workers da máquina, fixa torch.set_num_threads e a afinidade de CPU de
+      cada worker em uma faixa contígua de núcleos (sem isso cada processo
+      tenta usar todos os núcleos e eles disputam entre si);
+    - ddp_training_kwargs: argumentos do TrainingArguments para DDP em CPU
+      (backend gloo);
+    - is_main_process: para gravar arquivos e logs só no rank 0.
+
+O sharding dos lotes fica a cargo do Trainer/accelerate: o DataLoader de
+treino é dividido por processo (LengthGroupedBatchSampler e a ordem dos
+pacotes são determinísticos dado seed + época, então todos os ranks veem a
+mesma sequência de lotes e cada um fica com a sua fatia).
+"""
+
+import logging
+import os
+from typing import Dict, Optional
+
+import torch
+
+logger = logging.getLogger(__name__)
+
+# Threads por worker (padrão: núcleos disponíveis / workers na máquina)
+DDP_THREADS_PER_WORKER = int(os.getenv("DDP_THREADS_PER_WORKER", "0"))
+# Fixar cada worker em uma faixa de núcleos (Linux)
+DDP_PIN_CORES = os.getenv("DDP_PIN_CORES", "1") == "1"
+
+
+def world_size() -> int:
+    """Número total de workers (1 fora do torchrun)"""
+    return int(os.getenv("WORLD_SIZE", "1"))
+
+
+def local_world_size() -> int:
+    """Workers nesta máquina"""
+    return int(os.getenv("LOCAL_WORLD_SIZE", str(world_size())))
+
+
+def rank() -> int:
+    """Rank global do worker (0 fora do torchrun)"""
+    return int(os.getenv("RANK", "0"))
+
+
+def local_rank() -> int:
+    """Rank do worker nesta máquina"""
+    return int(os.getenv("LOCAL_RANK", "0"))
+
+
+def is_distributed() -> bool:
+    """Se o processo é um de vários workers"""
+    return world_size() > 1
+
+
+def is_main_process() -> bool:
+    """Rank 0: único que grava arquivos e loga em nível INFO"""
+    return rank() == 0
+
+
+def available_cores() -> list:
+    """Núcleos que o processo pode usar (respeita taskset/cgroups)"""
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def threads_per_worker(workers: Optional[int] = None) -> int:
+    """Threads de cada worker: DDP_THREADS_PER_WORKER ou núcleos / workers"""
+    if DDP_THREADS_PER_WORKER > 0:
+        return DDP_THREADS_PER_WORKER
+    workers = workers or local_world_size()
+    return max(1, len(available_cores()) // max(1, workers))
+
+
+def configure_worker_threads(threads: Optional[int] = None) -> Dict:
+    """
+    Fixa threads e afinidade de CPU do worker atual
+
+    Deve ser chamado no início do processo, antes de qualquer operação do
+    torch (set_num_interop_threads só pode ser chamado uma vez).
+
+    Args:
+        threads: Threads intra-op (padrão: threads_per_worker())
+
+    Returns:
+        dict com rank, threads e núcleos fixados (lista vazia se não fixou)
+    """
+    threads = threads or threads_per_worker()
+    torch.set_num_threads(threads)
+    try:
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        # Já houve trabalho paralelo neste processo
+        pass
+
+    pinned = []
+    if DDP_PIN_CORES and is_distributed() and hasattr(os, "sched_setaffinity"):
+        cores = available_cores()
+        start = local_rank() * threads
+        pinned = cores[start : start + threads]
+        # Mais workers que núcleos: não fixar (evita faixas vazias)
+        if len(pinned) == threads:
+            os.sched_setaffinity(0, pinned)
+        else:
+            pinned = []
+
+    return {"rank": rank(), "threads": threads, "cores": pinned}
+
+
+def ddp_training_kwargs() -> Dict:
+    """Argumentos extras do TrainingArguments para DDP em CPU"""
+    if not is_distributed() or torch.cuda.is_available():
+        return {}
+    return {
+        # Sem use_cpu o accelerate não ativa o modo MULTI_CPU: cada rank
+        # avaliaria só a sua fatia, sem reunir as predições
+        "use_cpu": True,
+        "ddp_backend": "gloo",
+        # Todos os parâmetros participam do forward (evita a varredura do grafo)
+        "ddp_find_unused_parameters": False,
+    }
@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+"""
+Baixa os modelos MarianMT de tradução para models/ (uso offline)
+
+Depois de executado, o backend "marian" de translation.py carrega os
+modelos do disco, sem acesso à rede.
+"""
+
+import os
+import sys
+
+# Adicionar o diretório raiz ao path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from transformers import MarianMTModel, MarianTokenizer
+
+from translation import MARIAN_MODELS
+
+
+def download_translation_models():
+    """Salva tokenizer e modelo de cada direção no diretório local"""
+    for direction, (local_dir, hub_id, _) in MARIAN_MODELS.items():
+        print(f"📥 {direction}: {hub_id} → {local_dir}")
+        MarianTokenizer.from_pretrained(hub_id).save_pretrained(local_dir)
+        MarianMTModel.from_pretrained(hub_id).save_pretrained(local_dir)
+
+    print("✅ Modelos de tradução salvos!")
+
+
+if __name__ == "__main__":
+    download_translation_models()
@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""
+Exporta o modelo treinado para ONNX com otimizações de grafo
+
+O arquivo é salvo em <model_dir>/onnx/model.onnx e passa a ser usado por
+app.py e inference.py com INFERENCE_BACKEND=onnx.
+Requer os pacotes onnx e onnxruntime.
+"""
+
+import argparse
+import os
+import sys
+
+# Adicionar o diretório raiz ao path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from onnx_backend import export_onnx
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Exportação do modelo para ONNX")
+    parser.add_argument("--model-dir", default="models/model_distilbert_cased")
+    parser.add_argument("--opset", type=int, default=17)
+    parser.add_argument(
+        "--no-optimize", action="store_true", help="Não aplicar fusões de grafo"
+    )
+    args = parser.parse_args()
+
+    print(f"📦 Exportando {args.model_dir}...")
+    path = export_onnx(args.model_dir, opset=args.opset, optimize=not args.no_optimize)
+    print(f"✅ Modelo ONNX salvo em: {path}")
+    print("💡 Valide com: python scripts/check_onnx_parity.py")
+
+
+if __name__ == "__main__":
+    main()
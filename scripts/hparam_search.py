@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+"""
+Busca de hiperparâmetros em paralelo para o EmailClassifierTrainer (Optuna)
+
+Explora learning rate, épocas, batch size e class weights (WeightedTrainer)
+de scripts/train.py. Os trials rodam em paralelo em um pool de processos,
+cada processo com núcleos / workers threads; todos compartilham o mesmo
+estudo Optuna (journal em arquivo, study.log em --output-dir: ao contrário
+do SQLite, aceita escritas concorrentes de vários processos), então o
+sampler aprende com os trials concluídos dos outros workers.
+
+Os splits são tokenizados uma única vez (cache de dataset_cache) antes de
+iniciar o pool; cada worker abre o cache memory-mapped uma vez e o reutiliza
+em todos os seus trials. A cada época o F1 macro de validação é reportado ao
+Optuna, e o MedianPruner interrompe trials abaixo da mediana dos anteriores
+na mesma época.
+
+Ao final grava em --output-dir:
+    - leaderboard.csv: todos os trials, do melhor para o pior
+    - best_config.json: hiperparâmetros e métricas do melhor trial
+
+Uso:
+    python scripts/hparam_search.py --trials 24 --workers 4
+"""
+
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+# Adicionar o diretório raiz ao path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from distributed_cpu import threads_per_worker
+
+OUTPUT_DIR = "models/hparam_search"
+STUDY_NAME = "email-classifier"
+STUDY_JOURNAL = "study.log"
+# Métrica de validação otimizada (compute_metrics do EmailClassifierTrainer)
+OBJECTIVE_METRIC = "eval_f1"
+
+# Espaço de busca
+LEARNING_RATE_RANGE = (1e-5, 1e-4)
+EPOCHS_RANGE = (2, 5)
+BATCH_SIZES = [8, 16, 32]
+
+# Estado do worker: splits carregados uma vez por processo
+_worker_datasets = None
+
+
+def _import_optuna():
+    try:
+        import optuna
+    except ImportError:
+        print("❌ Optuna não instalado. Instale com: pip install optuna")
+        raise
+    return optuna
+
+
+def _journal_storage(path: str):
+    """Storage do estudo compartilhado (journal com lock de arquivo)"""
+    optuna = _import_optuna()
+    from optuna.storages.journal import JournalFileBackend
+
+    return optuna.storages.JournalStorage(JournalFileBackend(path))
+
+
+def suggest_params(trial) -> dict:
+    """Hiperparâmetros de um trial"""
+    return {
+        "learning_rate": trial.suggest_float(
+            "learning_rate", *LEARNING_RATE_RANGE, log=True
+        ),
+        "num_train_epochs": trial.suggest_int("num_train_epochs", *EPOCHS_RANGE),
+        "per_device_train_batch_size": trial.suggest_categorical(
+            "per_device_train_batch_size", BATCH_SIZES
+        ),
+        "use_class_weights": trial.suggest_categorical(
+            "use_class_weights", [False, True]
+        ),
+    }
+
+
+def _init_worker(threads: int):
+    """Inicializador do pool: threads por processo e logs só de alerta"""
+    import torch
+    import transformers
+
+    import train  # noqa: F401 - configura o logging; silenciado abaixo
+
+    torch.set_num_threads(threads)
+    logging.getLogger().setLevel(logging.WARNING)
+    transformers.logging.set_verbosity_error()
+
+
+def _load_worker_datasets(trainer):
+    """Splits tokenizados do cache, abertos uma vez por processo"""
+    global _worker_datasets
+    if _worker_datasets is None:
+        _worker_datasets = trainer.load_tokenized_datasets()
+    return _worker_datasets
+
+
+def _pruning_callback(trial):
+    """TrainerCallback que reporta o F1 de validação e pede a poda do trial"""
+    from transformers import TrainerCallback
+
+    class OptunaPruningCallback(TrainerCallback):
+        def __init__(self):
+            self.pruned = False
+            self.best = None
+
+        def on_evaluate(self, args, state, control, metrics=None, **kwargs):
+            value = (metrics or {}).get(OBJECTIVE_METRIC)
+            if value is None:
+                return
+            self.best = value if self.best is None else max(self.best, value)
+            trial.report(value, step=round(state.epoch or 0))
+            if trial.should_prune():
+                self.pruned = True
+                control.should_training_stop = True
+
+    return OptunaPruningCallback()
+
+
+def objective(trial, args) -> float:
+    """Treina com os hiperparâmetros do trial e devolve o melhor F1 de validação"""
+    optuna = _import_optuna()
+    from train import EmailClassifierTrainer, ModelConfig
+
+    params = suggest_params(trial)
+    config = ModelConfig(model_name=args.model, max_length=args.max_length)
+    trainer = EmailClassifierTrainer(config)
+    trainer.load_tokenizer_and_model()
+    train_dataset, val_dataset, _ = _load_worker_datasets(trainer)
+
+    pruning = _pruning_callback(trial)
+    output_dir = tempfile.mkdtemp(prefix=f"trial-{trial.number}-")
+    start_time = time.time()
+    try:
+        trainer.setup_trainer(
+            train_dataset,
+            val_dataset,
+            use_class_weights=params["use_class_weights"],
+            extra_callbacks=[pruning],
+            output_dir=output_dir,
+            learning_rate=params["learning_rate"],
+            num_train_epochs=params["num_train_epochs"],
+            per_device_train_batch_size=params["per_device_train_batch_size"],
+            # Trials não precisam de checkpoints: só a métrica de validação
+            save_strategy="no",
+            load_best_model_at_end=False,
+            disable_tqdm=True,
+            logging_strategy="no",
+        )
+        trainer.trainer.train()
+    finally:
+        shutil.rmtree(output_dir, ignore_errors=True)
+
+    trial.set_user_attr("train_seconds", round(time.time() - start_time, 1))
+    if pruning.pruned:
+        raise optuna.TrialPruned()
+    if pruning.best is None:
+        raise RuntimeError(
+            f"Trial {trial.number}: nenhuma avaliação reportou {OBJECTIVE_METRIC} "
+            "(verifique a eval_strategy do EmailClassifierTrainer)"
+        )
+    return pruning.best
+
+
+def _run_worker(args, journal_path: str, n_trials: int) -> int:
+    """Processo do pool: executa n_trials do estudo compartilhado"""
+    optuna = _import_optuna()
+    optuna.logging.set_verbosity(optuna.logging.WARNING)
+    study = optuna.load_study(
+        study_name=STUDY_NAME, storage=_journal_storage(journal_path)
+    )
+    # Falha de um trial (ex.: falta de memória) não derruba a busca
+    study.optimize(
+        lambda trial: objective(trial, args),
+        n_trials=n_trials,
+        catch=(RuntimeError,),
+    )
+    return n_trials
+
+
+def write_results(study, output_dir: str) -> dict:
+    """
+    Grava leaderboard.csv e best_config.json
+
+    Args:
+        study: Estudo Optuna concluído
+        output_dir: Diretório de saída
+
+    Returns:
+        dict gravado em best_config.json (vazio se nenhum trial completou)
+    """
+    optuna = _import_optuna()
+    leaderboard = study.trials_dataframe(
+        attrs=("number", "value", "params", "state", "user_attrs", "duration")
+    )
+    if "value" in leaderboard:
+        leaderboard = leaderboard.sort_values(
+            "value", ascending=False, na_position="last"
+        )
+    leaderboard.to_csv(os.path.join(output_dir, "leaderboard.csv"), index=False)
+
+    completed = study.get_trials(states=(optuna.trial.TrialState.COMPLETE,))
+    if not completed:
+        return {}
+
+    best = study.best_trial
+    best_config = {
+        "trial": best.number,
+        OBJECTIVE_METRIC: best.value,
+        "params": best.params,
+        "train_seconds": best.user_attrs.get("train_seconds"),
+        "trials": {
+            "total": len(study.trials),
+            "complete": len(completed),
+            "pruned": len(
+                study.get_trials(states=(optuna.trial.TrialState.PRUNED,))
+            ),
+        },
+    }
+    with open(os.path.join(output_dir, "best_config.json"), "w", encoding="utf-8") as f:
+        json.dump(best_config, f, ensure_ascii=False, indent=2)
+    return best_config
+
+
+def main():
+    from train import MAX_LENGTH, MODEL_NAME
+
+    parser = argparse.ArgumentParser(description="Busca de hiperparâmetros (Optuna)")
+    parser.add_argument("--model", default=MODEL_NAME)
+    parser.add_argument("--max-length", type=int, default=MAX_LENGTH)
+    parser.add_argument("--trials", type=int, default=20)
+    parser.add_argument(
+        "--workers", type=int, default=0, help="Processos (0 = um por núcleo)"
+    )
+    parser.add_argument(
+        "--threads", type=int, default=0, help="Threads por processo (0 = automático)"
+    )
+    parser.add_argument("--output-dir", default=OUTPUT_DIR)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    optuna = _import_optuna()
+    from transformers import AutoTokenizer
+
+    from dataset_cache import load_tokenized_splits
+
+    cores = os.cpu_count() or 1
+    workers = max(1, min(args.workers or cores, args.trials))
+    threads = args.threads or threads_per_worker(workers)
+    os.makedirs(args.output_dir, exist_ok=True)
+
+    # Tokenizar uma vez antes do pool: os workers só abrem o cache
+    print("📁 Preparando cache tokenizado...")
+    load_tokenized_splits(
+        AutoTokenizer.from_pretrained(args.model),
+        args.max_length,
+        splits=("train", "validation"),
+    )
+
+    journal_path = os.path.abspath(os.path.join(args.output_dir, STUDY_JOURNAL))
+    study = optuna.create_study(
+        study_name=STUDY_NAME,
+        storage=_journal_storage(journal_path),
+        direction="maximize",
+        sampler=optuna.samplers.TPESampler(seed=args.seed),
+        pruner=optuna.pruners.MedianPruner(n_startup_trials=4, n_warmup_steps=1),
+        load_if_exists=True,
+    )
+
+    print(f"🚀 {args.trials} trials em {workers} processo(s), {threads} thread(s) cada")
+    start_time = time.time()
+    per_worker = [
+        args.trials // workers + (1 if i < args.trials % workers else 0)
+        for i in range(workers)
+    ]
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(threads,),
+    ) as pool:
+        futures = [pool.submit(_run_worker, args, journal_path, n) for n in per_worker]
+        for future in futures:
+            future.result()
+
+    best_config = write_results(study, args.output_dir)
+    print(f"\n✅ Busca concluída em {(time.time() - start_time) / 60:.1f}min")
+    print(f"📊 Leaderboard: {os.path.join(args.output_dir, 'leaderboard.csv')}")
+    if not best_config:
+        print("⚠️ Nenhum trial completou")
+        return
+
+    print(
+        f"🏆 Melhor trial #{best_config['trial']}: "
+        f"{OBJECTIVE_METRIC}={best_config[OBJECTIVE_METRIC]:.4f}"
+    )
+    for name, value in best_config["params"].items():
+        print(f"   {name}: {value}")
+    trials = best_config["trials"]
+    print(
+        f"   Trials: {trials['complete']} completos, {trials['pruned']} podados "
+        f"de {trials['total']}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Lotes agrupados por comprimento com padding dinâmico para o treino
+
+Os textos de data/processed são em sua maioria curtos (estilo SMS); com
+padding fixo, quase toda a atenção de cada passo é calculada sobre tokens
+de padding. Aqui os exemplos são tokenizados sem padding (dataset_cache) e o
+LengthGroupedBatchSampler monta lotes de comprimentos parecidos: os índices
+são embaralhados, divididos em "mega-lotes" de batch_size * mega_batch_mult
+exemplos, ordenados por comprimento dentro de cada mega-lote e fatiados em
+lotes, cuja ordem é embaralhada de novo. O DataCollatorWithPadding preenche
+cada lote apenas até o maior exemplo dele.
+
+Usado pelo EmailClassifierTrainer (via LengthGroupedTrainer), pelo loop
+próprio de train_improved.py e por distill.py.
+"""
+
+import random
+from typing import Iterator, List, Optional, Sequence
+
+from torch.utils.data import DataLoader, Sampler
+from transformers import Trainer
+
+
+def sequence_lengths(dataset, column: str = "input_ids") -> List[int]:
+    """Número de tokens (sem padding) de cada exemplo de um dataset tokenizado"""
+    return [len(ids) for ids in dataset[column]]
+
+
+class LengthGroupedBatchSampler(Sampler):
+    """
+    Batch sampler que agrupa exemplos de comprimento parecido
+
+    Args:
+        lengths: Comprimento de cada exemplo (ver sequence_lengths)
+        batch_size: Exemplos por lote
+        shuffle: Embaralhar (treino); sem shuffle os lotes seguem a ordem
+            decrescente de comprimento (avaliação)
+        mega_batch_mult: Tamanho do mega-lote em lotes; maior = menos
+            padding, menor = mais aleatoriedade
+        seed: Semente base (combinada com a época)
+        drop_last: Descartar o último lote incompleto
+    """
+
+    def __init__(
+        self,
+        lengths: Sequence[int],
+        batch_size: int,
+        shuffle: bool = True,
+        mega_batch_mult: int = 50,
+        seed: int = 42,
+        drop_last: bool = False,
+    ):
+        self.lengths = list(lengths)
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.mega_batch_mult = mega_batch_mult
+        self.seed = seed
+        self.drop_last = drop_last
+        self.epoch = 0
+        self._epoch_set = False
+
+    def set_epoch(self, epoch: int):
+        """Fixa a época (chamado pelo Trainer); define a permutação da época"""
+        self.epoch = epoch
+        self._epoch_set = True
+
+    def batches(self) -> List[List[int]]:
+        """Lotes da época atual (lista de listas de índices)"""
+        if not self.shuffle:
+            order = sorted(
+                range(len(self.lengths)), key=lambda i: self.lengths[i], reverse=True
+            )
+            return self._chunk(order)
+
+        rng = random.Random(self.seed + self.epoch)
+        indices = list(range(len(self.lengths)))
+        rng.shuffle(indices)
+
+        mega_size = self.batch_size * self.mega_batch_mult
+        batches = []
+        for start in range(0, len(indices), mega_size):
+            mega = sorted(
+                indices[start : start + mega_size],
+                key=lambda i: self.lengths[i],
+                reverse=True,
+            )
+            batches.extend(self._chunk(mega))
+
+        if self.drop_last and batches and len(batches[-1]) < self.batch_size:
+            batches.pop()
+        rng.shuffle(batches)
+
+        # O lote mais longo primeiro: falta de memória aparece no 1º passo
+        longest = max(
+            range(len(batches)), key=lambda b: self.lengths[batches[b][0]], default=0
+        )
+        if batches:
+            batches[0], batches[longest] = batches[longest], batches[0]
+        return batches
+
+    def _chunk(self, order: List[int]) -> List[List[int]]:
+        batches = [
+            order[start : start + self.batch_size]
+            for start in range(0, len(order), self.batch_size)
+        ]
+        if (
+            not self.shuffle
+            and self.drop_last
+            and batches
+            and len(batches[-1]) < self.batch_size
+        ):
+            batches.pop()
+        return batches
+
+    def __iter__(self) -> Iterator[List[int]]:
+        batches = self.batches()
+        # Sem set_epoch (loop próprio), cada iteração é uma nova época
+        if not self._epoch_set:
+            self.epoch += 1
+        self._epoch_set = False
+        return iter(batches)
+
+    def __len__(self) -> int:
+        if self.drop_last:
+            return len(self.lengths) // self.batch_size
+        return (len(self.lengths) + self.batch_size - 1) // self.batch_size
+
+
+def padded_tokens(lengths: Sequence[int], batches: Sequence[Sequence[int]]) -> int:
+    """Tokens processados (com padding até o maior de cada lote) em uma época"""
+    return sum(len(batch) * max(lengths[i] for i in batch) for batch in batches)
+
+
+def create_length_grouped_dataloader(
+    dataset,
+    collate_fn,
+    batch_size: int,
+    shuffle: bool = True,
+    seed: int = 42,
+    lengths: Optional[Sequence[int]] = None,
+    **dataloader_kwargs,
+) -> DataLoader:
+    """
+    DataLoader com LengthGroupedBatchSampler e padding dinâmico
+
+    Args:
+        dataset: Dataset tokenizado sem padding
+        collate_fn: Collator com padding por lote (DataCollatorWithPadding)
+        batch_size: Exemplos por lote
+        shuffle: Embaralhar (treino) ou ordenar por comprimento (avaliação)
+        seed: Semente base do embaralhamento
+        lengths: Comprimentos já calculados (padrão: sequence_lengths)
+        **dataloader_kwargs: Repassados ao DataLoader (num_workers, ...)
+
+    Returns:
+        torch DataLoader
+    """
+    sampler = LengthGroupedBatchSampler(
+        lengths if lengths is not None else sequence_lengths(dataset),
+        batch_size,
+        shuffle=shuffle,
+        seed=seed,
+    )
+    return DataLoader(
+        dataset, batch_sampler=sampler, collate_fn=collate_fn, **dataloader_kwargs
+    )
+
+
+class LengthGroupedTrainer(Trainer):
+    """
+    Trainer cujo DataLoader de treino usa LengthGroupedBatchSampler
+
+    Substitui o group_by_length do TrainingArguments (removido no
+    transformers 5) com o mesmo comportamento nas duas versões.
+    """
+
+    def get_train_dataloader(self) -> DataLoader:
+        if self.train_dataset is None:
+            raise ValueError("Trainer: training requires a train_dataset.")
+
+        dataset = self._remove_unused_columns(
+            self.train_dataset, description="training"
+        )
+        seed = self.args.data_seed
+        if seed is None:
+            seed = self.args.seed
+        dataloader = create_length_grouped_dataloader(
+            dataset,
+            self.data_collator,
+            self._train_batch_size,
+            shuffle=True,
+            seed=seed,
+            num_workers=self.args.dataloader_num_workers,
+            pin_memory=self.args.dataloader_pin_memory,
+        )
+        return self.accelerator.prepare(dataloader)
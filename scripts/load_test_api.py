@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Teste de carga local para o serviço HTTP de classificação (api.py)
+
+Dispara requisições concorrentes contra /classify ou /classify/batch e
+reporta latência p50/p99 e throughput (emails/segundo).
+"""
+
+import argparse
+import json
+import random
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+DATASET_PATH = "data/processed/test.json"
+
+
+def load_texts(path: str) -> list:
+    """Carrega textos de exemplo do split de teste"""
+    with open(path, "r", encoding="utf-8") as f:
+        return [item["text"] for item in json.load(f)]
+
+
+def percentile(values: list, pct: float) -> float:
+    """Percentil por interpolação do vizinho mais próximo"""
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Teste de carga da API")
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=1,
+        help="1 usa /classify; valores maiores usam /classify/batch",
+    )
+    parser.add_argument("--dataset", default=DATASET_PATH)
+    args = parser.parse_args()
+
+    texts = load_texts(args.dataset)
+    random.seed(42)
+    session = requests.Session()
+
+    def send(_):
+        if args.batch_size == 1:
+            endpoint = f"{args.url}/classify"
+            payload = {"text": random.choice(texts)}
+        else:
+            endpoint = f"{args.url}/classify/batch"
+            payload = {"texts": random.sample(texts, args.batch_size)}
+
+        start = time.perf_counter()
+        response = session.post(endpoint, json=payload, timeout=60)
+        response.raise_for_status()
+        return (time.perf_counter() - start) * 1000
+
+    print(f"🚀 {args.requests} requisições, concorrência {args.concurrency}")
+
+    # Aquecimento
+    send(None)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        latencies = list(pool.map(send, range(args.requests)))
+    elapsed = time.perf_counter() - start
+
+    emails = args.requests * args.batch_size
+    print("📊 Resultados:")
+    print(f"  - Latência p50: {percentile(latencies, 50):.1f}ms")
+    print(f"  - Latência p99: {percentile(latencies, 99):.1f}ms")
+    print(f"  - Latência média: {statistics.mean(latencies):.1f}ms")
+    print(f"  - Requisições/s: {args.requests / elapsed:.1f}")
+    print(f"  - Emails/s: {emails / elapsed:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+"""
+Treino com empacotamento de sequências (sequence packing)
+
+Vários exemplos curtos são concatenados em uma única sequência de até
+pack_length tokens ([CLS] a [SEP] [CLS] b [SEP] ...). Para que o resultado
+seja equivalente ao treino sem empacotamento:
+
+    - a máscara de atenção é bloco-diagonal: cada token só enxerga os
+      tokens do próprio exemplo;
+    - os position_ids recomeçam em 0 em cada exemplo;
+    - a classificação é feita no [CLS] de cada segmento, com a mesma cabeça
+      (pooler/pre_classifier + classifier) do modelo original.
+
+O modelo treinado é um AutoModelForSequenceClassification comum: a
+avaliação e a inferência continuam sem empacotamento. Suporta modelos BERT
+e DistilBERT (no DistilBERT os embeddings são montados aqui, com as posições
+de cada segmento, porque o DistilBertModel do transformers 4 não aceita
+position_ids; no transformers 4 o DistilBERT precisa da atenção "sdpa", a
+única que aceita máscara 4D). Outras arquiteturas são rejeitadas na criação
+do PackedTrainer. A paridade com o forward normal é conferida por
+check_packing_parity.py.
+"""
+
+from typing import Dict, List, Sequence
+
+import torch
+import torch.nn.functional as F
+import transformers
+from torch.utils.data import Dataset as TorchDataset
+from transformers import DataCollatorWithPadding, Trainer
+
+# Colunas extras dos lotes empacotados (mantidas pelo Trainer)
+PACKED_COLUMNS = ["segment_ids", "cls_positions", "position_ids"]
+# transformers 5 aceita máscara 4D pronta; o 4 espera uma máscara 3D 0/1
+_TRANSFORMERS_MAJOR = int(transformers.__version__.split(".")[0])
+
+
+def pack_examples(lengths: Sequence[int], pack_length: int) -> List[List[int]]:
+    """
+    Agrupa exemplos em pacotes de até pack_length tokens (first-fit decreasing)
+
+    Args:
+        lengths: Tokens de cada exemplo (com [CLS]/[SEP])
+        pack_length: Tamanho máximo de um pacote; exemplos maiores ficam
+            sozinhos em um pacote próprio
+
+    Returns:
+        Lista de pacotes (índices dos exemplos)
+    """
+    packs: List[List[int]] = []
+    free: List[int] = []
+    for index in sorted(range(len(lengths)), key=lambda i: lengths[i], reverse=True):
+        length = lengths[index]
+        for pack, space in enumerate(free):
+            if length <= space:
+                packs[pack].append(index)
+                free[pack] -= length
+                break
+        else:
+            packs.append([index])
+            free.append(max(0, pack_length - length))
+    return packs
+
+
+class PackedDataset(TorchDataset):
+    """
+    Dataset de sequências empacotadas a partir de um dataset tokenizado
+
+    Args:
+        dataset: Dataset tokenizado sem padding (input_ids, labels)
+        pack_length: Tamanho máximo de cada pacote
+    """
+
+    def __init__(self, dataset, pack_length: int = 128):
+        input_ids = [list(ids) for ids in dataset["input_ids"]]
+        labels = list(dataset["labels"])
+        self.pack_length = pack_length
+        self.real_tokens = sum(len(ids) for ids in input_ids)
+        self.num_examples = len(input_ids)
+        # Índices dos exemplos de cada pacote, na ordem dos segmentos
+        self.assignments = pack_examples([len(ids) for ids in input_ids], pack_length)
+        self.packs = []
+        for pack in self.assignments:
+            item = {
+                "input_ids": [],
+                "segment_ids": [],
+                "position_ids": [],
+                "cls_positions": [],
+                "labels": [],
+            }
+            for segment, index in enumerate(pack, start=1):
+                ids = input_ids[index]
+                item["cls_positions"].append(len(item["input_ids"]))
+                item["input_ids"].extend(ids)
+                item["segment_ids"].extend([segment] * len(ids))
+                item["position_ids"].extend(range(len(ids)))
+                item["labels"].append(int(labels[index]))
+            self.packs.append(item)
+
+    def __len__(self) -> int:
+        return len(self.packs)
+
+    def __getitem__(self, index: int) -> Dict:
+        return self.packs[index]
+
+    def efficiency(self) -> float:
+        """Tokens reais / tokens processados com pacotes de pack_length"""
+        return self.real_tokens / max(1, len(self.packs) * self.pack_length)
+
+    def summary(self) -> Dict:
+        """Estatísticas do empacotamento para log"""
+        return {
+            "examples": self.num_examples,
+            "packs": len(self.packs),
+            "examples_per_pack": self.num_examples / max(1, len(self.packs)),
+            "efficiency": self.efficiency(),
+        }
+
+
+class PackedDataCollator:
+    """
+    Collator de pacotes: padding até o maior pacote do lote
+
+    Lotes sem segment_ids (avaliação sem empacotamento) seguem para o
+    DataCollatorWithPadding.
+    """
+
+    def __init__(self, tokenizer):
+        self.pad_token_id = tokenizer.pad_token_id or 0
+        self.fallback = DataCollatorWithPadding(tokenizer=tokenizer)
+
+    def __call__(self, features: List[Dict]) -> Dict[str, torch.Tensor]:
+        if "segment_ids" not in features[0]:
+            return self.fallback(features)
+
+        length = max(len(item["input_ids"]) for item in features)
+        segments = max(len(item["labels"]) for item in features)
+
+        def pad(values, size, value):
+            return list(values) + [value] * (size - len(values))
+
+        return {
+            "input_ids": torch.tensor(
+                [pad(item["input_ids"], length, self.pad_token_id) for item in features]
+            ),
+            "segment_ids": torch.tensor(
+                [pad(item["segment_ids"], length, 0) for item in features]
+            ),
+            "position_ids": torch.tensor(
+                [pad(item["position_ids"], length, 0) for item in features]
+            ),
+            "cls_positions": torch.tensor(
+                [pad(item["cls_positions"], segments, -1) for item in features]
+            ),
+            "labels": torch.tensor(
+                [pad(item["labels"], segments, -100) for item in features]
+            ),
+        }
+
+
+def packing_architecture(model) -> str:
+    """
+    Arquitetura do modelo para o forward empacotado ("bert" ou "distilbert")
+
+    Raises:
+        ValueError: Arquitetura sem suporte ou DistilBERT sem atenção sdpa
+            no transformers 4
+    """
+    if getattr(model, "distilbert", None) is not None:
+        attention = getattr(model.config, "_attn_implementation", "eager")
+        if _TRANSFORMERS_MAJOR < 5 and attention != "sdpa":
+            raise ValueError(
+                "Empacotamento com DistilBERT no transformers 4 requer a atenção "
+                f"sdpa (modelo carregado com {attention!r}); use "
+                'from_pretrained(..., attn_implementation="sdpa")'
+            )
+        return "distilbert"
+    if getattr(model, "bert", None) is not None:
+        return "bert"
+    raise ValueError(
+        f"Empacotamento não suportado para {type(model).__name__} "
+        "(use um modelo BERT ou DistilBERT)"
+    )
+
+
+def packed_attention_mask(
+    segment_ids: torch.Tensor, dtype: torch.dtype, additive: bool = False
+):
+    """
+    Máscara bloco-diagonal: token i enxerga j só se forem do mesmo exemplo
+
+    Args:
+        segment_ids: Segmento de cada token (0 = padding)
+        dtype: dtype da máscara aditiva
+        additive: Forçar a máscara 4D aditiva (sempre usada no transformers 5)
+    """
+    same = (segment_ids[:, :, None] == segment_ids[:, None, :]) & (
+        segment_ids[:, None, :] > 0
+    )
+    if additive or _TRANSFORMERS_MAJOR >= 5:
+        mask = torch.zeros(same.shape, dtype=dtype, device=segment_ids.device)
+        return mask.masked_fill(~same, torch.finfo(dtype).min)[:, None, :, :]
+    return same.long()
+
+
+def _bert_hidden_states(model, inputs, dtype) -> torch.Tensor:
+    outputs = model.bert(
+        input_ids=inputs["input_ids"],
+        attention_mask=packed_attention_mask(inputs["segment_ids"], dtype),
+        position_ids=inputs["position_ids"],
+    )
+    return outputs[0]
+
+
+def _distilbert_hidden_states(model, inputs, dtype) -> torch.Tensor:
+    # Embeddings com as posições reiniciadas por segmento (mesma soma,
+    # LayerNorm e dropout do Embeddings do DistilBERT)
+    embeddings = model.distilbert.embeddings
+    hidden = embeddings.word_embeddings(inputs["input_ids"])
+    hidden = hidden + embeddings.position_embeddings(inputs["position_ids"])
+    hidden = embeddings.dropout(embeddings.LayerNorm(hidden))
+
+    mask = packed_attention_mask(inputs["segment_ids"], dtype, additive=True)
+    transformer = model.distilbert.transformer
+    if _TRANSFORMERS_MAJOR >= 5:
+        return transformer(hidden_states=hidden, attention_mask=mask)[0]
+    return transformer(
+        x=hidden,
+        attn_mask=mask,
+        head_mask=[None] * transformer.n_layers,
+        return_dict=True,
+    )[0]
+
+
+def _segment_logits(model, architecture: str, cls_hidden: torch.Tensor) -> torch.Tensor:
+    """Aplica a cabeça de classificação do modelo aos [CLS] de cada segmento"""
+    if architecture == "distilbert":
+        hidden = F.relu(model.pre_classifier(cls_hidden))
+        return model.classifier(model.dropout(hidden))
+    pooled = model.bert.pooler(cls_hidden[:, None, :])
+    return model.classifier(model.dropout(pooled))
+
+
+def packed_forward(model, inputs: Dict[str, torch.Tensor]):
+    """
+    Forward de um lote empacotado
+
+    Returns:
+        tuple: (logits por segmento [n, num_labels], labels por segmento [n])
+    """
+    architecture = packing_architecture(model)
+    dtype = next(model.parameters()).dtype
+    if architecture == "distilbert":
+        hidden = _distilbert_hidden_states(model, inputs, dtype)
+    else:
+        hidden = _bert_hidden_states(model, inputs, dtype)
+
+    cls_positions = inputs["cls_positions"]
+    valid = cls_positions >= 0
+    rows = torch.arange(len(cls_positions), device=hidden.device)[:, None]
+    cls_hidden = hidden[rows.expand_as(cls_positions)[valid], cls_positions[valid]]
+    return _segment_logits(model, architecture, cls_hidden), inputs["labels"][valid]
+
+
+def packed_logit_difference(model, dataset, tokenizer, pack_length: int) -> float:
+    """
+    Maior diferença entre logits empacotados e normais (modo eval)
+
+    Args:
+        model: Modelo BERT ou DistilBERT
+        dataset: Dataset tokenizado sem padding (input_ids, labels)
+        tokenizer: Tokenizer do modelo
+        pack_length: Tamanho máximo de cada pacote
+
+    Returns:
+        Diferença absoluta máxima entre os logits dos dois caminhos
+    """
+    packed = PackedDataset(dataset, pack_length)
+    batch = DataCollatorWithPadding(tokenizer=tokenizer)(list(dataset))
+
+    model.eval()
+    with torch.no_grad():
+        # token_type_ids ficam de fora (DistilBERT não aceita; BERT usa zeros)
+        reference = model(
+            input_ids=batch["input_ids"], attention_mask=batch["attention_mask"]
+        ).logits
+        logits, _ = packed_forward(model, PackedDataCollator(tokenizer)(packed.packs))
+    order = [index for pack in packed.assignments for index in pack]
+    return float((logits - reference[order]).abs().max())
+
+
+class PackedTrainer(Trainer):
+    """
+    Trainer que treina com lotes empacotados e avalia sem empacotamento
+
+    Lotes com segment_ids passam por packed_forward; os demais (avaliação)
+    seguem o caminho padrão do Trainer.
+
+    Raises:
+        ValueError: Modelo sem suporte a empacotamento (ver packing_architecture)
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        packing_architecture(self.model)
+
+    def _set_signature_columns_if_needed(self):
+        super()._set_signature_columns_if_needed()
+        # Não descartar as colunas do empacotamento
+        self._signature_columns = list(self._signature_columns) + PACKED_COLUMNS
+
+    def compute_loss(self, model, inputs, return_outputs=False, **kwargs):
+        if "segment_ids" not in inputs:
+            return super().compute_loss(model, inputs, return_outputs, **kwargs)
+
+        logits, labels = packed_forward(model, inputs)
+        loss = F.cross_entropy(logits, labels)
+        return (loss, {"logits": logits}) if return_outputs else loss
+
+    def prediction_step(self, model, inputs, prediction_loss_only, ignore_keys=None):
+        if "segment_ids" not in inputs:
+            return super().prediction_step(
+                model, inputs, prediction_loss_only, ignore_keys=ignore_keys
+            )
+
+        inputs = self._prepare_inputs(inputs)
+        with torch.no_grad():
+            logits, labels = packed_forward(model, inputs)
+            loss = F.cross_entropy(logits, labels).detach()
+        if prediction_loss_only:
+            return loss, None, None
+        return loss, logits.detach(), labels
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Gera a variante INT8 do classificador e compara com o modelo fp32
+
+Métodos:
+- dynamic: quantização dinâmica das camadas Linear (PyTorch)
+- static: quantização estática do grafo ONNX, calibrada com train.json
+  (requer o modelo exportado por scripts/export_onnx.py)
+
+O relatório mostra acurácia em data/processed/test.json, latência e memória
+(RSS do processo e tamanho em disco) antes e depois. Cada modelo é medido
+em um processo separado para que a memória de um não contamine o outro.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+# Adicionar o diretório raiz ao path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from quantization import (
+    QUANTIZATION_METHODS,
+    quantize_dynamic_model,
+    quantize_static_model,
+)
+
+TRAIN_PATH = "data/processed/train.json"
+TEST_PATH = "data/processed/test.json"
+
+
+def load_split(path: str):
+    """Carrega um split processado (lista de {text, label, label_text})"""
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def directory_size_mb(path: str) -> float:
+    """Tamanho total dos arquivos de um diretório em MB"""
+    total = 0
+    for root, _, files in os.walk(path):
+        total += sum(os.path.getsize(os.path.join(root, name)) for name in files)
+    return total / 1024**2
+
+
+def measure_model(model_dir: str, dataset_path: str, latency_samples: int) -> dict:
+    """
+    Carrega o modelo e mede RSS, acurácia e latência (executa em subprocesso)
+
+    Args:
+        model_dir: Diretório do modelo (fp32 ou quantizado)
+        dataset_path: Split de avaliação
+        latency_samples: Quantidade de emails para medir latência unitária
+
+    Returns:
+        Dicionário com as métricas
+    """
+    import psutil
+    import torch
+
+    from inference import load_model, run_batch_inference, run_inference
+
+    torch.set_num_threads(1)
+    process = psutil.Process()
+    rss_before = process.memory_info().rss
+
+    tokenizer, model = load_model(model_dir, backend="pytorch")
+    rss_loaded = process.memory_info().rss
+
+    data = load_split(dataset_path)
+    texts = [item["text"] for item in data]
+    id2label = {0: "Improdutivo", 1: "Produtivo"}
+
+    start = time.perf_counter()
+    predictions = run_batch_inference(tokenizer, model, texts)
+    batch_seconds = time.perf_counter() - start
+
+    correct = sum(
+        prediction == id2label[item["label"]]
+        for (prediction, _, _), item in zip(predictions, data)
+    )
+
+    run_inference(tokenizer, model, texts[0])  # aquecimento
+    latencies = []
+    for text in texts[:latency_samples]:
+        start = time.perf_counter()
+        run_inference(tokenizer, model, text)
+        latencies.append((time.perf_counter() - start) * 1000)
+    latencies.sort()
+
+    return {
+        "accuracy": correct / len(data),
+        "labels": [prediction for prediction, _, _ in predictions],
+        "p50_ms": statistics.median(latencies),
+        "p99_ms": latencies[min(len(latencies) - 1, int(0.99 * len(latencies)))],
+        "throughput": len(texts) / batch_seconds,
+        "model_rss_mb": (rss_loaded - rss_before) / 1024**2,
+        "peak_rss_mb": process.memory_info().rss / 1024**2,
+        "disk_mb": directory_size_mb(model_dir),
+    }
+
+
+def measure_isolated(model_dir: str, dataset_path: str, latency_samples: int) -> dict:
+    """Executa measure_model em um processo novo (spawn)"""
+    with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as pool:
+        return pool.submit(
+            measure_model, model_dir, dataset_path, latency_samples
+        ).result()
+
+
+def print_report(baseline: dict, quantized: dict):
+    """Imprime a comparação fp32 x INT8"""
+    agreement = sum(
+        a == b for a, b in zip(baseline["labels"], quantized["labels"])
+    ) / len(baseline["labels"])
+
+    rows = [
+        ("Acurácia", "accuracy", "{:.4f}"),
+        ("Latência p50 (ms)", "p50_ms", "{:.2f}"),
+        ("Latência p99 (ms)", "p99_ms", "{:.2f}"),
+        ("Throughput lote (emails/s)", "throughput", "{:.1f}"),
+        ("RSS do modelo (MB)", "model_rss_mb", "{:.1f}"),
+        ("RSS total (MB)", "peak_rss_mb", "{:.1f}"),
+        ("Tamanho em disco (MB)", "disk_mb", "{:.1f}"),
+    ]
+
+    print("\n📊 RELATÓRIO DE QUANTIZAÇÃO")
+    print("=" * 64)
+    print(f"{'Métrica':<28}{'fp32':>12}{'int8':>12}{'delta':>12}")
+    print("-" * 64)
+    for title, key, fmt in rows:
+        before, after = baseline[key], quantized[key]
+        print(
+            f"{title:<28}{fmt.format(before):>12}{fmt.format(after):>12}"
+            f"{fmt.format(after - before):>12}"
+        )
+    print("-" * 64)
+    print(f"Concordância de rótulos fp32 x int8: {agreement:.2%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Quantização INT8 do classificador")
+    parser.add_argument("--model-dir", default="models/model_distilbert_cased")
+    parser.add_argument("--output-dir", help="Padrão: <model-dir>_int8")
+    parser.add_argument("--method", choices=QUANTIZATION_METHODS, default="dynamic")
+    parser.add_argument(
+        "--calibration-samples",
+        type=int,
+        default=200,
+        help="Textos de train.json usados na calibração (método static)",
+    )
+    parser.add_argument("--dataset", default=TEST_PATH)
+    parser.add_argument("--latency-samples", type=int, default=100)
+    parser.add_argument(
+        "--skip-report", action="store_true", help="Apenas gerar o modelo"
+    )
+    args = parser.parse_args()
+
+    output_dir = args.output_dir or f"{args.model_dir.rstrip('/')}_int8"
+
+    print(f"⚙️ Quantizando {args.model_dir} ({args.method}) → {output_dir}")
+    if args.method == "dynamic":
+        quantize_dynamic_model(args.model_dir, output_dir)
+    else:
+        calibration = [
+            item["text"] for item in load_split(TRAIN_PATH)[: args.calibration_samples]
+        ]
+        quantize_static_model(args.model_dir, output_dir, calibration)
+    print(f"✅ Modelo quantizado salvo em: {output_dir}")
+
+    if args.skip_report:
+        return
+
+    print("📏 Medindo modelo fp32...")
+    baseline = measure_isolated(args.model_dir, args.dataset, args.latency_samples)
+    print("📏 Medindo modelo int8...")
+    quantized = measure_isolated(output_dir, args.dataset, args.latency_samples)
+    print_report(baseline, quantized)
+
+    print(f"\n💡 Use no app/API com: MODEL_ID={output_dir} / MODEL_DIR={output_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,62 +3,76 @@
 Classificador Inteligente com Pós-processamento para Corrigir Classificações Óbvias
 """
 
+import os
 import re
+import sys
 from typing import Dict, Tuple, List
 
+# Adicionar o diretório raiz ao path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from keyword_engine import KeywordEngine
+
+# Categorias mais granulares
+SMART_CATEGORIES = {
+    "aniversario_parabens": {
+        "keywords": ["aniversário", "parabéns", "felicidades", "saúde", "muitos anos", "feliz aniversário"],
+        "priority": 1.0,  # Alta prioridade
+        "response_type": "social_greeting"
+    },
+    "agradecimento": {
+        "keywords": ["obrigado", "obrigada", "valeu", "agradeço", "agradecemos", "grato"],
+        "priority": 0.9,
+        "response_type": "acknowledgment"
+    },
+    "informacao_geral": {
+        "keywords": ["informar", "comunicar", "avisar", "notificar", "divulgar"],
+        "priority": 0.8,
+        "response_type": "information"
+    },
+    "solicitacao_acao": {
+        "keywords": ["preciso", "solicito", "requer", "necessito", "urgente", "reunião", "projeto"],
+        "priority": 0.7,
+        "response_type": "action_required"
+    },
+    "problema_urgencia": {
+        "keywords": ["problema", "erro", "falha", "crítico", "emergência", "bug", "sistema"],
+        "priority": 0.9,
+        "response_type": "urgent_action"
+    },
+    "lembrete_agendamento": {
+        "keywords": ["lembrar", "lembrete", "agenda", "horário", "data", "deadline"],
+        "priority": 0.8,
+        "response_type": "reminder"
+    }
+}
+
+# Todas as palavras-chave compiladas uma única vez (uma passada por email)
+SMART_KEYWORDS = KeywordEngine(
+    {category: config["keywords"] for category, config in SMART_CATEGORIES.items()}
+)
+
+
 class SmartEmailClassifier:
     """
     Classificador inteligente que combina modelo BERT com regras baseadas em palavras-chave
     """
     
     def __init__(self):
-        # Categorias mais granulares
-        self.categories = {
-            "aniversario_parabens": {
-                "keywords": ["aniversário", "parabéns", "felicidades", "saúde", "muitos anos", "feliz aniversário"],
-                "priority": 1.0,  # Alta prioridade
-                "response_type": "social_greeting"
-            },
-            "agradecimento": {
-                "keywords": ["obrigado", "obrigada", "valeu", "agradeço", "agradecemos", "grato"],
-                "priority": 0.9,
-                "response_type": "acknowledgment"
-            },
-            "informacao_geral": {
-                "keywords": ["informar", "comunicar", "avisar", "notificar", "divulgar"],
-                "priority": 0.8,
-                "response_type": "information"
-            },
-            "solicitacao_acao": {
-                "keywords": ["preciso", "solicito", "requer", "necessito", "urgente", "reunião", "projeto"],
-                "priority": 0.7,
-                "response_type": "action_required"
-            },
-            "problema_urgencia": {
-                "keywords": ["problema", "erro", "falha", "crítico", "emergência", "bug", "sistema"],
-                "priority": 0.9,
-                "response_type": "urgent_action"
-            },
-            "lembrete_agendamento": {
-                "keywords": ["lembrar", "lembrete", "agenda", "horário", "data", "deadline"],
-                "priority": 0.8,
-                "response_type": "reminder"
-            }
-        }
+        self.categories = SMART_CATEGORIES
     
     def classify_with_keywords(self, text: str) -> Tuple[str, float, str]:
         """
         Classifica usando palavras-chave com alta confiança
         """
-        text_lower = text.lower()
+        hits = SMART_KEYWORDS.scan(text)
         
-        # Verificar cada categoria
+        # Verificar cada categoria (na ordem de prioridade do dicionário)
         for category, config in self.categories.items():
-            for keyword in config["keywords"]:
-                if keyword in text_lower:
-                    confidence = config["priority"]
-                    response_type = config["response_type"]
-                    return category, confidence, response_type
+            if category in hits:
+                confidence = config["priority"]
+                response_type = config["response_type"]
+                return category, confidence, response_type
         
         # Se não encontrar palavras-chave específicas, retornar None
         return None, 0.0, None
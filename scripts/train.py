@@ -24,7 +24,6 @@ from transformers import (
     AutoTokenizer,
     AutoModelForSequenceClassification,
     TrainingArguments,
-    Trainer,
     EarlyStoppingCallback,
     DataCollatorWithPadding,
     TrainerCallback,
@@ -40,6 +39,18 @@ import pandas as pd
 from huggingface_hub import HfApi, login
 import warnings
 
+from dataset_cache import load_tokenized_splits
+from distributed_cpu import (
+    configure_worker_threads,
+    ddp_training_kwargs,
+    is_distributed,
+    is_main_process,
+    rank,
+    world_size,
+)
+from length_batching import LengthGroupedTrainer
+from packing import PackedDataCollator, PackedDataset, PackedTrainer
+
 warnings.filterwarnings("ignore")
 
 # Configurar logging detalhado
@@ -127,14 +138,14 @@ class SystemMonitor:
         logger.info("   ✅ Garbage collection executado")
 
 
-class WeightedTrainer(Trainer):
+class WeightedTrainer(LengthGroupedTrainer):
     """Trainer customizado com suporte a class weights para datasets desbalanceados"""
 
     def __init__(self, class_weights=None, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.class_weights = class_weights
 
-    def compute_loss(self, model, inputs, return_outputs=False):
+    def compute_loss(self, model, inputs, return_outputs=False, **kwargs):
         labels = inputs.pop("labels")
         outputs = model(**inputs)
         logits = outputs.logits
@@ -165,6 +176,9 @@ NUM_EPOCHS = 2  # Reduzido para teste mais rápido
 EVAL_STEPS = 50  # Reduzido para mais feedback
 SAVE_STEPS = 100  # Reduzido para mais checkpoints
 WARMUP_STEPS = 50  # Reduzido
+# Empacotamento: vários exemplos curtos por sequência de PACK_LENGTH tokens
+PACKED_TRAINING = os.getenv("PACKED_TRAINING", "0") == "1"
+PACK_LENGTH = int(os.getenv("PACK_LENGTH", "128"))
 
 
 class ProgressCallback(TrainerCallback):
@@ -248,6 +262,8 @@ class ModelConfig:
     label2id: Dict[str, int] = field(
         default_factory=lambda: {"Improdutivo": 0, "Produtivo": 1}
     )
+    packing: bool = PACKED_TRAINING
+    pack_length: int = PACK_LENGTH
 
 
 class EmailClassifierTrainer:
@@ -368,11 +384,10 @@ class EmailClassifierTrainer:
             return json.load(f)
 
     def tokenize_function(self, examples):
-        """Função de tokenização"""
+        """Função de tokenização (sem padding: o collator preenche por lote)"""
         return self.tokenizer(
             examples["text"],
             truncation=True,
-            padding=True,
             max_length=self.config.max_length,
         )
 
@@ -443,6 +458,40 @@ class EmailClassifierTrainer:
             SystemMonitor.cleanup_memory()
             raise
 
+    def load_tokenized_datasets(self) -> Tuple[Dataset, Dataset, Dataset]:
+        """
+        Carrega os splits já tokenizados do cache em disco
+
+        Equivale a load_dataset + prepare_datasets, mas só tokeniza na
+        primeira execução (ou quando os JSON, o tokenizer ou o max_length
+        mudam); depois os splits são abertos memory-mapped do cache.
+        """
+        logger.info(
+            f"📁 [{TrainingStage.PREPARING_DATA}] Carregando splits tokenizados "
+            f"de {DATASET_PATH}"
+        )
+        SystemMonitor.log_system_status(TrainingStage.PREPARING_DATA)
+
+        try:
+            start_time = time.time()
+            splits = load_tokenized_splits(
+                self.tokenizer, self.config.max_length, DATASET_PATH
+            )
+            logger.info(f"   ✅ Splits prontos em {time.time() - start_time:.1f}s")
+
+            logger.info(f"📊 [{TrainingStage.LOADING_DATA}] Distribuição de classes:")
+            for name, dataset in splits.items():
+                labels = np.asarray(dataset["labels"])
+                logger.info(
+                    f"   {name}: {dict(zip(*np.unique(labels, return_counts=True)))}"
+                )
+
+            return splits["train"], splits["validation"], splits["test"]
+
+        except Exception as e:
+            logger.error(f"❌ [{TrainingStage.ERROR}] Erro ao carregar dataset: {e}")
+            raise
+
     def compute_metrics(self, eval_pred):
         """Computa métricas de avaliação com média macro (mais justa com desbalanceamento)"""
         logits, y_true = eval_pred
@@ -456,13 +505,30 @@ class EmailClassifierTrainer:
 
         return {"accuracy": acc, "precision": p, "recall": r, "f1": f1}
 
-    def setup_trainer(self, train_dataset, val_dataset, use_class_weights=False):
-        """Configura o trainer"""
+    def setup_trainer(
+        self,
+        train_dataset,
+        val_dataset,
+        use_class_weights=False,
+        extra_callbacks=None,
+        **training_overrides,
+    ):
+        """
+        Configura o trainer
+
+        Args:
+            train_dataset: Dataset de treino tokenizado
+            val_dataset: Dataset de validação tokenizado
+            use_class_weights: Usar WeightedTrainer com class weights
+            extra_callbacks: TrainerCallbacks adicionais (ex.: poda de trials)
+            **training_overrides: Substituem os TrainingArguments padrão
+                (ex.: max_steps, output_dir, learning_rate)
+        """
         logger.info(f"⚙️ [{TrainingStage.SETTING_UP_TRAINER}] Configurando trainer...")
         SystemMonitor.log_system_status(TrainingStage.SETTING_UP_TRAINER)
 
         # Argumentos de treinamento otimizados
-        training_args = TrainingArguments(
+        training_kwargs = dict(
             output_dir=OUTPUT_DIR,
             num_train_epochs=3,  # Aumentado para melhor convergência
             per_device_train_batch_size=8,
@@ -485,18 +551,23 @@ class EmailClassifierTrainer:
             save_total_limit=2,
             logging_steps=50,
         )
+        # DDP em CPU (gloo) quando iniciado pelo torchrun (ver train_ddp.py)
+        training_kwargs.update(ddp_training_kwargs())
+        training_kwargs.update(training_overrides)
+        training_args = TrainingArguments(**training_kwargs)
 
-        # Data collator
+        # Data collator: padding dinâmico até o maior exemplo de cada lote
+        # (os lotes são agrupados por comprimento em LengthGroupedTrainer)
         data_collator = DataCollatorWithPadding(tokenizer=self.tokenizer)
 
-        # Callbacks
-        callbacks = [
-            EarlyStoppingCallback(early_stopping_patience=3),
-            ProgressCallback(),
-        ]
+        # Callbacks (early stopping depende de load_best_model_at_end)
+        callbacks = [ProgressCallback()]
+        if training_args.load_best_model_at_end:
+            callbacks.insert(0, EarlyStoppingCallback(early_stopping_patience=3))
+        callbacks.extend(extra_callbacks or [])
 
         # Calcular class weights se solicitado
-        trainer_class = Trainer
+        trainer_class = LengthGroupedTrainer
         trainer_kwargs = {}
 
         if use_class_weights:
@@ -510,6 +581,33 @@ class EmailClassifierTrainer:
             trainer_kwargs = {"class_weights": class_weights.tolist()}
             print(f"📊 Class weights: {class_weights.tolist()}")
 
+        if self.config.packing:
+            if use_class_weights:
+                logger.warning("   ⚠️ Class weights ignorados no modo empacotado")
+            # Treino empacotado; a avaliação continua sem empacotamento
+            train_dataset = PackedDataset(train_dataset, self.config.pack_length)
+            packing = train_dataset.summary()
+            logger.info(
+                f"📦 Empacotamento: {packing['examples']} exemplos em "
+                f"{packing['packs']} pacotes de até {self.config.pack_length} tokens "
+                f"({packing['examples_per_pack']:.1f} exemplos/pacote)"
+            )
+            logger.info(
+                f"   Eficiência (tokens reais / tokens totais): "
+                f"{packing['efficiency']:.1%}"
+            )
+            # Manter o número de exemplos por passo do treino sem empacotamento
+            training_args.per_device_train_batch_size = max(
+                1,
+                round(
+                    training_args.per_device_train_batch_size
+                    / packing["examples_per_pack"]
+                ),
+            )
+            data_collator = PackedDataCollator(self.tokenizer)
+            trainer_class = PackedTrainer
+            trainer_kwargs = {}
+
         # Trainer
         self.trainer = trainer_class(
             model=self.model,
@@ -527,6 +625,11 @@ class EmailClassifierTrainer:
         logger.info(f"   Tipo: {trainer_class.__name__}")
         logger.info(f"   Épocas: {training_args.num_train_epochs}")
         logger.info(f"   Batch size: {training_args.per_device_train_batch_size}")
+        if is_distributed():
+            logger.info(
+                f"   Workers: {world_size()} (batch global: "
+                f"{training_args.per_device_train_batch_size * world_size()})"
+            )
         logger.info(f"   Learning rate: {training_args.learning_rate}")
         logger.info(f"   Output dir: {training_args.output_dir}")
         SystemMonitor.log_system_status(TrainingStage.SETTING_UP_TRAINER)
@@ -552,7 +655,8 @@ class EmailClassifierTrainer:
             # Salvar modelo
             logger.info(f"💾 [{TrainingStage.SAVING}] Salvando modelo...")
             self.trainer.save_model()
-            self.tokenizer.save_pretrained(OUTPUT_DIR)
+            if self.trainer.is_world_process_zero():
+                self.tokenizer.save_pretrained(self.trainer.args.output_dir)
             logger.info("✅ Modelo salvo com sucesso")
 
             logger.info("✅ Treinamento concluído!")
@@ -646,6 +750,16 @@ def upload_to_hub(model_path: str, hub_model_id: str):
 
 def main():
     """Função principal"""
+    if is_distributed():
+        # Worker DDP: threads/núcleos próprios e logs só no rank 0
+        threads = configure_worker_threads()
+        if not is_main_process():
+            logging.getLogger().setLevel(logging.WARNING)
+        logger.warning(
+            f"🧵 Worker {rank()}/{world_size()}: {threads['threads']} threads, "
+            f"núcleos {threads['cores'] or 'sem afinidade'}"
+        )
+
     logger.info(
         f"🚀 [{TrainingStage.INIT}] Iniciando treinamento do classificador de emails..."
     )
@@ -684,13 +798,8 @@ def main():
         # Carregar modelo e tokenizer
         trainer.load_tokenizer_and_model()
 
-        # Carregar datasets
-        train_dataset, val_dataset, test_dataset = trainer.load_dataset()
-
-        # Preparar datasets
-        train_dataset, val_dataset, test_dataset = trainer.prepare_datasets(
-            train_dataset, val_dataset, test_dataset
-        )
+        # Carregar datasets tokenizados (cache em disco; tokeniza só se mudou)
+        train_dataset, val_dataset, test_dataset = trainer.load_tokenized_datasets()
 
         # Configurar trainer (com class weights se dataset estiver desbalanceado)
         # Para ativar class weights, mude para: trainer.setup_trainer(train_dataset, val_dataset, use_class_weights=True)
@@ -702,6 +811,10 @@ def main():
         # Avaliar
         eval_result = trainer.evaluate(test_dataset)
 
+        # Amostras, métricas e upload apenas no rank 0
+        if not is_main_process():
+            return
+
         # Teste com amostras
         logger.info("\n🧪 Testando modelo com amostras...")
         test_samples = [
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Treino data-parallel em CPU (DistributedDataParallel sobre gloo)
+
+Inicia N workers com torchrun, cada um com a sua fatia dos núcleos
+(distributed_cpu.configure_worker_threads) e a sua fatia dos lotes. O
+checkpoint, o tokenizer e as métricas são gravados só pelo rank 0; a
+avaliação é distribuída e as predições reunidas pelo Trainer.
+
+Uso:
+    # Treino completo de scripts/train.py com 4 workers
+    python scripts/train_ddp.py --workers 4
+
+    # Escalabilidade: amostras/s com 1, 2, 4 e 8 workers (poucos passos cada)
+    python scripts/train_ddp.py --scaling 1,2,4,8 --max-steps 30
+
+No modo --scaling o batch por worker é fixo, então o batch global cresce com
+o número de workers (escalabilidade "fraca").
+"""
+
+import argparse
+import json
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+
+# Adicionar o diretório raiz ao path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from distributed_cpu import available_cores, threads_per_worker
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def launch(workers: int, script: str, script_args=(), threads: int = 0) -> int:
+    """
+    Executa script com torchrun em workers processos nesta máquina
+
+    Args:
+        workers: Número de processos
+        script: Script Python de cada worker
+        script_args: Argumentos repassados ao script
+        threads: Threads por worker (padrão: núcleos / workers)
+
+    Returns:
+        Código de saída do torchrun
+    """
+    threads = threads or threads_per_worker(workers)
+    env = dict(os.environ)
+    # torchrun usa OMP_NUM_THREADS=1 se não definido
+    env["OMP_NUM_THREADS"] = str(threads)
+    env["DDP_THREADS_PER_WORKER"] = str(threads)
+    command = [
+        sys.executable,
+        "-m",
+        "torch.distributed.run",
+        "--standalone",
+        f"--nproc_per_node={workers}",
+        script,
+        *script_args,
+    ]
+    return subprocess.call(command, env=env)
+
+
+def benchmark_worker(args):
+    """Worker do modo --scaling: poucos passos de treino, grava amostras/s"""
+    from distributed_cpu import configure_worker_threads, is_main_process
+    from train import EmailClassifierTrainer, ModelConfig
+
+    threads = configure_worker_threads()
+    if not is_main_process():
+        logging.getLogger().setLevel(logging.WARNING)
+    config = ModelConfig(model_name=args.model, max_length=args.max_length)
+    trainer = EmailClassifierTrainer(config)
+    trainer.load_tokenizer_and_model()
+    train_dataset, val_dataset, _ = trainer.load_tokenized_datasets()
+
+    with tempfile.TemporaryDirectory() as output_dir:
+        trainer.setup_trainer(
+            train_dataset,
+            val_dataset,
+            output_dir=output_dir,
+            max_steps=args.max_steps,
+            per_device_train_batch_size=args.batch_size,
+            gradient_accumulation_steps=1,
+            logging_steps=args.max_steps,
+        )
+        metrics = trainer.trainer.train().metrics
+
+    if is_main_process():
+        result = {
+            "workers": int(os.getenv("WORLD_SIZE", "1")),
+            "threads_per_worker": threads["threads"],
+            "global_batch": args.batch_size * int(os.getenv("WORLD_SIZE", "1")),
+            "train_runtime": metrics["train_runtime"],
+            "samples_per_second": metrics["train_samples_per_second"],
+        }
+        with open(args.result_file, "w", encoding="utf-8") as f:
+            json.dump(result, f)
+
+
+def run_scaling(args):
+    """Executa o benchmark para cada número de workers e imprime a tabela"""
+    results = []
+    for workers in args.scaling:
+        print(f"\n🚀 {workers} worker(s), {threads_per_worker(workers)} thread(s) cada")
+        with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as f:
+            result_file = f.name
+        code = launch(
+            workers,
+            os.path.abspath(__file__),
+            [
+                "--benchmark-worker",
+                "--result-file",
+                result_file,
+                "--model",
+                args.model,
+                "--max-length",
+                str(args.max_length),
+                "--max-steps",
+                str(args.max_steps),
+                "--batch-size",
+                str(args.batch_size),
+            ],
+        )
+        try:
+            if code != 0:
+                print(f"❌ Falha com {workers} worker(s) (código {code})")
+                continue
+            with open(result_file, "r", encoding="utf-8") as f:
+                results.append(json.load(f))
+        finally:
+            os.remove(result_file)
+
+    if not results:
+        return
+
+    base = results[0]
+    print(f"\n📊 Escalabilidade ({len(available_cores())} núcleos disponíveis)")
+    print(
+        f"{'workers':>8}{'threads':>9}{'batch':>7}{'amostras/s':>12}"
+        f"{'speedup':>9}{'eficiência':>12}"
+    )
+    for result in results:
+        speedup = result["samples_per_second"] / base["samples_per_second"]
+        efficiency = speedup / (result["workers"] / base["workers"])
+        print(
+            f"{result['workers']:>8}{result['threads_per_worker']:>9}"
+            f"{result['global_batch']:>7}{result['samples_per_second']:>12.1f}"
+            f"{speedup:>9.2f}x{efficiency:>11.0%}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Treino DDP em CPU (gloo)")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument(
+        "--threads", type=int, default=0, help="Threads por worker (0 = automático)"
+    )
+    parser.add_argument(
+        "--scaling",
+        type=lambda value: [int(n) for n in value.split(",")],
+        help="Números de workers para o benchmark (ex.: 1,2,4,8)",
+    )
+    parser.add_argument("--model", default="neuralmind/bert-base-portuguese-cased")
+    parser.add_argument("--max-length", type=int, default=128)
+    parser.add_argument("--max-steps", type=int, default=30)
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--benchmark-worker", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--result-file", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.benchmark_worker:
+        benchmark_worker(args)
+    elif args.scaling:
+        run_scaling(args)
+    else:
+        print(f"🚀 Treinando com {args.workers} workers (gloo)")
+        sys.exit(
+            launch(args.workers, os.path.join(SCRIPTS_DIR, "train.py"), threads=args.threads)
+        )
+
+
+if __name__ == "__main__":
+    main()
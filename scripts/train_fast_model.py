@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Treina o modelo linear do primeiro estágio da cascata
+
+Hashing de n-gramas + TF-IDF + regressão logística em
+data/processed/train.json, avaliado em validation.json. O diretório gerado
+é usado pelo app com CASCADE_INFERENCE=1 (FAST_MODEL_ID).
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+# Adicionar o diretório raiz ao path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cascade import split_by_confidence, train_fast_model
+
+TRAIN_PATH = "data/processed/train.json"
+VALIDATION_PATH = "data/processed/validation.json"
+
+
+def load_split(path: str):
+    """Carrega um split processado (lista de {text, label, label_text})"""
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Treino do modelo linear da cascata")
+    parser.add_argument("--output-dir", default="models/fast_linear")
+    parser.add_argument("--n-features", type=int, default=2**18)
+    parser.add_argument("--C", type=float, default=10.0)
+    args = parser.parse_args()
+
+    train = load_split(TRAIN_PATH)
+    validation = load_split(VALIDATION_PATH)
+
+    print(f"🚀 Treinando modelo linear com {len(train)} exemplos...")
+    start = time.perf_counter()
+    classifier = train_fast_model(
+        [item["text"] for item in train],
+        [item["label_text"] for item in train],
+        args.output_dir,
+        n_features=args.n_features,
+        C=args.C,
+    )
+    print(f"✅ Treino concluído em {time.perf_counter() - start:.1f}s")
+
+    scores = classifier.predict_scores([item["text"] for item in validation])
+    predictions = [max(item, key=item.get) for item in scores]
+    accuracy = sum(
+        prediction == item["label_text"]
+        for prediction, item in zip(predictions, validation)
+    ) / len(validation)
+    print(f"📊 Acurácia em validation.json: {accuracy:.4f}")
+
+    print(f"{'Limiar':>8}{'decididos':>12}{'acurácia nos decididos':>26}")
+    for threshold in (0.8, 0.9, 0.95, 0.98, 0.99):
+        decided, _ = split_by_confidence(scores, threshold)
+        correct = sum(predictions[i] == validation[i]["label_text"] for i in decided)
+        print(
+            f"{threshold:>8.2f}{len(decided) / len(validation):>12.1%}"
+            f"{correct / max(1, len(decided)):>26.4f}"
+        )
+
+    print(f"\n💾 Modelo salvo em: {args.output_dir}")
+    print("💡 Use no app com: CASCADE_INFERENCE=1 CASCADE_THRESHOLD=0.95")
+
+
+if __name__ == "__main__":
+    main()
@@ -14,8 +14,8 @@ from transformers import (
     Trainer,
     DataCollatorWithPadding,
 )
-from datasets import Dataset
-import json
+
+from dataset_cache import load_tokenized_splits
 
 # Configurações otimizadas para treinamento completo
 MODEL_NAME = "neuralmind/bert-base-portuguese-cased"
@@ -29,31 +29,6 @@ EVAL_STEPS = 50  # Frequente para monitoramento
 SAVE_STEPS = 100  # Frequente para checkpoints
 
 
-def load_datasets():
-    """Carrega datasets completos"""
-    print("📁 Carregando datasets...")
-
-    # Carregar splits
-    with open(f"{DATASET_PATH}/train.json", "r") as f:
-        train_data = json.load(f)
-    with open(f"{DATASET_PATH}/validation.json", "r") as f:
-        val_data = json.load(f)
-    with open(f"{DATASET_PATH}/test.json", "r") as f:
-        test_data = json.load(f)
-
-    # Converter para Dataset
-    train_dataset = Dataset.from_list(train_data)
-    val_dataset = Dataset.from_list(val_data)
-    test_dataset = Dataset.from_list(test_data)
-
-    print(f"📊 Datasets carregados:")
-    print(f"  - Treino: {len(train_dataset)} amostras")
-    print(f"  - Validação: {len(val_dataset)} amostras")
-    print(f"  - Teste: {len(test_dataset)} amostras")
-
-    return train_dataset, val_dataset, test_dataset
-
-
 def train_model():
     """Executa o treinamento completo"""
     print("🚀 Iniciando treinamento completo...")
@@ -76,40 +51,17 @@ def train_model():
         label2id={"Improdutivo": 0, "Produtivo": 1},
     )
 
-    # Carregar datasets
-    train_dataset, val_dataset, test_dataset = load_datasets()
-
-    # Renomear colunas
-    train_dataset = train_dataset.rename_column("label", "labels")
-    val_dataset = val_dataset.rename_column("label", "labels")
-    test_dataset = test_dataset.rename_column("label", "labels")
-
-    # Tokenizar
-    print("🔄 Tokenizando datasets...")
-
-    def tokenize_function(examples):
-        return tokenizer(
-            examples["text"],
-            truncation=True,
-            padding=True,
-            max_length=MAX_LENGTH,
-        )
-
-    train_dataset = train_dataset.map(
-        tokenize_function,
-        batched=True,
-        remove_columns=["text", "label_text"],
-    )
-    val_dataset = val_dataset.map(
-        tokenize_function,
-        batched=True,
-        remove_columns=["text", "label_text"],
-    )
-    test_dataset = test_dataset.map(
-        tokenize_function,
-        batched=True,
-        remove_columns=["text", "label_text"],
-    )
+    # Carregar datasets tokenizados (cache em disco; tokeniza só se mudou)
+    print("🔄 Carregando datasets tokenizados...")
+    splits = load_tokenized_splits(tokenizer, MAX_LENGTH, DATASET_PATH)
+    train_dataset = splits["train"]
+    val_dataset = splits["validation"]
+    test_dataset = splits["test"]
+
+    print(f"📊 Datasets carregados:")
+    print(f"  - Treino: {len(train_dataset)} amostras")
+    print(f"  - Validação: {len(val_dataset)} amostras")
+    print(f"  - Teste: {len(test_dataset)} amostras")
 
     # Configurar trainer
     print("⚙️ Configurando trainer...")
@@ -7,6 +7,7 @@ Adaptado para nosso projeto de classificação de emails
 import os
 import time
 import json
+import statistics
 import torch
 import numpy as np
 from pathlib import Path
@@ -20,9 +21,13 @@ from transformers import (
     get_linear_schedule_with_warmup,
 )
 from torch.optim import AdamW
-from datasets import Dataset
 from sklearn.metrics import accuracy_score, precision_recall_fscore_support
-from torch.cuda.amp import GradScaler, autocast
+from torch.amp import GradScaler
+from contextlib import nullcontext
+
+from cpu_training import configure_cpu_training, peak_memory_mb
+from dataset_cache import load_tokenized_splits
+from length_batching import create_length_grouped_dataloader
 
 # Configurações
 MODEL_NAME = "neuralmind/bert-base-portuguese-cased"
@@ -48,65 +53,21 @@ def compute_metrics(y_true, y_pred):
     return f1, recall, precision, accuracy
 
 
-def load_datasets():
-    """Carrega datasets completos"""
-    print("📁 Carregando datasets...")
-    
-    # Carregar splits
-    with open(f"{DATASET_PATH}/train.json", "r") as f:
-        train_data = json.load(f)
-    with open(f"{DATASET_PATH}/validation.json", "r") as f:
-        val_data = json.load(f)
-    with open(f"{DATASET_PATH}/test.json", "r") as f:
-        test_data = json.load(f)
-    
-    # Converter para Dataset
-    train_dataset = Dataset.from_list(train_data)
-    val_dataset = Dataset.from_list(val_data)
-    test_dataset = Dataset.from_list(test_data)
-    
-    print(f"📊 Datasets carregados:")
-    print(f"  - Treino: {len(train_dataset)} amostras")
-    print(f"  - Validação: {len(val_dataset)} amostras")
-    print(f"  - Teste: {len(test_dataset)} amostras")
-    
-    return train_dataset, val_dataset, test_dataset
-
-
 def create_dataloader(dataset, tokenizer, batch_size=8, shuffle=True):
-    """Cria DataLoader personalizado"""
-    def tokenize_function(examples):
-        return tokenizer(
-            examples["text"],
-            truncation=True,
-            padding=True,
-            max_length=MAX_LENGTH,
-        )
-    
-    # Tokenizar
-    dataset = dataset.map(
-        tokenize_function,
-        batched=True,
-        remove_columns=["text", "label_text"],
-    )
-    
-    # Renomear coluna
-    dataset = dataset.rename_column("label", "labels")
-    
-    # Criar DataLoader
-    from torch.utils.data import DataLoader
-    dataloader = DataLoader(
+    """Cria DataLoader personalizado (dataset já tokenizado, ver dataset_cache)"""
+    # Lotes agrupados por comprimento + padding dinâmico até o maior do lote
+    dataloader = create_length_grouped_dataloader(
         dataset,
-        batch_size=batch_size,
+        DataCollatorWithPadding(tokenizer=tokenizer),
+        batch_size,
         shuffle=shuffle,
-        collate_fn=DataCollatorWithPadding(tokenizer=tokenizer)
     )
     
     return dataloader
 
 
-def train_epoch(model, dataloader, optimizer, scheduler, scaler, epoch):
-    """Treina uma época do modelo"""
+def train_epoch(model, dataloader, optimizer, scheduler, scaler, epoch, amp_context=nullcontext):
+    """Treina uma época do modelo (amp_context: precisão do forward, ver cpu_training)"""
     t0 = time.time()
     
     print("")
@@ -117,6 +78,9 @@ def train_epoch(model, dataloader, optimizer, scheduler, scaler, epoch):
     total_recall = 0
     total_precision = 0
     total_acc = 0
+    total_tokens = 0  # tokens processados (incluindo padding)
+    real_tokens = 0  # tokens do texto
+    step_times = []  # segundos por passo (forward + backward + otimizador)
     
     model.train()  # coloca o modelo no modo de treino
     
@@ -129,21 +93,16 @@ def train_epoch(model, dataloader, optimizer, scheduler, scaler, epoch):
         input_ids = batch['input_ids'].to(device)
         attention_mask = batch['attention_mask'].to(device)
         labels = batch['labels'].to(device).long()
+        total_tokens += attention_mask.numel()
+        real_tokens += int(attention_mask.sum())
+        
+        step_start = time.perf_counter()
         
         # Limpar gradientes
         optimizer.zero_grad()
         
-        # Forward pass
-        if device.type == 'cuda':
-            with autocast():
-                outputs = model(
-                    input_ids=input_ids,
-                    attention_mask=attention_mask,
-                    labels=labels
-                )
-                loss = outputs.loss
-                logits = outputs.logits
-        else:
+        # Forward pass (fp16 em CUDA, bf16 ou fp32 em CPU)
+        with amp_context():
             outputs = model(
                 input_ids=input_ids,
                 attention_mask=attention_mask,
@@ -154,8 +113,8 @@ def train_epoch(model, dataloader, optimizer, scheduler, scaler, epoch):
         
         total_loss += loss.item()
         
-        # Backward pass
-        if device.type == 'cuda':
+        # Backward pass (GradScaler só com fp16 em CUDA)
+        if scaler is not None:
             scaler.scale(loss).backward()
             scaler.step(optimizer)
             scaler.update()
@@ -164,9 +123,10 @@ def train_epoch(model, dataloader, optimizer, scheduler, scaler, epoch):
             optimizer.step()
         
         scheduler.step()  # update the learning rate
+        step_times.append(time.perf_counter() - step_start)
         
         # Calcular métricas
-        logits = logits.detach().cpu().numpy()
+        logits = logits.detach().float().cpu().numpy()
         rounded_preds = np.argmax(logits, axis=1).flatten()
         
         f1, recall, precision, acc = compute_metrics(
@@ -190,6 +150,9 @@ def train_epoch(model, dataloader, optimizer, scheduler, scaler, epoch):
     print("Summary Results")
     print("epoch | loss | acc | recall | f1 | precision | training time")
     print(f"{epoch+1:5d} | {avg_train_loss:.5f} | {avg_train_acc:.5f} | {avg_train_recall:.5f} | {avg_train_f1:.5f} | {avg_train_precision:.5f} | {training_time}")
+    print(f"Tokens processados: {total_tokens:,} (padding: {1 - real_tokens / max(1, total_tokens):.1%})")
+    step_time_ms = statistics.median(step_times) * 1000 if step_times else 0.0
+    print(f"Tempo por passo (mediana): {step_time_ms:.1f} ms | Pico de memória: {peak_memory_mb():,.0f} MB")
     
     if device.type == 'cuda':
         torch.cuda.empty_cache()
@@ -199,7 +162,11 @@ def train_epoch(model, dataloader, optimizer, scheduler, scaler, epoch):
         'accuracy': avg_train_acc,
         'f1': avg_train_f1,
         'precision': avg_train_precision,
-        'recall': avg_train_recall
+        'recall': avg_train_recall,
+        'tokens': total_tokens,
+        'step_time_ms': step_time_ms,
+        'peak_memory_mb': peak_memory_mb(),
+        'training_time': training_time
     }
 
 
@@ -291,8 +258,17 @@ def main():
     # Mover modelo para dispositivo
     model = model.to(device)
     
-    # Carregar datasets
-    train_dataset, val_dataset, test_dataset = load_datasets()
+    # Carregar datasets tokenizados (cache em disco; tokeniza só se mudou)
+    print("📁 Carregando datasets tokenizados...")
+    splits = load_tokenized_splits(tokenizer, MAX_LENGTH, DATASET_PATH)
+    train_dataset = splits["train"]
+    val_dataset = splits["validation"]
+    test_dataset = splits["test"]
+    
+    print(f"📊 Datasets carregados:")
+    print(f"  - Treino: {len(train_dataset)} amostras")
+    print(f"  - Validação: {len(val_dataset)} amostras")
+    print(f"  - Teste: {len(test_dataset)} amostras")
     
     # Criar DataLoaders
     print("🔄 Criando DataLoaders...")
@@ -312,7 +288,12 @@ def main():
     )
     
     # Configurar scaler para GPU
-    scaler = GradScaler() if device.type == 'cuda' else None
+    scaler = GradScaler('cuda') if device.type == 'cuda' else None
+    
+    # Perfil de precisão/compilação (CPU_BF16, TORCH_COMPILE; ver cpu_training)
+    sample_batch = {k: v.to(device) for k, v in next(iter(val_dataloader)).items()}
+    sample_batch['labels'] = sample_batch['labels'].long()
+    train_model, amp_context, profile = configure_cpu_training(model, device, sample_batch)
     
     print(f"📊 Configuração:")
     print(f"  - Épocas: {NUM_EPOCHS}")
@@ -320,6 +301,7 @@ def main():
     print(f"  - Learning rate: {LEARNING_RATE}")
     print(f"  - Total steps: {total_steps}")
     print(f"  - Dispositivo: {device}")
+    print(f"  - Precisão: {profile['precision']} | torch.compile: {'sim' if profile['compiled'] else 'não'}")
     
     # Treinar
     print("🚀 Iniciando treinamento...")
@@ -327,7 +309,7 @@ def main():
     
     for epoch in range(NUM_EPOCHS):
         print('Training...')
-        epoch_metrics = train_epoch(model, train_dataloader, optimizer, scheduler, scaler, epoch)
+        epoch_metrics = train_epoch(train_model, train_dataloader, optimizer, scheduler, scaler, epoch, amp_context)
         training_metrics.append(epoch_metrics)
     
     # Avaliar no conjunto de validação
@@ -352,7 +334,9 @@ def main():
             "batch_size": BATCH_SIZE,
             "learning_rate": LEARNING_RATE,
             "num_epochs": NUM_EPOCHS,
-            "device": str(device)
+            "device": str(device),
+            "precision": profile["precision"],
+            "compiled": profile["compiled"]
         }
     }
     
@@ -0,0 +1,319 @@
+"""
+Pré-processamento com orçamento de tokens
+
+Em vez de cortar o texto em um número fixo de caracteres, o email é
+tokenizado uma única vez e, se passar do limite do modelo, são mantidos o
+início (assunto/saudação) e o final do corpo, já sem assinatura e sem o
+histórico citado. Os IDs resultantes vão direto para o modelo.
+"""
+
+import re
+import weakref
+from typing import Dict, List, Tuple
+
+MAX_LENGTH = 512  # Limite de tokens do modelo (incluindo [CLS]/[SEP])
+HEAD_TOKENS = 128  # Tokens preservados do início; o restante vem do final
+# Estimativa inicial de caracteres por token usada para dimensionar as
+# janelas que são tokenizadas; depois ela segue a mediana observada com cada
+# tokenizer. Janelas que rendem tokens de menos são estendidas só pelo trecho
+# que falta
+CHARS_PER_TOKEN = 5
+CHARS_PER_TOKEN_MARGIN = 1.05
+# Limite generoso para o corte em caracteres (clip_head_tail): textos
+# maiores que max_length * MAX_CHARS_PER_TOKEN nunca caberiam no modelo
+MAX_CHARS_PER_TOKEN = 8
+# Uma despedida só é tratada como assinatura se vier seguida de poucas linhas
+SIGNATURE_MAX_LINES = 6
+
+# Início de histórico citado (tudo a partir daqui é descartado)
+_QUOTE_HEADER = re.compile(
+    r"^[ \t]*(?:On .+ wrote:|Em .+ escreveu:|-{2,}[ \t]*(?:Original Message|"
+    r"Mensagem original|Forwarded message|Mensagem encaminhada)[ \t]*-{2,})[ \t]*$",
+    re.IGNORECASE | re.MULTILINE,
+)
+# Despedidas e delimitadores de assinatura (linha inteira)
+_SIGNATURE_START = re.compile(
+    r"^\s*(?:--|_{2,}|atenciosamente|att\.?|abraços?|cordialmente|"
+    r"saudações|obrigad[oa]|best regards|kind regards|regards|"
+    r"sincerely|cheers|thanks|sent from my .+|enviado do meu .+)[\s,.!]*$",
+    re.IGNORECASE,
+)
+
+
+def strip_signature(text: str) -> str:
+    """
+    Remove histórico citado e assinatura do final do email
+
+    Args:
+        text: Texto do email (com quebras de linha)
+
+    Returns:
+        Texto sem assinatura; o original se nada sobrar
+    """
+    # Histórico citado: uma busca só no texto inteiro (a partir da 2ª linha)
+    first_break = text.find("\n")
+    if first_break >= 0:
+        quote = _QUOTE_HEADER.search(text, first_break + 1)
+        if quote:
+            text_body = text[: quote.start()]
+        else:
+            text_body = text
+    else:
+        text_body = text
+
+    # Assinatura: só as últimas linhas precisam ser examinadas
+    lines = text_body.rstrip().split("\n")
+    first_candidate = max(1, len(lines) - SIGNATURE_MAX_LINES)
+    for idx in range(first_candidate, len(lines)):
+        if _SIGNATURE_START.match(lines[idx]):
+            lines = lines[:idx]
+            break
+
+    stripped = "\n".join(lines).strip()
+    return stripped or text
+
+
+def clip_head_tail(
+    text: str,
+    max_length: int = MAX_LENGTH,
+    head_tokens: int = HEAD_TOKENS,
+    separator: str = " ... ",
+) -> str:
+    """
+    Limita o texto a uma janela de caracteres do início e do final
+
+    A janela é proporcional ao orçamento de tokens, de modo que o corte em
+    tokens feito depois em encode_with_budget continua sendo o que decide.
+
+    Args:
+        text: Texto original
+        max_length: Orçamento de tokens
+        head_tokens: Tokens preservados do início
+        separator: Marcador inserido no ponto de corte
+
+    Returns:
+        Texto original ou início + separador + final
+    """
+    max_chars = max_length * MAX_CHARS_PER_TOKEN
+    if len(text) <= max_chars:
+        return text
+
+    head_chars = head_tokens * MAX_CHARS_PER_TOKEN
+    tail_chars = max_chars - head_chars
+    return text[:head_chars] + separator + text[-tail_chars:]
+
+
+# Estado por tokenizer (tokens especiais e caracteres por token observados),
+# liberado junto com o tokenizer
+_TOKENIZER_STATE: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+
+def _tokenizer_state(tokenizer) -> Dict:
+    state = _TOKENIZER_STATE.get(tokenizer)
+    if state is None:
+        plain = tokenizer("x", add_special_tokens=False)["input_ids"]
+        wrapped = tokenizer("x", add_special_tokens=True)["input_ids"]
+        prefix, suffix = [], []
+        for start in range(len(wrapped) - len(plain) + 1):
+            if wrapped[start : start + len(plain)] == plain:
+                prefix, suffix = wrapped[:start], wrapped[start + len(plain) :]
+                break
+        state = {
+            "prefix": prefix,
+            "suffix": suffix,
+            "chars_per_token": float(CHARS_PER_TOKEN),
+        }
+        _TOKENIZER_STATE[tokenizer] = state
+    return state
+
+
+def special_tokens(tokenizer) -> Tuple[List[int], List[int]]:
+    """
+    Tokens especiais que o tokenizer adiciona antes e depois de um texto
+
+    Calculados uma vez por tokenizer.
+
+    Returns:
+        Tuple (prefixo, sufixo), ex: ([CLS], [SEP]) para BERT
+    """
+    state = _tokenizer_state(tokenizer)
+    return state["prefix"], state["suffix"]
+
+
+def _encode(tokenizer, texts: List[str]) -> List[List[int]]:
+    """input_ids sem tokens especiais, direto no backend Rust quando possível"""
+    backend = getattr(tokenizer, "backend_tokenizer", None)
+    # Truncamento/padding ficam no backend depois de chamadas com
+    # truncation=/padding=; nesse caso o tokenizer os desliga sozinho
+    if backend is None or backend.truncation or backend.padding:
+        return tokenizer(
+            texts,
+            add_special_tokens=False,
+            return_attention_mask=False,
+            return_token_type_ids=False,
+        )["input_ids"]
+    return [
+        encoding.ids
+        for encoding in backend.encode_batch(texts, add_special_tokens=False)
+    ]
+
+
+def _word_boundary(text: str, position: int, lower: int = 0) -> int:
+    """Espaço logo antes de position (até 50 caracteres, depois de lower)"""
+    if position >= len(text):
+        return len(text)
+    if position <= lower:
+        return lower
+    space = text.rfind(" ", max(lower + 1, position - 50), position)
+    return space if space > 0 else position
+
+
+def encode_with_budget(
+    tokenizer,
+    texts: List[str],
+    max_length: int = MAX_LENGTH,
+    head_tokens: int = HEAD_TOKENS,
+) -> List[List[int]]:
+    """
+    Tokeniza os textos uma única vez respeitando o orçamento de tokens
+
+    Textos que cabem são tokenizados inteiros. Dos textos longos só são
+    tokenizadas uma janela do início e outra do final, cortadas em espaços e
+    dimensionadas pelos caracteres por token já observados com este
+    tokenizer; se uma janela render tokens de menos, apenas o trecho
+    seguinte (início) ou anterior (final) é tokenizado e emendado.
+
+    Args:
+        tokenizer: Tokenizer do modelo
+        texts: Textos já pré-processados
+        max_length: Limite de tokens do modelo, incluindo tokens especiais
+        head_tokens: Tokens mantidos do início quando o texto excede o limite
+
+    Returns:
+        input_ids de cada texto, prontos para inference.pad_input_ids
+    """
+    state = _tokenizer_state(tokenizer)
+    prefix, suffix = state["prefix"], state["suffix"]
+    budget = max_length - len(prefix) - len(suffix)
+    head_tokens = min(head_tokens, budget)
+    tail_tokens = budget - head_tokens
+    chars_per_token = state["chars_per_token"] * CHARS_PER_TOKEN_MARGIN
+
+    input_ids: List[List[int]] = [None] * len(texts)
+    # Texto -> [fim da janela inicial, tokens, início da janela final, tokens]
+    windows: Dict[int, list] = {}
+    whole = []
+    for i, text in enumerate(texts):
+        if len(text) > budget * chars_per_token:
+            windows[i] = [0, [], len(text), []]
+        else:
+            whole.append(i)
+
+    # Caracteres por token de cada trecho, para atualizar a estimativa
+    samples: List[float] = []
+    if whole:
+        for i, ids in zip(whole, _encode(tokenizer, [texts[i] for i in whole])):
+            if len(ids) >= head_tokens:
+                samples.append(len(texts[i]) / len(ids))
+            if len(ids) > budget:
+                ids = ids[:head_tokens] + ids[len(ids) - tail_tokens :]
+            input_ids[i] = prefix + ids + suffix
+
+    while windows:
+        # Próximo trecho de cada janela curta: depois do início, antes do final
+        chunks, targets = [], []
+        for i, (head_end, head, tail_start, tail) in windows.items():
+            text = texts[i]
+            if len(head) < head_tokens:
+                missing = head_tokens - len(head) + 1
+                end = _word_boundary(
+                    text, head_end + max(1, int(missing * chars_per_token)), head_end
+                )
+                end = min(end, tail_start)
+                chunks.append(text[head_end:end])
+                targets.append((i, 0, end))
+                head_end = end
+            if len(tail) < tail_tokens:
+                missing = tail_tokens - len(tail) + 1
+                start = _word_boundary(
+                    text, tail_start - max(1, int(missing * chars_per_token)), head_end
+                )
+                chunks.append(text[start:tail_start])
+                targets.append((i, 2, start))
+
+        for (i, side, position), chunk, ids in zip(
+            targets, chunks, _encode(tokenizer, chunks)
+        ):
+            if len(ids) >= 16:
+                samples.append(len(chunk) / len(ids))
+            window = windows[i]
+            window[side] = position
+            # Cortes em espaços: os tokens emendados são os mesmos da
+            # tokenização do texto inteiro
+            if side == 0:
+                window[1] = window[1] + ids
+            else:
+                window[3] = ids + window[3]
+
+        for i in list(windows):
+            head_end, head, tail_start, tail = windows.pop(i)
+            if len(head) >= head_tokens and len(tail) >= tail_tokens:
+                ids = head[:head_tokens] + tail[len(tail) - tail_tokens :]
+            elif head_end >= tail_start:
+                # As janelas se encontraram: estes são os tokens do texto todo
+                ids = head + tail
+                if len(ids) > budget:
+                    ids = ids[:head_tokens] + ids[len(ids) - tail_tokens :]
+            else:
+                windows[i] = [head_end, head, tail_start, tail]
+                continue
+            input_ids[i] = prefix + ids + suffix
+
+    if samples:
+        samples.sort()
+        state["chars_per_token"] = min(
+            float(CHARS_PER_TOKEN), samples[len(samples) // 2]
+        )
+    return input_ids
+
+
+def split_windows(
+    ids: List[int],
+    prefix: List[int],
+    suffix: List[int],
+    max_length: int = MAX_LENGTH,
+    overlap: int = 128,
+    max_windows: int = 8,
+) -> List[List[int]]:
+    """
+    Divide um texto tokenizado em janelas sobrepostas
+
+    Args:
+        ids: Tokens do texto (sem tokens especiais)
+        prefix: Tokens especiais de início (ex: [CLS])
+        suffix: Tokens especiais de fim (ex: [SEP])
+        max_length: Tamanho de cada janela, incluindo tokens especiais
+        overlap: Tokens compartilhados entre janelas vizinhas
+        max_windows: Limite de janelas; acima dele são escolhidas janelas
+            espaçadas uniformemente (sempre incluindo a primeira e a última)
+
+    Returns:
+        input_ids de cada janela, prontos para tokenizer.pad
+    """
+    body = max_length - len(prefix) - len(suffix)
+    step = max(1, body - overlap)
+
+    starts = [0]
+    while starts[-1] + body < len(ids):
+        starts.append(starts[-1] + step)
+
+    if len(starts) > max_windows:
+        if max_windows == 1:
+            starts = [0]
+        else:
+            last = len(starts) - 1
+            starts = [
+                starts[round(k * last / (max_windows - 1))] for k in range(max_windows)
+            ]
+
+    return [prefix + ids[start : start + body] + suffix for start in starts]
@@ -0,0 +1,281 @@
+"""
+Backends de tradução plugáveis (PT↔EN)
+
+- "marian": modelo MarianMT local em CPU, carregado uma vez, com tradução
+  em lote. Funciona sem rede se o modelo estiver em models/ (veja
+  scripts/download_translation_model.py).
+- "google": deep_translator.GoogleTranslator, uma chamada de rede por texto.
+
+Todos os backends mantêm um cache LRU próprio de traduções.
+"""
+
+import logging
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+TRANSLATION_BACKEND = os.getenv("TRANSLATION_BACKEND", "marian")
+
+# Direção → (diretório local, modelo no HF Hub, prefixo de idioma alvo)
+MARIAN_MODELS: Dict[str, Tuple[str, str, str]] = {
+    "pt_en": (
+        os.getenv("TRANSLATION_MODEL_PT_EN", "models/opus-mt-pt-en"),
+        "Helsinki-NLP/opus-mt-ROMANCE-en",
+        "",
+    ),
+    "en_pt": (
+        os.getenv("TRANSLATION_MODEL_EN_PT", "models/opus-mt-en-pt"),
+        "Helsinki-NLP/opus-mt-en-ROMANCE",
+        ">>pt_br<< ",
+    ),
+}
+
+# Segmentos maiores que isso são divididos em frases antes de traduzir
+MAX_SEGMENT_CHARS = 1000
+
+
+def _direction(source_lang: str, target_lang: str) -> Optional[str]:
+    """Retorna a chave da direção ("pt_en"/"en_pt") ou None se não suportada"""
+    direction = f"{source_lang}_{target_lang}"
+    return direction if direction in MARIAN_MODELS else None
+
+
+def split_segments(text: str, max_chars: int = MAX_SEGMENT_CHARS) -> List[str]:
+    """
+    Divide um texto longo em segmentos de frases completas
+
+    Args:
+        text: Texto original
+        max_chars: Tamanho máximo aproximado de cada segmento
+
+    Returns:
+        Lista de segmentos (textos curtos retornam um único segmento)
+    """
+    if len(text) <= max_chars:
+        return [text]
+
+    segments: List[str] = []
+    current = ""
+    for sentence in re.split(r"(?<=[.!?])\s+|\n+", text):
+        if not sentence.strip():
+            continue
+        if current and len(current) + len(sentence) + 1 > max_chars:
+            segments.append(current)
+            current = sentence
+        else:
+            current = f"{current} {sentence}" if current else sentence
+    if current:
+        segments.append(current)
+
+    return segments
+
+
+class TranslationBackend:
+    """
+    Interface dos backends de tradução, com cache LRU de traduções
+
+    Args:
+        cache_size: Número máximo de traduções em cache
+    """
+
+    name = "base"
+
+    def __init__(self, cache_size: int = 2048):
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[Tuple[str, str], str]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def _translate_uncached(
+        self, texts: List[str], source_lang: str, target_lang: str
+    ) -> List[str]:
+        raise NotImplementedError
+
+    def translate_batch(
+        self, texts: List[str], source_lang: str, target_lang: str
+    ) -> List[str]:
+        """
+        Traduz vários textos de uma vez
+
+        Args:
+            texts: Textos no idioma de origem
+            source_lang: Idioma de origem ("pt" ou "en")
+            target_lang: Idioma de destino ("pt" ou "en")
+
+        Returns:
+            Traduções na mesma ordem (texto original se a direção não for
+            suportada)
+        """
+        direction = _direction(source_lang, target_lang)
+        if direction is None:
+            return list(texts)
+
+        results: List[Optional[str]] = [None] * len(texts)
+        missing: Dict[str, List[int]] = {}
+
+        with self._cache_lock:
+            for idx, text in enumerate(texts):
+                cached = self._cache.get((direction, text))
+                if cached is not None:
+                    self._cache.move_to_end((direction, text))
+                    self.cache_hits += 1
+                    results[idx] = cached
+                else:
+                    missing.setdefault(text, []).append(idx)
+
+        if missing:
+            unique = list(missing)
+            self.cache_misses += len(unique)
+            translations = self._translate_uncached(unique, source_lang, target_lang)
+
+            with self._cache_lock:
+                for text, translated in zip(unique, translations):
+                    for idx in missing[text]:
+                        results[idx] = translated
+                    self._cache[(direction, text)] = translated
+                    self._cache.move_to_end((direction, text))
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+
+        return results
+
+    def translate(self, text: str, source_lang: str, target_lang: str) -> str:
+        """Traduz um único texto"""
+        return self.translate_batch([text], source_lang, target_lang)[0]
+
+    def clear_cache(self):
+        """Esvazia o cache de traduções"""
+        with self._cache_lock:
+            self._cache.clear()
+
+
+class GoogleTranslationBackend(TranslationBackend):
+    """Tradução via Google Translator (requer rede; uma chamada por texto)"""
+
+    name = "google"
+
+    def __init__(self, cache_size: int = 2048):
+        super().__init__(cache_size)
+        from deep_translator import GoogleTranslator
+
+        self._translators = {
+            "pt_en": GoogleTranslator(source="pt", target="en"),
+            "en_pt": GoogleTranslator(source="en", target="pt"),
+        }
+
+    def _translate_uncached(self, texts, source_lang, target_lang):
+        translator = self._translators[_direction(source_lang, target_lang)]
+        return [translator.translate(text) for text in texts]
+
+
+class MarianTranslationBackend(TranslationBackend):
+    """
+    Tradução local com MarianMT em CPU
+
+    Os modelos são carregados uma única vez por direção (sob demanda) e os
+    textos são traduzidos em lotes ordenados por tamanho.
+
+    Args:
+        batch_size: Segmentos por chamada de generate
+        num_beams: Beams da busca (1 = greedy, mais rápido)
+        cache_size: Número máximo de traduções em cache
+    """
+
+    name = "marian"
+
+    def __init__(
+        self, batch_size: int = 16, num_beams: int = 1, cache_size: int = 2048
+    ):
+        super().__init__(cache_size)
+        self.batch_size = batch_size
+        self.num_beams = num_beams
+        self._models: Dict[str, Tuple] = {}
+        self._load_lock = threading.Lock()
+
+    def _load(self, direction: str):
+        """Carrega tokenizer e modelo da direção (uma vez)"""
+        with self._load_lock:
+            if direction not in self._models:
+                from transformers import MarianMTModel, MarianTokenizer
+
+                local_dir, hub_id, prefix = MARIAN_MODELS[direction]
+                source = local_dir if os.path.isdir(local_dir) else hub_id
+                logger.info(f"Carregando modelo de tradução {direction}: {source}")
+
+                tokenizer = MarianTokenizer.from_pretrained(source)
+                model = MarianMTModel.from_pretrained(source)
+                model.eval()
+                self._models[direction] = (tokenizer, model, prefix)
+
+        return self._models[direction]
+
+    def _translate_uncached(self, texts, source_lang, target_lang):
+        import torch
+
+        tokenizer, model, prefix = self._load(_direction(source_lang, target_lang))
+
+        # Dividir textos longos em segmentos que cabem no modelo
+        segments: List[str] = []
+        owners: List[int] = []
+        for idx, text in enumerate(texts):
+            for segment in split_segments(text):
+                segments.append(prefix + segment)
+                owners.append(idx)
+
+        translated = [""] * len(segments)
+        order = sorted(range(len(segments)), key=lambda i: len(segments[i]))
+
+        for start in range(0, len(order), self.batch_size):
+            bucket = order[start : start + self.batch_size]
+            inputs = tokenizer(
+                [segments[i] for i in bucket],
+                return_tensors="pt",
+                padding=True,
+                truncation=True,
+                max_length=512,
+            )
+            with torch.no_grad():
+                outputs = model.generate(
+                    **inputs, num_beams=self.num_beams, max_new_tokens=512
+                )
+            for i, output in zip(
+                bucket, tokenizer.batch_decode(outputs, skip_special_tokens=True)
+            ):
+                translated[i] = output
+
+        # Reagrupar segmentos por texto de origem
+        results = [[] for _ in texts]
+        for owner, output in zip(owners, translated):
+            results[owner].append(output)
+
+        return [" ".join(parts) for parts in results]
+
+
+BACKENDS = {
+    "marian": MarianTranslationBackend,
+    "google": GoogleTranslationBackend,
+}
+
+
+def get_translation_backend(name: Optional[str] = None) -> TranslationBackend:
+    """
+    Cria o backend de tradução configurado
+
+    Args:
+        name: "marian" ou "google" (padrão: variável TRANSLATION_BACKEND)
+
+    Returns:
+        Instância do backend
+
+    Raises:
+        ValueError: Se o backend não existir
+    """
+    name = name or TRANSLATION_BACKEND
+    if name not in BACKENDS:
+        raise ValueError(f"Backend de tradução desconhecido: {name}")
+    return BACKENDS[name]()
@@ -2,13 +2,27 @@ import re
 import io
 import logging
 from typing import Union
-import pdfplumber
-from pdfminer.high_level import extract_text as pdfminer_extract_text
+
+from email_ingest import read_email_bytes
+from keyword_engine import KeywordEngine
+from pdf_extract import get_pdf_extractor
+from text_budget import clip_head_tail, strip_signature
 
 # Configurar logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Palavras-chave das respostas sugeridas (compiladas uma única vez)
+REPLY_KEYWORDS = KeywordEngine({
+    'meeting': ['reunião', 'meeting', 'agenda', 'horário'],
+    'proposal': ['proposta', 'orçamento', 'cotação', 'preço'],
+    'support': ['problema', 'erro', 'bug', 'falha', 'suporte'],
+    'partnership': ['parceria', 'colaboração', 'projeto'],
+    'congratulations': ['aniversário', 'parabéns', 'felicidades'],
+    'holiday': ['feriado', 'férias', 'descanso', 'aproveitem'],
+    'greeting': ['bom dia', 'boa tarde', 'boa noite', 'olá'],
+})
+
 def preprocess_text(text: str) -> str:
     """
     Pré-processa texto para classificação
@@ -23,6 +37,9 @@ def preprocess_text(text: str) -> str:
         if not text or not isinstance(text, str):
             return ""
         
+        # Remover assinatura/histórico citado enquanto há quebras de linha
+        text = strip_signature(text)
+        
         # Converter para minúsculas
         text = text.lower()
         
@@ -38,9 +55,9 @@ def preprocess_text(text: str) -> str:
         # Limpar espaços no início e fim
         text = text.strip()
         
-        # Limitar tamanho para o modelo
-        if len(text) > 2000:
-            text = text[:2000] + "..."
+        # Limitar a uma janela de início + final; o corte fino é feito em
+        # tokens por text_budget.encode_with_budget
+        text = clip_head_tail(text)
         
         logger.info(f"Texto pré-processado: {len(text)} caracteres")
         return text
@@ -51,7 +68,7 @@ def preprocess_text(text: str) -> str:
 
 def parse_file(file) -> str:
     """
-    Extrai texto de arquivo .txt ou .pdf
+    Extrai texto de arquivo .txt, .pdf ou .eml
     
     Args:
         file: Arquivo carregado via Streamlit
@@ -78,40 +95,32 @@ def parse_file(file) -> str:
             return text
             
         elif file_extension == 'pdf':
-            # Arquivo PDF
-            try:
-                # Tentar com pdfplumber primeiro
-                with pdfplumber.open(file) as pdf:
-                    text_parts = []
-                    for page in pdf.pages:
-                        page_text = page.extract_text()
-                        if page_text:
-                            text_parts.append(page_text)
-                    
-                    if text_parts:
-                        text = '\n'.join(text_parts)
-                        logger.info(f"PDF processado com pdfplumber: {len(text)} caracteres")
-                        return text
-                    else:
-                        raise Exception("Nenhum texto extraído com pdfplumber")
-                        
-            except Exception as pdfplumber_error:
-                logger.warning(f"pdfplumber falhou, tentando pdfminer: {pdfplumber_error}")
-                
-                # Fallback para pdfminer
-                try:
-                    file.seek(0)  # Resetar posição do arquivo
-                    text = pdfminer_extract_text(file)
-                    
-                    if text:
-                        logger.info(f"PDF processado com pdfminer: {len(text)} caracteres")
-                        return text
-                    else:
-                        raise Exception("Nenhum texto extraído com pdfminer")
-                        
-                except Exception as pdfminer_error:
-                    logger.error(f"pdfminer também falhou: {pdfminer_error}")
-                    raise Exception("Não foi possível extrair texto do PDF com nenhum método")
+            # Arquivo PDF: páginas extraídas em paralelo, com limite de tempo,
+            # fallback pdfminer por página e cache pelo hash do conteúdo
+            content = file.getvalue() if hasattr(file, 'getvalue') else file.read()
+            result = get_pdf_extractor().extract(content)
+            
+            if not result.text:
+                raise Exception("Não foi possível extrair texto do PDF com nenhum método")
+            
+            if result.truncated or result.timed_out:
+                logger.warning(
+                    f"PDF extraído parcialmente: {result.pages_extracted}/"
+                    f"{result.total_pages} páginas"
+                )
+            
+            logger.info(f"PDF processado: {len(result.text)} caracteres")
+            return result.text
+        
+        elif file_extension == 'eml':
+            # Email RFC 822: assunto + corpo (text/plain ou HTML convertido)
+            content = file.read()
+            if isinstance(content, str):
+                content = content.encode("utf-8")
+            text = read_email_bytes(content, file.name)
+            
+            logger.info(f"Arquivo .eml processado: {len(text)} caracteres")
+            return text
         
         else:
             raise ValueError(f"Tipo de arquivo não suportado: {file_extension}")
@@ -157,23 +166,23 @@ def generate_productive_reply(text: str) -> str:
         Resposta sugerida
     """
     # Identificar tipo de solicitação baseado em palavras-chave
-    text_lower = text.lower()
+    hits = REPLY_KEYWORDS.scan(text)
     
-    if any(word in text_lower for word in ['reunião', 'meeting', 'agenda', 'horário']):
+    if 'meeting' in hits:
         return """Obrigado pelo contato. Sua solicitação de reunião está sendo analisada pela equipe.
 
 Prazo para resposta: 24 horas úteis.
 
 Em caso de urgência, entre em contato pelo telefone: (11) 9999-9999."""
     
-    elif any(word in text_lower for word in ['proposta', 'orçamento', 'cotação', 'preço']):
+    elif 'proposal' in hits:
         return """Obrigado pelo interesse. Sua solicitação de proposta está sendo processada.
 
 Prazo para resposta: 48 horas úteis.
 
 Nossa equipe comercial entrará em contato em breve."""
     
-    elif any(word in text_lower for word in ['problema', 'erro', 'bug', 'falha', 'suporte']):
+    elif 'support' in hits:
         return """Obrigado pelo reporte. Sua solicitação de suporte foi registrada.
 
 Número do ticket: #SUP-{timestamp}
@@ -181,7 +190,7 @@ Número do ticket: #SUP-{timestamp}
 Prazo para primeira resposta: 4 horas úteis.
 Prazo para resolução: 24 horas úteis."""
     
-    elif any(word in text_lower for word in ['parceria', 'colaboração', 'projeto']):
+    elif 'partnership' in hits:
         return """Obrigado pela proposta de parceria. Sua iniciativa está sendo avaliada pela diretoria.
 
 Prazo para resposta: 72 horas úteis.
@@ -206,23 +215,23 @@ def generate_unproductive_reply(text: str) -> str:
     Returns:
         Resposta sugerida
     """
-    text_lower = text.lower()
+    hits = REPLY_KEYWORDS.scan(text)
     
-    if any(word in text_lower for word in ['aniversário', 'parabéns', 'felicidades']):
+    if 'congratulations' in hits:
         return """Obrigado pelas felicitações! Apreciamos muito o carinho da equipe.
 
 No momento, não há ação necessária de nossa parte.
 
 Agradecemos o contato e desejamos um excelente dia!"""
     
-    elif any(word in text_lower for word in ['feriado', 'férias', 'descanso', 'aproveitem']):
+    elif 'holiday' in hits:
         return """Obrigado pelos votos de boas férias! A equipe agradece a consideração.
 
 No momento, não há ação necessária de nossa parte.
 
 Desejamos a todos um excelente período de descanso!"""
     
-    elif any(word in text_lower for word in ['bom dia', 'boa tarde', 'boa noite', 'olá']):
+    elif 'greeting' in hits:
         return """Obrigado pela saudação! A equipe agradece o contato cordial.
 
 No momento, não há ação necessária de nossa parte.